@@ -0,0 +1,180 @@
+# beamer/frame_cache.py
+# -*- coding: utf-8 -*-
+"""
+Cache em disco dos blocos de frames de cada questão, para regenerar o .tex de forma
+incremental: só as questões que mudaram são renderizadas de novo.
+
+- Chave = hash da questão resolvida (ou só normalizada, com seed fixa) + seed + opções
+  do documento (title/fsq/fsa) + diretório base + impressão digital das imagens citadas
+  (caminho, tamanho, mtime) + FRAMES_VERSION (mudar ao alterar a renderização dos
+  frames) e LOADER_VERSION.
+- Valor = o texto do bloco, numa tabela SQLite ('frames/frames.sqlite' dentro do diretório
+  de core.cache): milhares de blocos pequenos num arquivo só, lidos/gravados em lote. O
+  tamanho total segue o limite LRU de core.cache (get_max_bytes).
+- Falhas de leitura/escrita só geram log (o bloco é renderizado normalmente).
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+
+from core import cache as parse_cache
+from core.assets import image_specs
+from core.images import image_info
+from core.loader import LOADER_VERSION
+from core.models import ImageSpec
+
+logger = logging.getLogger(__name__)
+
+FRAMES_VERSION = "1"
+
+_CONN: Dict[int, sqlite3.Connection] = {}
+_CONN_PATH: Dict[int, Path] = {}
+
+
+def get_frames_dir() -> Path:
+    return parse_cache.get_subcache_dir("frames")
+
+
+def image_paths(q: Dict[str, Any]) -> List[str]:
+    """Caminhos (sem o ';LxA') das imagens do enunciado, das alternativas e da correta."""
+    return [ImageSpec.parse(v).path for v in image_specs(q)]
+
+
+def image_fingerprint(path: str, base_dir: Optional[str]) -> str:
+    info = image_info(path, base_dir, ttl=0)  # a chave precisa do mtime atual
+    return f"{info.path}|{info.size}|{info.mtime_ns}" if info.exists else f"{info.path}|-"
+
+
+def frame_key(
+    q: Dict[str, Any],
+    seed: Optional[int],
+    base_dir: Optional[str],
+    options: Iterable[Any] = (),
+    stage: str = "resolvida",
+) -> str:
+    """
+    Chave do bloco de frames de uma questão (ver docstring do módulo). stage="normalizada"
+    aceita a questão antes de resolve_all: com seed fixa a resolução é determinística
+    (core.seeds), então a chave também identifica o resultado e um acerto dispensa resolver.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(json.dumps(q, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    h.update(json.dumps([FRAMES_VERSION, LOADER_VERSION, stage, seed, base_dir, list(options)],
+                        default=str).encode("utf-8"))
+    for path in image_paths(q):
+        h.update(b"\0" + image_fingerprint(path, base_dir).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _db() -> sqlite3.Connection:
+    """Conexão do processo atual (uma por pid: conexões não atravessam o fork dos workers)."""
+    path = get_frames_dir() / "frames.sqlite"
+    conn = _CONN.get(os.getpid())
+    if conn is not None and _CONN_PATH.get(os.getpid()) == path:
+        return conn
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30)
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        # INCREMENTAL: evict devolve ao disco as páginas liberadas (num banco já existente
+        # o modo só vale depois de um VACUUM)
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")  # é só cache: perder a última escrita não faz mal
+    conn.execute("CREATE TABLE IF NOT EXISTS blocks (key TEXT PRIMARY KEY, text TEXT NOT NULL, used INTEGER NOT NULL)")
+    conn.execute("CREATE INDEX IF NOT EXISTS blocks_used ON blocks(used)")
+    _CONN[os.getpid()] = conn
+    _CONN_PATH[os.getpid()] = path
+    return conn
+
+
+def get_many(keys: List[str]) -> Dict[str, str]:
+    """{chave: bloco} das chaves presentes (falhas só geram log)."""
+    if not keys:
+        return {}
+    try:
+        db = _db()
+        found: Dict[str, str] = {}
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            marks = ", ".join("?" * len(part))
+            found.update(db.execute(f"SELECT key, text FROM blocks WHERE key IN ({marks})", part).fetchall())
+        if found:
+            with db:
+                db.executemany("UPDATE blocks SET used = ? WHERE key = ?", [(time.time_ns(), k) for k in found])
+        return found
+    except Exception as e:
+        logger.debug("Cache de frames ignorado: %s", e)
+        return {}
+
+
+def put_many(blocks: Dict[str, str]) -> None:
+    """Grava os blocos (uma transação). Falhas só geram log."""
+    if not blocks:
+        return
+    try:
+        db = _db()
+        now = time.time_ns()
+        with db:
+            db.executemany("INSERT OR REPLACE INTO blocks(key, text, used) VALUES (?, ?, ?)",
+                           [(k, v, now) for k, v in blocks.items()])
+    except Exception as e:
+        logger.debug("Falha ao gravar cache de frames: %s", e)
+
+
+def get(key: str) -> Optional[str]:
+    return get_many([key]).get(key)
+
+
+def put(key: str, text: str) -> None:
+    put_many({key: text})
+
+
+def _disk_bytes(db: sqlite3.Connection) -> int:
+    """Bytes ocupados no arquivo (páginas em uso; as livres são devolvidas pelo incremental_vacuum)."""
+    page_size = db.execute("PRAGMA page_size").fetchone()[0]
+    pages = db.execute("PRAGMA page_count").fetchone()[0] - db.execute("PRAGMA freelist_count").fetchone()[0]
+    return pages * page_size
+
+
+def evict(max_bytes: Optional[int] = None) -> None:
+    """
+    Remove os blocos menos usados até o arquivo caber no limite (padrão: o de core.cache) e
+    encolhe o frames.sqlite (incremental_vacuum) e o WAL (checkpoint).
+    """
+    limit = parse_cache.get_max_bytes() if max_bytes is None else max_bytes
+    try:
+        db = _db()
+        used = _disk_bytes(db)
+        if used <= limit:
+            return
+        rows = db.execute("SELECT key, LENGTH(CAST(key AS BLOB)) + LENGTH(CAST(text AS BLOB)) FROM blocks ORDER BY used").fetchall()
+        stored = sum(size for _, size in rows) or 1
+        # as páginas também guardam índice e sobras: o corte é proporcional ao que cada linha ocupa
+        excess = (used - limit) * stored / used
+        drop = []
+        freed = 0
+        for key, size in rows:
+            if freed >= excess:
+                break
+            drop.append((key,))
+            freed += size
+        with db:
+            db.executemany("DELETE FROM blocks WHERE key = ?", drop)
+        db.executescript("PRAGMA incremental_vacuum;")  # executescript roda até o fim (execute liberaria 1 página)
+        db.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    except Exception as e:
+        logger.debug("Falha ao limpar cache de frames: %s", e)
+
+
+def clear() -> None:
+    """Remove todos os blocos guardados."""
+    with _db() as db:
+        db.execute("DELETE FROM blocks")
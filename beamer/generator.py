@@ -19,13 +19,26 @@ Regras:
 """
 
 from __future__ import annotations
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Deque, Iterable, Iterator, Optional, Tuple
 from pathlib import Path
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain, islice
+import logging
+import os
+import pickle
 import re
-import hashlib
-import random
 
-from core.loader import load_quiz
+from core.loader import (
+    _finish_question, _iter_raw_questions, _load_normalized, _normalize_semicolon_keys_inplace, _resolve_workers,
+)
+from core.assets import image_map_digest, prepare_assets, rewrite_images, swap_image
+from core.images import image_exists, resolve_image
+from core.models import ImageSpec, is_image_path
+from core.pipeline import alt_label, place_correta
+
+from . import frame_cache
 
 # --------------------------------------------------------------------
 # Helpers
@@ -33,28 +46,18 @@ from core.loader import load_quiz
 
 IMG_EXTS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.svg', '.pdf')
 
-def _rng_for_q(seed: Optional[int], q: Dict[str, Any]) -> random.Random:
-    """
-    RNG determinístico por questão (id + enunciado + tamanho atual de alternativas),
-    para que o índice da correta seja reprodutível entre execuções.
-    """
-    base = str(0 if seed is None else seed)
-    salt = f"{q.get('id','')}|{q.get('enunciado','')}|{len(q.get('alternativas') or [])}"
-    h = hashlib.sha256((base + "|" + salt).encode("utf-8")).hexdigest()
-    return random.Random(int(h[:16], 16))  # 64 bits
+TEX_BUFFER = 1 << 16  # bytes de buffer do write_tex_stream
+FRAME_BATCH = 32      # questões por tarefa no modo paralelo
+
+logger = logging.getLogger(__name__)
 
 # "caminho;LxA" (mm)
 def _parse_img_spec(s: str):
     """Parse 'path;LxA' -> (path, L, A) em mm; ou (path, None, None) se não houver tamanho."""
     if not isinstance(s, str):
         return s, None, None
-    if ';' in s:
-        path, size = s.split(';', 1)
-        m = re.match(r'^\s*(\d+(?:\.\d+)?)x(\d+(?:\.\d+)?)\s*$', size.strip())
-        if m:
-            return path.strip(), float(m.group(1)), float(m.group(2))
-        return path.strip(), None, None
-    return s.strip(), None, None
+    spec = ImageSpec.parse(s)
+    return spec.path, spec.width_mm, spec.height_mm
 
 def latex_escape(s: str) -> str:
     if s is None:
@@ -77,13 +80,8 @@ def latex_escape(s: str) -> str:
     out = out.replace("<", r"\textless{}").replace(">", r"\textgreater{}")
     return out
 
-def _label(i: int) -> str:
-    abc = "abcdefghijklmnopqrstuvwxyz"
-    return abc[i] + ")" if i < len(abc) else f"{i+1})"
-
-def _is_image_path(x: str) -> bool:
-    p, _, _ = _parse_img_spec(x) if isinstance(x, str) else (x, None, None)
-    return isinstance(p, str) and any(p.lower().endswith(ext) for ext in IMG_EXTS)
+_label = alt_label
+_is_image_path = is_image_path
 
 def render_images(imgs: List[str], base_dir: str | None = None) -> str:
     """
@@ -94,8 +92,8 @@ def render_images(imgs: List[str], base_dir: str | None = None) -> str:
     lines = [r"\begin{center}"]
     for img in imgs:
         spec_p, wmm, hmm = _parse_img_spec(img)
-        p = Path(base_dir, spec_p) if base_dir else Path(spec_p)
-        if p.exists():
+        p = resolve_image(spec_p, base_dir)
+        if image_exists(p):
             if wmm and hmm:
                 lines.append(rf"\includegraphics[width={wmm}mm,height={hmm}mm]{{{p.as_posix()}}}")
             else:
@@ -156,8 +154,8 @@ def render_alts_images(
 
         if _is_image_path(alt or ""):
             spec_p, wmm, hmm = _parse_img_spec(alt)
-            p = Path(base_dir, spec_p) if base_dir else Path(spec_p)
-            if p.exists():
+            p = resolve_image(spec_p, base_dir)
+            if image_exists(p):
                 if wmm and hmm:
                     img_cmd = rf"\includegraphics[width={wmm}mm,height={hmm}mm]{{{p.as_posix()}}}"
                 else:
@@ -214,8 +212,8 @@ def render_alts_grid_beamer_from_list(
         # Se for imagem ("path[;LxA]"), não aplicamos \alert aqui
         if _is_image_path(a or ""):
             spec_p, wmm, hmm = _parse_img_spec(a)
-            p = Path(base_dir, spec_p) if base_dir else Path(spec_p)
-            if p.exists():
+            p = resolve_image(spec_p, base_dir)
+            if image_exists(p):
                 if wmm and hmm:
                     content = rf"\includegraphics[width={wmm}mm,height={hmm}mm]{{{p.as_posix()}}}"
                 else:
@@ -252,47 +250,127 @@ def render_alts_grid_beamer_from_list(
 # --------------------------------------------------------------------
 # Gerador principal
 # --------------------------------------------------------------------
-def json2beamer(
-    input_json='assets/questoes_template.json',
-    output_tex='assets/questoes_template_slides.tex',
-    shuffle_seed=None,             # seed p/ core e para posicionar a correta aqui
-    title='Exercícios – Apresentação',
-    fsq='Large',
-    fsa='normalsize',
-    alert_color='red',             # \alert usa a cor do tema; mantido por compat
-    **kwargs
-) -> int:
+def question_frames(
+    q_res: Dict[str, Any],
+    alts: List[Any],
+    correta_index: int,
+    base_dir: Optional[str] = None,
+) -> List[str]:
     """
-    Gera .tex Beamer conforme o padrão acordado.
-    - A ordem das questões por id é mantida aqui (sem shuffle adicional no Beamer).
-      OBS: o shuffle de alternativas já pode ter acontecido no CORE.
-    - Caminhos de imagem relativos ao diretório do JSON.
-    - A resolução de variáveis acontece no CORE.
-    - **Novo fluxo**: a correta é inserida aqui, em posição determinística por questão, e
-      só é destacada no segundo frame (texto = \alert; imagem = borda vermelha).
+    Frames de uma questão já resolvida (sem gabarito, com gabarito e OBS.), como trechos
+    que o documento junta com "\\n". 'alts' já traz a correta na posição 'correta_index'
+    (ver core.pipeline.place_correta).
     """
-    # Base dir para imagens (pega do primeiro JSON)
-    if isinstance(input_json, (list, tuple)):
-        base_dir = str(Path(input_json[0]).parent.resolve()) if input_json else None
-        # Carrega e concatena todas as questões já normalizadas pelo CORE
-        all_qs: List[Dict[str, Any]] = []
-        for p in input_json:
-            ds = load_quiz(p, shuffle_seed)
-            all_qs.extend(ds.get("questions", []))
-        qs = all_qs
+    parts: List[str] = []
+    qid = q_res.get("id", "?")
+    enun = (q_res.get("enunciado", "") or "").strip()
+    enun_tex = latex_escape(enun)
+    tipo = int(q_res.get("tipo", 1))
+    imgs = q_res.get("imagens") or []
+
+    # ---------------- Frame 1: sem gabarito ----------------
+    parts.append("\\begin{frame}")
+    parts.append(f"\\frametitle{{{qid}) {enun_tex}}}")
+    parts.append("{\\BodySize")
+
+    if imgs:
+        parts.append(render_images(imgs, base_dir=base_dir))
+
+    if q_res.get("afirmacoes"):
+        parts.append(render_afirmacoes_line(q_res["afirmacoes"]))
+        sub = (q_res.get("subenunciado") or "").strip()
+        if sub:
+            parts.append(r"\medskip")
+            parts.append("{\\BodySize " + latex_escape(sub) + r"\par}")
+            parts.append(r"\medskip")
+
+    if tipo == 2:
+        # Imagens nas alternativas – sem destaque no 1º frame
+        parts.append(
+            render_alts_images(
+                alts, base_dir=base_dir,
+                corretaIndex=correta_index,
+                highlight_correct=False
+            )
+        )
+    else:
+        K = q_res.get('alternativas_firstrow')
+        grid = render_alts_grid_beamer_from_list(
+            alts=alts,
+            corretaIndex=correta_index,
+            K=K,
+            base_dir=base_dir,
+            highlight_correct=False
+        )
+        parts.append(grid if grid else render_alts_text(alts, correta_index, highlight=False))
+
+    parts.append("}")
+    parts.append("\\end{frame}\n")
+
+    # ---------------- Frame 2: com gabarito ----------------
+    parts.append("\\begin{frame}")
+    parts.append(f"\\frametitle{{{qid}) {enun_tex}}}")
+    parts.append("{\\BodySize")
+
+    if imgs:
+        parts.append(render_images(imgs, base_dir=base_dir))
+
+    if q_res.get("afirmacoes"):
+        parts.append(render_afirmacoes_line(q_res["afirmacoes"]))
+        sub = (q_res.get("subenunciado") or "").strip()
+        if sub:
+            parts.append(r"\medskip")
+            parts.append("{\\BodySize " + latex_escape(sub) + r"\par}")
+            parts.append(r"\medskip")
+
+    if tipo == 2:
+        # Imagens nas alternativas – com borda vermelha na correta
+        parts.append(
+            render_alts_images(
+                alts, base_dir=base_dir,
+                corretaIndex=correta_index,
+                highlight_correct=True
+            )
+        )
     else:
-        base_dir = str(Path(input_json).parent.resolve())
-        ds = load_quiz(input_json, shuffle_seed)
-        qs = ds.get("questions", [])
+        K = q_res.get('alternativas_firstrow')
+        grid = render_alts_grid_beamer_from_list(
+            alts=alts,
+            corretaIndex=correta_index,
+            K=K,
+            base_dir=base_dir,
+            highlight_correct=True
+        )
+        parts.append(grid if grid else render_alts_text(alts, correta_index, highlight=True))
+
+    parts.append("}")
+    parts.append("\\end{frame}\n")
+
+    # ---------------- Frame 3: OBS (se houver) ----------------
+    obs = q_res.get("obs")
+    obs_items = []
+    if isinstance(obs, str) and obs.strip():
+        obs_items = [obs.strip()]
+    elif isinstance(obs, (list, tuple)):
+        obs_items = [str(x).strip() for x in obs if str(x).strip()]
+
+    if obs_items:
+        parts.append("\\begin{frame}")
+        parts.append(f"\\frametitle{{{qid}) {enun_tex}}}")
+        parts.append("{\\BodySize")
+        parts.append("\\textbf{OBS.:}")
+        parts.append("\\begin{itemize}")
+        for it in obs_items:
+            parts.append("\\item " + latex_escape(it))
+        parts.append("\\end{itemize}")
+        parts.append("}")
+        parts.append("\\end{frame}\n")
 
-    # Ordenar por id (robusto)
-    try:
-        qs = sorted(qs, key=lambda q: int(q.get("id", 0)))
-    except Exception:
-        pass
+    return parts
 
-    # PREÂMBULO com widescreen e Unicode
-    preamble = (
+def _preamble(title: str) -> str:
+    """Preâmbulo do documento (widescreen e Unicode)."""
+    return (
         "\\documentclass[aspectratio=169]{beamer}\n"
         "\\usepackage{bookmark}\n"
         "\\usepackage[utf8]{inputenc}\n"
@@ -356,148 +434,309 @@ def json2beamer(
         "\\date{}\n"
     )
 
-    parts: List[str] = [
-        preamble,
-        "\\begin{document}\n",
-        "\\frame{\\titlepage}\n",
-        f"\\setbeamerfont{{frametitle}}{{size=\\{fsq}}}\n",
-        f"\\newcommand{{\\BodySize}}{{\\{fsa}}}\n",
-    ]
-
-    for q_res in qs:
-        qid = q_res.get("id", "?")
-        enun = (q_res.get("enunciado", "") or "").strip()
-        enun_tex = latex_escape(enun)
-        tipo = int(q_res.get("tipo", 1))
-        base_alts = q_res.get("alternativas", []) or []
-        correta_val = q_res.get("correta", None)
-        imgs = q_res.get("imagens") or []
-
-        # --- Inserção da correta em posição determinística por questão (SEM procurar antes) ---
-        alts: List[str] = list(base_alts)  # cópia
-        correta_index = -1
-
-        if correta_val is not None and correta_val != "":
-            # posição determinística por questão
-            rng = _rng_for_q(shuffle_seed, q_res)
-            pos = rng.randrange(0, len(alts) + 1)
-
-            # se já existe, remove a primeira ocorrência para controlarmos o índice de destaque
-            try:
-                # comparação robusta convertendo a str (cobre números, etc.)
-                existing = next(i for i, a in enumerate(alts) if str(a) == str(correta_val))
-                alts.pop(existing)
-                if existing < pos:
-                    pos -= 1  # ajuste se removemos antes da posição escolhida
-            except StopIteration:
-                pass
-
-            # insere a correta
-            alts.insert(pos, correta_val)
-            correta_index = pos
-
-
-        # ---------------- Frame 1: sem gabarito ----------------
-        parts.append("\\begin{frame}")
-        parts.append(f"\\frametitle{{{qid}) {enun_tex}}}")
-        parts.append("{\\BodySize")
 
-        if imgs:
-            parts.append(render_images(imgs, base_dir=base_dir))
-
-        if q_res.get("afirmacoes"):
-            parts.append(render_afirmacoes_line(q_res["afirmacoes"]))
-            sub = (q_res.get("subenunciado") or "").strip()
-            if sub:
-                parts.append(r"\medskip")
-                parts.append("{\\BodySize " + latex_escape(sub) + r"\par}")
-                parts.append(r"\medskip")
-
-        if tipo == 2:
-            # Imagens nas alternativas – sem destaque no 1º frame
-            parts.append(
-                render_alts_images(
-                    alts, base_dir=base_dir,
-                    corretaIndex=correta_index,
-                    highlight_correct=False
-                )
-            )
-        else:
-            K = q_res.get('alternativas_firstrow')
-            grid = render_alts_grid_beamer_from_list(
-                alts=alts,
-                corretaIndex=correta_index,
-                K=K,
-                base_dir=base_dir,
-                highlight_correct=False
-            )
-            parts.append(grid if grid else render_alts_text(alts, correta_index, highlight=False))
+def _question_block(q_res: Dict[str, Any], base_dir: Optional[str], shuffle_seed, image_map=None) -> str:
+    """
+    Frames de uma questão resolvida, já juntos, com a correta inserida (place_correta).
+    image_map: imagens otimizadas (core.assets), trocadas só depois de posicionar a correta.
+    """
+    # --- Inserção da correta em posição determinística por questão ---
+    alts, correta_index = place_correta(q_res, shuffle_seed)
+    if image_map:
+        q_res = rewrite_images(q_res, image_map, base_dir)
+        alts = [swap_image(a, image_map, base_dir) for a in alts]
+    return "\n".join(question_frames(q_res, alts, correta_index, base_dir))
+
+
+def _render_blocks_task(
+    questions: List[Dict[str, Any]], base_dir: Optional[str], shuffle_seed, resolve: bool, cache_options=None,
+    image_map=None,
+) -> List[str]:
+    """
+    Tarefa de worker: (resolve e) renderiza um lote de questões, na ordem do lote.
+    Com cache_options (title, fsq, fsa), os blocos de questões inalteradas vêm do
+    beamer.frame_cache (consultado e gravado uma vez por lote).
+    """
+    if cache_options is None:
+        if resolve:
+            questions = [_finish_question(q, seed=shuffle_seed, isMath=True) for q in questions]
+        return [_question_block(q, base_dir, shuffle_seed, image_map) for q in questions]
+
+    if resolve and shuffle_seed is not None:
+        # chave pela questão normalizada: um acerto dispensa até o resolve_all
+        keys = [frame_cache.frame_key(q, shuffle_seed, base_dir, cache_options, stage="normalizada") for q in questions]
+    else:
+        if resolve:
+            questions = [_finish_question(q, seed=shuffle_seed, isMath=True) for q in questions]
+        keys = [frame_cache.frame_key(q, shuffle_seed, base_dir, cache_options) for q in questions]
+    cached = frame_cache.get_many(keys)
+    fresh: Dict[str, str] = {}
+    blocks: List[str] = []
+    for q, key in zip(questions, keys):
+        block = cached.get(key)
+        if block is None:
+            if resolve and shuffle_seed is not None:
+                q = _finish_question(q, seed=shuffle_seed, isMath=True)
+            block = fresh[key] = _question_block(q, base_dir, shuffle_seed, image_map)
+        blocks.append(block)
+    frame_cache.put_many(fresh)
+    return blocks
+
+
+def _iter_blocks(
+    qs: Iterable[Dict[str, Any]],
+    base_dir: Optional[str],
+    shuffle_seed,
+    resolve: bool = False,
+    workers: Optional[int] = None,
+    batch: int = FRAME_BATCH,
+    cache_options=None,
+    image_map=None,
+) -> Iterator[str]:
+    """
+    Blocos de frames das questões, na ordem de 'qs'. Com workers > 1 os lotes de 'batch'
+    questões são renderizados num pool de processos, com no máximo 2 lotes por worker em
+    andamento, e devolvidos pela posição (o texto é idêntico ao da execução em série).
+    Se o pool não puder ser usado, o restante é feito em série.
+    """
+    n_batches = -(-len(qs) // batch) if isinstance(qs, (list, tuple)) else 1 << 30
+    n = _resolve_workers(workers, n_batches)
+    it = iter(qs)
+    if n > 1:
+        pending: Deque[Tuple[List[Dict[str, Any]], Any]] = deque()
+        try:
+            with ProcessPoolExecutor(max_workers=n) as ex:
+                while True:
+                    while len(pending) < 2 * n:
+                        chunk = list(islice(it, batch))
+                        if not chunk:
+                            break
+                        pending.append((chunk, ex.submit(_render_blocks_task, chunk, base_dir, shuffle_seed, resolve, cache_options, image_map)))
+                    if not pending:
+                        return
+                    yield from pending[0][1].result()
+                    pending.popleft()
+        except (BrokenProcessPool, NotImplementedError, PermissionError, pickle.PicklingError) as e:
+            logger.warning("Pool de processos indisponível (%s); renderizando em série.", e)
+            # os lotes ainda não entregues voltam para a fila, em ordem
+            it = chain((q for chunk, _ in pending for q in chunk), it)
+    # em série, também por lotes (o cache é consultado uma vez por lote)
+    for chunk in iter(lambda: list(islice(it, batch)), []):
+        yield from _render_blocks_task(chunk, base_dir, shuffle_seed, resolve, cache_options, image_map)
+
+
+def iter_beamer_tex(
+    qs: Iterable[Dict[str, Any]],
+    base_dir: Optional[str] = None,
+    shuffle_seed=None,
+    title='Exercícios – Apresentação',
+    fsq='Large',
+    fsa='normalsize',
+    workers: Optional[int] = None,
+    resolve: bool = False,
+    cache: bool = False,
+    fragments_dir: Optional[Path] = None,
+    image_map=None,
+) -> Iterator[str]:
+    """
+    Gera o .tex em trechos (preâmbulo, cabeçalho, os frames de cada questão e o fim), na
+    ordem do documento; o arquivo é a junção dos trechos com "\\n" (ver write_tex_stream).
+    As questões são consumidas uma a uma (ou em lotes, com workers > 1; 0 = um por CPU):
+    só os trechos em andamento ficam em memória. resolve=True: 'qs' são questões só
+    normalizadas, resolvidas aqui (nos workers, se houver).
+    cache: reaproveita os blocos de questões inalteradas (beamer.frame_cache).
+    fragments_dir: grava o bloco de cada questão em '<dir>/q<id>.tex' (só se mudou) e o
+    documento recebe '\\input{<nome do dir>/q<id>}' no lugar dos frames.
+    image_map: imagens otimizadas (core.assets.prepare_assets) usadas no lugar das originais.
+    """
+    yield _preamble(title)
+    yield "\\begin{document}\n"
+    yield "\\frame{\\titlepage}\n"
+    yield f"\\setbeamerfont{{frametitle}}{{size=\\{fsq}}}\n"
+    yield f"\\newcommand{{\\BodySize}}{{\\{fsa}}}\n"
+
+    cache_options = (title, fsq, fsa) if cache else None
+    if cache and image_map:
+        # o bloco cita as otimizadas: a chave distingue o mapa (nomes = hash do conteúdo)
+        cache_options += (image_map_digest(image_map),)
+    if fragments_dir is None:
+        yield from _iter_blocks(qs, base_dir, shuffle_seed, resolve=resolve, workers=workers, cache_options=cache_options,
+                              image_map=image_map)
+    else:
+        qs = list(qs)
+        names = _fragment_names(qs)
+        blocks = _iter_blocks(qs, base_dir, shuffle_seed, resolve=resolve, workers=workers, cache_options=cache_options,
+                              image_map=image_map)
+        yield from _write_fragments(Path(fragments_dir), names, blocks)
+    if cache:
+        frame_cache.evict()
+
+    yield "\\end{document}\n"
+
+
+def _fragment_names(qs: List[Dict[str, Any]]) -> List[str]:
+    """'q<id>' por questão (caracteres fora de [A-Za-z0-9_-] viram '_'; ids repetidos ganham sufixo)."""
+    names: List[str] = []
+    used = set()
+    for i, q in enumerate(qs, start=1):
+        name = "q" + re.sub(r"[^A-Za-z0-9_-]", "_", str(q.get("id", i)))
+        if name in used:
+            name = f"{name}_{i}"
+        used.add(name)
+        names.append(name)
+    return names
+
+
+def _write_fragments(folder: Path, names: List[str], blocks: Iterable[str]) -> Iterator[str]:
+    """
+    Grava cada bloco no seu arquivo (só se o conteúdo mudou, para preservar o mtime dos
+    demais) e gera as linhas \\input; fragmentos de questões que saíram são removidos.
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    for name, block in zip(names, blocks):
+        frag = folder / (name + ".tex")
+        data = block.encode("utf-8")
+        try:
+            unchanged = frag.read_bytes() == data
+        except FileNotFoundError:
+            unchanged = False
+        if not unchanged:
+            tmp = frag.with_name(f".{frag.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, frag)
+        yield f"\\input{{{folder.name}/{name}}}"
+    keep = {n + ".tex" for n in names}
+    for old in folder.glob("q*.tex"):
+        if old.name not in keep:
+            old.unlink(missing_ok=True)
+
+
+def write_tex_stream(output_tex, chunks: Iterable[str], buffer_size: int = TEX_BUFFER) -> Path:
+    """
+    Grava os trechos separados por "\\n" à medida que são gerados (com buffer), num arquivo
+    temporário na mesma pasta que só substitui o destino no fim (os.replace): se a geração
+    falhar, o .tex anterior continua intacto.
+    """
+    out = Path(output_tex)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8", buffering=buffer_size) as fh:
+            sep = ""
+            for chunk in chunks:
+                fh.write(sep)
+                fh.write(chunk)
+                sep = "\n"
+        os.replace(tmp, out)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return out
 
-        parts.append("}")
-        parts.append("\\end{frame}\n")
 
-        # ---------------- Frame 2: com gabarito ----------------
-        parts.append("\\begin{frame}")
-        parts.append(f"\\frametitle{{{qid}) {enun_tex}}}")
-        parts.append("{\\BodySize")
+class _QuestionStream:
+    """Questões só normalizadas, relidas dos arquivos (em blocos, core.loader) a cada iteração."""
 
-        if imgs:
-            parts.append(render_images(imgs, base_dir=base_dir))
-
-        if q_res.get("afirmacoes"):
-            parts.append(render_afirmacoes_line(q_res["afirmacoes"]))
-            sub = (q_res.get("subenunciado") or "").strip()
-            if sub:
-                parts.append(r"\medskip")
-                parts.append("{\\BodySize " + latex_escape(sub) + r"\par}")
-                parts.append(r"\medskip")
-
-        if tipo == 2:
-            # Imagens nas alternativas – com borda vermelha na correta
-            parts.append(
-                render_alts_images(
-                    alts, base_dir=base_dir,
-                    corretaIndex=correta_index,
-                    highlight_correct=True
-                )
-            )
-        else:
-            K = q_res.get('alternativas_firstrow')
-            grid = render_alts_grid_beamer_from_list(
-                alts=alts,
-                corretaIndex=correta_index,
-                K=K,
-                base_dir=base_dir,
-                highlight_correct=True
-            )
-            parts.append(grid if grid else render_alts_text(alts, correta_index, highlight=True))
+    def __init__(self, sources: List[Any]):
+        self.sources = sources
 
-        parts.append("}")
-        parts.append("\\end{frame}\n")
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for src in self.sources:
+            for q in _iter_raw_questions(src):
+                _normalize_semicolon_keys_inplace(q)
+                yield q
+
+
+def _ids_in_order(sources: List[Any]) -> bool:
+    """
+    True se a ordenação por id não mudaria a ordem dos arquivos: ids já crescentes, ou algum
+    id não numérico (aí o sort falha e a ordem original é mantida). Lê só em streaming.
+    """
+    last = None
+    try:
+        for src in sources:
+            for q in _iter_raw_questions(src):
+                k = int(q.get("id", 0))
+                if last is not None and k < last:
+                    return False
+                last = k
+    except (TypeError, ValueError, AttributeError):
+        return True
+    return True
+
+
+def _sorted_questions(input_json) -> Tuple[Optional[str], Iterable[Dict[str, Any]]]:
+    """
+    (base_dir, questões só normalizadas, em ordem de id). Cada uma é resolvida quando o
+    gerador chega nela (mesmo resultado de load_quiz, pois os sorteios de uma questão
+    dependem só da seed e dela mesma).
+    Se os arquivos já estão em ordem de id (o caso comum), as questões são relidas em
+    streaming (_QuestionStream): a memória não cresce com o banco, ao custo de ler os
+    arquivos duas vezes. Fora de ordem, o banco todo é carregado e ordenado em memória.
+    """
+    sources = list(input_json) if isinstance(input_json, (list, tuple)) else [input_json]
+    # Base dir para imagens (pega do primeiro JSON)
+    base_dir = str(Path(sources[0]).parent.resolve()) if sources else None
+    if _ids_in_order(sources):
+        return base_dir, _QuestionStream(sources)
 
-        # ---------------- Frame 3: OBS (se houver) ----------------
-        obs = q_res.get("obs")
-        obs_items = []
-        if isinstance(obs, str) and obs.strip():
-            obs_items = [obs.strip()]
-        elif isinstance(obs, (list, tuple)):
-            obs_items = [str(x).strip() for x in obs if str(x).strip()]
-
-        if obs_items:
-            parts.append("\\begin{frame}")
-            parts.append(f"\\frametitle{{{qid}) {enun_tex}}}")
-            parts.append("{\\BodySize")
-            parts.append("\\textbf{OBS.:}")
-            parts.append("\\begin{itemize}")
-            for it in obs_items:
-                parts.append("\\item " + latex_escape(it))
-            parts.append("\\end{itemize}")
-            parts.append("}")
-            parts.append("\\end{frame}\n")
-
-    parts.append("\\end{document}\n")
+    # Carrega e concatena todas as questões já normalizadas pelo CORE
+    qs: List[Dict[str, Any]] = []
+    for p in sources:
+        qs.extend(_load_normalized(p)[0])
 
+    # Ordenar por id (robusto)
+    try:
+        qs = sorted(qs, key=lambda q: int(q.get("id", 0)))
+    except Exception:
+        pass
+
+    return base_dir, qs
+
+
+def json2beamer(
+    input_json='assets/questoes_template.json',
+    output_tex='assets/questoes_template_slides.tex',
+    shuffle_seed=None,             # seed p/ core e para posicionar a correta aqui
+    title='Exercícios – Apresentação',
+    fsq='Large',
+    fsa='normalsize',
+    alert_color='red',             # \alert usa a cor do tema; mantido por compat
+    workers=None,                  # processos p/ renderizar os frames (None/1 = série, 0 = CPUs)
+    cache=False,                   # reaproveita frames de questões inalteradas (beamer.frame_cache)
+    fragments=False,               # um .tex por questão em '<saída>_frames/', via \input
+    optimize_images=False,         # reduz/converte as imagens (core.assets) e cita as otimizadas
+    **kwargs
+) -> int:
+    """
+    Gera .tex Beamer conforme o padrão acordado.
+    - A ordem das questões por id é mantida aqui (sem shuffle adicional no Beamer).
+      OBS: o shuffle de alternativas já pode ter acontecido no CORE.
+    - Caminhos de imagem relativos ao diretório do JSON.
+    - A resolução de variáveis acontece no CORE.
+    - **Novo fluxo**: a correta é inserida aqui, em posição determinística por questão, e
+      só é destacada no segundo frame (texto = \alert; imagem = borda vermelha).
+    - Os frames são gravados à medida que ficam prontos e o arquivo só substitui o
+      destino no fim (iter_beamer_tex + write_tex_stream). Com ids já em ordem nos
+      arquivos, as questões também são lidas em streaming (_sorted_questions); fora de
+      ordem (ou com fragments) o banco é carregado inteiro na memória.
+    - workers: resolve e renderiza as questões em lotes num pool de processos; o .tex
+      é idêntico byte a byte ao gerado em série.
+    - cache: só as questões alteradas (conteúdo, seed, opções ou imagens) são renderizadas
+      de novo; o .tex é idêntico ao gerado sem cache.
+    - fragments: os frames de cada questão vão para '<saída>_frames/q<id>.tex' (gravados
+      só quando mudam) e o .tex principal os inclui com \\input.
+    - optimize_images: as imagens são reamostradas para o tamanho 'LxA' no DPI de
+      core.assets (GIF/BMP/SVG viram PNG) e o .tex cita as cópias do cache de imagens.
+    """
+    base_dir, qs = _sorted_questions(input_json)
+    image_map = prepare_assets(((q, base_dir) for q in qs)) if optimize_images else None
     out = Path(output_tex)
-    out.parent.mkdir(parents=True, exist_ok=True)
-    out.write_text("\n".join(parts), encoding="utf-8")
-    return 0
\ No newline at end of file
+    write_tex_stream(
+        out,
+        iter_beamer_tex(qs, base_dir, shuffle_seed=shuffle_seed, title=title, fsq=fsq, fsa=fsa,
+                        workers=workers, resolve=True, cache=cache,
+                        fragments_dir=out.with_name(out.stem + "_frames") if fragments else None,
+                        image_map=image_map),
+    )
+    return 0
@@ -1,3 +1,3 @@
 __all__ = ['models','loader','variables','strategies','pipeline']
 
-from .loader import load_quiz, QuizLoadError
+from .loader import load_quiz, load_quiz_variants, iter_quiz, QuizLoadError
@@ -0,0 +1,251 @@
+# core/assets.py
+# -*- coding: utf-8 -*-
+"""
+Pré-processamento das imagens das questões para o Beamer e o DOCX (Pillow).
+
+- Cada imagem é reamostrada, mantendo a proporção, para caber no tamanho físico do
+  'caminho;LxA' (mm) no DPI configurado (sem tamanho: no máximo MAX_WIDTH_MM de
+  largura); nunca é ampliada.
+- GIF/BMP (e SVG, se houver cairosvg) viram PNG; JPEG continua JPEG. PDF não é tocado.
+- Os resultados ficam em 'assets/' (dentro do diretório de core.cache), com nome = hash
+  do conteúdo da original + tamanho alvo + DPI + ASSETS_VERSION: gerar de novo só
+  converte o que mudou. O tamanho total segue o limite LRU de core.cache (get_max_bytes).
+- As conversões rodam num pool de processos (core.loader._run_tasks).
+- A orientação EXIF (fotos de celular) é aplicada aos pixels antes de reduzir.
+- Imagem que já cabe no alvo, num formato aceito (PNG/JPEG) e sem rotação EXIF é usada
+  como está; falhas só geram log (fica a original).
+
+Uso: prepare_assets() devolve o mapa {(base_dir, spec): spec otimizada} e os geradores
+trocam as imagens com rewrite_images()/swap_image() **depois** de resolver a questão e
+posicionar a correta (a posição depende do conteúdo da questão original).
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import hashlib
+import logging
+import os
+
+from core import cache as parse_cache
+from core.images import _HAS_PIL, image_info
+from core.loader import _run_tasks
+from core.models import ImageSpec, is_image_path
+
+if _HAS_PIL:
+    from PIL import Image, ImageOps
+
+try:
+    import cairosvg
+    _HAS_CAIROSVG = True
+except Exception:
+    _HAS_CAIROSVG = False
+
+logger = logging.getLogger(__name__)
+
+ASSETS_VERSION = "2"
+DEFAULT_DPI = 200
+MAX_WIDTH_MM = 140.0   # ~ a largura útil do DOCX (5.5") e do Beamer
+JPEG_QUALITY = 88
+
+_DPI = DEFAULT_DPI
+_HASH_CHUNK = 1 << 20
+_KEEP_EXTS = (".png", ".jpg", ".jpeg")
+_EXIF_ORIENTATION = 0x0112
+_CONVERT_EXTS = (".gif", ".bmp", ".svg")
+
+ImageMap = Dict[Tuple[str, str], str]
+
+
+def configure(dpi: Optional[int] = None) -> None:
+    """Ajusta o DPI das imagens geradas (só altera o que for informado)."""
+    global _DPI
+    if dpi is not None:
+        _DPI = max(1, int(dpi))
+
+
+def get_assets_dir() -> Path:
+    return parse_cache.get_subcache_dir("assets")
+
+
+def image_specs(q: Dict[str, Any]) -> List[str]:
+    """Specs 'caminho;LxA' das imagens do enunciado, das alternativas e da correta."""
+    imgs = q.get("imagens") or []
+    if isinstance(imgs, str):
+        imgs = [imgs]
+    values = list(imgs) if isinstance(imgs, list) else []
+    alts = q.get("alternativas")
+    if isinstance(alts, list):
+        values += [a for a in alts if is_image_path(a)]
+    if is_image_path(q.get("correta")):
+        values.append(q["correta"])
+    return [v for v in values if isinstance(v, str) and v.strip()]
+
+
+def _target_px(mm: Optional[float], dpi: int) -> Optional[int]:
+    return max(1, round(mm / 25.4 * dpi)) if mm else None
+
+
+def _content_hash(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _open(src: str, ext: str, width_px: Optional[int]):
+    if ext == ".svg":
+        from io import BytesIO
+        return Image.open(BytesIO(cairosvg.svg2png(url=src, output_width=width_px)))
+    return Image.open(src)
+
+
+def _convert_task(src: str, width_mm: Optional[float], height_mm: Optional[float], dpi: int, out_dir: str) -> Optional[str]:
+    """
+    Tarefa de worker: gera (ou reaproveita) a versão otimizada de 'src'; devolve o
+    caminho dela ou None para usar a original.
+    """
+    ext = Path(src).suffix.lower()
+    if not _HAS_PIL or ext not in _KEEP_EXTS + _CONVERT_EXTS or (ext == ".svg" and not _HAS_CAIROSVG):
+        return None
+    try:
+        if not image_info(src).exists:
+            return None
+        tw = _target_px(width_mm or MAX_WIDTH_MM, dpi)
+        th = _target_px(height_mm, dpi) if width_mm else None
+        out_ext = ".jpg" if ext in (".jpg", ".jpeg") else ".png"
+        key = hashlib.blake2b(digest_size=16)
+        key.update(f"{ASSETS_VERSION}|{_content_hash(src)}|{tw}|{th}|{dpi}".encode("utf-8"))
+        out = Path(out_dir, key.hexdigest() + out_ext)
+        if out.exists():
+            os.utime(out)  # LRU: último uso
+            return str(out)
+
+        with _open(src, ext, tw) as im:
+            # fotos de celular: a orientação vem no EXIF e se perde ao salvar, então a
+            # imagem é girada de fato (exif_transpose) e medida já na posição de exibição
+            orientation = im.getexif().get(_EXIF_ORIENTATION, 1)
+            turned = orientation in (5, 6, 7, 8)
+            w, h = (im.height, im.width) if turned else im.size
+            # um fator só (cabe na caixa LxA sem distorcer); nunca amplia
+            scale = min(1.0, tw / w) if th is None else min(1.0, tw / w, th / h)
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            if ext in _KEEP_EXTS and size == (w, h) and orientation == 1:
+                return None  # já cabe no alvo e não precisa girar: nada a ganhar
+            if out_ext == ".jpg":
+                # decodifica o JPEG já reduzido (bem mais rápido); medidas antes de girar
+                im.draft("RGB", size[::-1] if turned else size)
+            im.seek(0)  # GIF animado: primeiro quadro
+            upright = ImageOps.exif_transpose(im)
+            frame = upright.convert("RGB" if out_ext == ".jpg" else ("RGBA" if im.mode in ("P", "PA", "LA", "RGBA") else "RGB"))
+            if frame.size != size:
+                frame = frame.resize(size, Image.LANCZOS)
+
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+        if out_ext == ".jpg":
+            frame.save(tmp, "JPEG", quality=JPEG_QUALITY, optimize=True)
+        else:
+            frame.save(tmp, "PNG", optimize=True)
+        os.replace(tmp, out)
+        return str(out)
+    except Exception as e:
+        logger.warning("Imagem não otimizada (%s): %s", src, e)
+        return None
+
+
+def prepare_assets(
+    items: Iterable[Tuple[Dict[str, Any], Optional[str]]],
+    dpi: Optional[int] = None,
+    workers: Optional[int] = 0,
+) -> ImageMap:
+    """
+    Otimiza as imagens citadas pelas questões de 'items' ((questão, base_dir) — o diretório
+    do JSON) e devolve {(base_dir, spec): spec otimizada}, só com as que mudaram.
+    workers: como em core.loader (0 = um processo por CPU, None/1 = em série).
+    """
+    dpi = _DPI if dpi is None else int(dpi)
+    out_dir = str(get_assets_dir())
+    wanted: Dict[Tuple[str, str], Tuple[str, Optional[float], Optional[float]]] = {}
+    for q, base_dir in items:
+        for spec in image_specs(q):
+            key = (base_dir or "", spec)
+            if key not in wanted:
+                s = ImageSpec.parse(spec)
+                wanted[key] = (os.path.abspath(s.resolve(base_dir)), s.width_mm, s.height_mm)
+
+    tasks = list(dict.fromkeys(wanted.values()))
+    done = dict(zip(tasks, _run_tasks(_convert_task, [t + (dpi, out_dir) for t in tasks], workers)))
+    image_map: ImageMap = {}
+    for (base_dir, spec), task in wanted.items():
+        out = done[task]
+        if out:
+            s = ImageSpec.parse(spec)
+            image_map[(base_dir, spec)] = ImageSpec(Path(out).as_posix(), s.width_mm, s.height_mm).to_spec()
+    if tasks:
+        evict(keep=[out for out in done.values() if out])
+    return image_map
+
+
+def swap_image(value: Any, image_map: Optional[ImageMap], base_dir: Optional[str]) -> Any:
+    """A spec otimizada de 'value', se houver; senão o próprio 'value'."""
+    if not image_map or not isinstance(value, str):
+        return value
+    return image_map.get((base_dir or "", value), value)
+
+
+def rewrite_images(q: Dict[str, Any], image_map: Optional[ImageMap], base_dir: Optional[str]) -> Dict[str, Any]:
+    """Cópia rasa de 'q' com as imagens (enunciado, alternativas, correta) trocadas pelas otimizadas."""
+    if not image_map:
+        return q
+    out = dict(q)
+    imgs = q.get("imagens")
+    if isinstance(imgs, list):
+        out["imagens"] = [swap_image(v, image_map, base_dir) for v in imgs]
+    elif isinstance(imgs, str):
+        out["imagens"] = swap_image(imgs, image_map, base_dir)
+    if isinstance(q.get("alternativas"), list):
+        out["alternativas"] = [swap_image(v, image_map, base_dir) for v in q["alternativas"]]
+    if "correta" in q:
+        out["correta"] = swap_image(q["correta"], image_map, base_dir)
+    return out
+
+
+def image_map_digest(image_map: Optional[ImageMap]) -> str:
+    """Hash do mapa (entra na chave de caches de blocos que citam as imagens otimizadas)."""
+    h = hashlib.blake2b(digest_size=16)
+    for (base_dir, spec), new in sorted((image_map or {}).items()):
+        h.update(f"{base_dir}\0{spec}\0{new}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def evict(max_bytes: Optional[int] = None, keep: Iterable[Union[str, Path]] = ()) -> None:
+    """
+    Remove as imagens geradas menos usadas até o total caber no limite (padrão: o de
+    core.cache); as de 'keep' (ainda citadas por um mapa em uso) nunca são removidas.
+    """
+    limit = parse_cache.get_max_bytes() if max_bytes is None else max_bytes
+    keep = {os.path.abspath(p) for p in keep}
+    entries = []
+    total = 0
+    for entry in get_assets_dir().glob("*.*"):
+        try:
+            st = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime_ns, st.st_size, entry))
+        total += st.st_size
+    for _, size, entry in sorted(entries, key=lambda e: e[0]):
+        if total <= limit:
+            break
+        if os.path.abspath(entry) in keep:
+            continue
+        entry.unlink(missing_ok=True)
+        total -= size
+
+
+def clear() -> None:
+    """Remove todas as imagens geradas."""
+    for entry in get_assets_dir().glob("*.*"):
+        entry.unlink(missing_ok=True)
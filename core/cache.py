@@ -0,0 +1,155 @@
+# core/cache.py
+# -*- coding: utf-8 -*-
+"""
+Cache persistente (em disco) das questões **normalizadas** (antes da resolução de <...>).
+
+- Chave = caminho absoluto + tamanho + mtime + hash do conteúdo + versão do loader;
+  qualquer mudança no arquivo (ou na normalização) gera outra entrada.
+- Valor = pickle (binário, rápido de ler) de {"questions": [...], "meta": {...}}.
+- Limite de tamanho total do diretório com remoção LRU (mtime da entrada = último uso).
+
+O loader consulta is_enabled() quando load_quiz(cache=None); desligado por padrão,
+a GUI liga com configure(enabled=True). O diretório pode ser trocado pela variável
+de ambiente LEARNFORGE_CACHE_DIR. Os caches derivados (frames do beamer, índice,
+imagens otimizadas) ficam em subdiretórios dele (get_subcache_dir) e usam o mesmo
+limite de tamanho (get_max_bytes).
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MiB
+_HASH_CHUNK = 1 << 20
+
+_ENABLED = False
+_CACHE_DIR: Optional[Path] = None
+_MAX_BYTES = DEFAULT_MAX_BYTES
+
+
+def configure(
+    enabled: Optional[bool] = None,
+    directory: Optional[os.PathLike] = None,
+    max_bytes: Optional[int] = None,
+) -> None:
+    """Ajusta o cache do processo (só altera o que for informado)."""
+    global _ENABLED, _CACHE_DIR, _MAX_BYTES
+    if enabled is not None:
+        _ENABLED = bool(enabled)
+    if directory is not None:
+        _CACHE_DIR = Path(directory)
+    if max_bytes is not None:
+        _MAX_BYTES = max(0, int(max_bytes))
+
+
+def is_enabled() -> bool:
+    return _ENABLED
+
+
+def get_cache_dir() -> Path:
+    """Diretório efetivo do cache (configurado, LEARNFORGE_CACHE_DIR ou pasta de cache do usuário)."""
+    if _CACHE_DIR is not None:
+        return _CACHE_DIR
+    env = os.environ.get("LEARNFORGE_CACHE_DIR")
+    if env:
+        return Path(env)
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+    root = Path(base) if base else Path.home() / ".cache"
+    return root / "learnforge" / "parse"
+
+
+def get_subcache_dir(name: str) -> Path:
+    """Subdiretório 'name' do diretório do cache, para os caches derivados."""
+    return get_cache_dir() / name
+
+
+def get_max_bytes() -> int:
+    """Limite de tamanho (bytes) de cada cache, configurado com configure(max_bytes=...)."""
+    return _MAX_BYTES
+
+
+def file_fingerprint(p: Path, version: str) -> str:
+    """Hash da chave do cache: caminho + tamanho + mtime + conteúdo + versão do loader."""
+    st = p.stat()
+    content = hashlib.blake2b(digest_size=20)
+    with p.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK), b""):
+            content.update(chunk)
+    key = "|".join([
+        str(version),
+        str(p.resolve()),
+        str(st.st_size),
+        str(st.st_mtime_ns),
+        content.hexdigest(),
+    ])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def get(p: Path, version: str) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+    """Retorna (questions, meta) do cache ou None (ausente ou ilegível)."""
+    try:
+        entry = get_cache_dir() / (file_fingerprint(p, version) + ".pkl")
+        with entry.open("rb") as fh:
+            data = pickle.load(fh)
+        os.utime(entry)  # marca uso recente (LRU)
+        return data["questions"], data["meta"]
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.debug("Cache de parse ignorado para '%s': %s", p, e)
+        return None
+
+
+def put(p: Path, version: str, questions: List[Dict[str, Any]], meta: Dict[str, Any]) -> None:
+    """Grava (atomicamente) a entrada de 'p' e aplica o limite de tamanho. Falhas só geram log."""
+    try:
+        folder = get_cache_dir()
+        folder.mkdir(parents=True, exist_ok=True)
+        entry = folder / (file_fingerprint(p, version) + ".pkl")
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump({"questions": questions, "meta": meta}, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, entry)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        _evict(folder, keep=entry)
+    except Exception as e:
+        logger.debug("Falha ao gravar cache de parse para '%s': %s", p, e)
+
+
+def clear() -> None:
+    """Remove todas as entradas do cache."""
+    folder = get_cache_dir()
+    for entry in folder.glob("*.pkl"):
+        entry.unlink(missing_ok=True)
+
+
+def _evict(folder: Path, keep: Optional[Path] = None) -> None:
+    """Remove as entradas menos usadas até o total caber em _MAX_BYTES (preserva 'keep')."""
+    entries = []
+    total = 0
+    for entry in folder.glob("*.pkl"):
+        try:
+            st = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime_ns, st.st_size, entry))
+        total += st.st_size
+    if total <= _MAX_BYTES:
+        return
+    for _, size, entry in sorted(entries, key=lambda e: e[0]):
+        if entry == keep:
+            continue
+        entry.unlink(missing_ok=True)
+        total -= size
+        if total <= _MAX_BYTES:
+            break
@@ -0,0 +1,122 @@
+# core/images.py
+# -*- coding: utf-8 -*-
+"""
+Cache do processo com os metadados das imagens citadas nas questões (existência,
+tamanho, mtime e, sob demanda, dimensões em pixels), compartilhado pelos geradores
+(beamer, testgen, preview) e pelo cache de frames.
+
+- Chave = caminho absoluto (base_dir + caminho da questão); cada arquivo é consultado no
+  disco (stat) no máximo uma vez a cada STAT_TTL segundos — numa geração, as várias
+  renderizações da mesma imagem (frame sem e com gabarito, DOCX...) custam um stat só,
+  o que pesa em pastas de rede.
+- Vencido o prazo, um novo stat revalida a entrada: se tamanho/mtime mudaram, as
+  dimensões são lidas de novo.
+- Dimensões em pixels vêm do Pillow (opcional; sem ele, ou para SVG/PDF, ficam None).
+- No máximo MAX_ENTRIES caminhos ficam guardados (LRU), para sessões longas da GUI.
+- ttl=0 numa consulta força o stat (ex.: chaves do cache de frames, que precisam do
+  mtime atual).
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple, Union
+import os
+import time
+
+try:
+    from PIL import Image
+    _HAS_PIL = True
+except Exception:
+    _HAS_PIL = False
+
+STAT_TTL = 2.0  # segundos
+MAX_ENTRIES = 4096
+
+_CACHE: "OrderedDict[str, Tuple[float, ImageInfo]]" = OrderedDict()
+
+
+class ImageInfo(NamedTuple):
+    path: str                      # caminho absoluto
+    exists: bool
+    size: int = 0                  # bytes
+    mtime_ns: int = 0
+    width: Optional[int] = None    # pixels (só com dimensions=True e Pillow)
+    height: Optional[int] = None
+
+
+def configure(ttl: Optional[float] = None, max_entries: Optional[int] = None) -> None:
+    """Ajusta o prazo de revalidação (0 = stat a cada consulta) e o número de entradas."""
+    global STAT_TTL, MAX_ENTRIES
+    if ttl is not None:
+        STAT_TTL = max(0.0, float(ttl))
+    if max_entries is not None:
+        MAX_ENTRIES = max(1, int(max_entries))
+        _trim()
+
+
+def clear() -> None:
+    _CACHE.clear()
+
+
+def _trim() -> None:
+    while len(_CACHE) > MAX_ENTRIES:
+        _CACHE.popitem(last=False)
+
+
+def resolve_image(path: Union[str, os.PathLike], base_dir: Optional[str] = None) -> Path:
+    """Caminho da imagem relativo ao diretório do JSON (como os geradores sempre fizeram)."""
+    return Path(base_dir, path) if base_dir else Path(path)
+
+
+def _pixel_size(path: str) -> Tuple[Optional[int], Optional[int]]:
+    if not _HAS_PIL:
+        return None, None
+    try:
+        with Image.open(path) as im:  # lê só o cabeçalho
+            return im.size
+    except Exception:
+        return None, None
+
+
+def image_info(
+    path: Union[str, os.PathLike],
+    base_dir: Optional[str] = None,
+    dimensions: bool = False,
+    ttl: Optional[float] = None,
+) -> ImageInfo:
+    """
+    Metadados da imagem (ver docstring do módulo); dimensions=True inclui largura/altura em
+    pixels; ttl substitui STAT_TTL nesta consulta (0 = sempre confere no disco).
+    """
+    key = os.path.abspath(resolve_image(path, base_dir))
+    now = time.monotonic()
+    hit = _CACHE.get(key)
+    if hit is not None:
+        _CACHE.move_to_end(key)
+    if hit is not None and now - hit[0] < (STAT_TTL if ttl is None else ttl):
+        info = hit[1]
+        if dimensions and info.exists and info.width is None:
+            info = info._replace(**dict(zip(("width", "height"), _pixel_size(key))))
+            _CACHE[key] = (hit[0], info)
+        return info
+
+    try:
+        st = os.stat(key)
+    except OSError:
+        info = ImageInfo(key, False)
+    else:
+        old = hit[1] if hit is not None else None
+        if old is not None and old.exists and (old.size, old.mtime_ns) == (st.st_size, st.st_mtime_ns):
+            info = old  # arquivo igual: mantém as dimensões já lidas
+        else:
+            info = ImageInfo(key, True, st.st_size, st.st_mtime_ns)
+        if dimensions and info.width is None:
+            info = info._replace(**dict(zip(("width", "height"), _pixel_size(key))))
+    _CACHE[key] = (now, info)
+    _trim()
+    return info
+
+
+def image_exists(path: Union[str, os.PathLike], base_dir: Optional[str] = None) -> bool:
+    return image_info(path, base_dir).exists
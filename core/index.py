@@ -0,0 +1,391 @@
+# core/index.py
+# -*- coding: utf-8 -*-
+"""
+Índice SQLite do banco de questões: permite escolher subconjuntos (tipo, dificuldade,
+tópico, arquivo) e carregar/resolver **só** as questões escolhidas, sem ler o banco todo.
+
+Por questão o índice guarda: id, tipo (declarado ou inferido, ver core.models.Tipo),
+dificuldade, tópico ('topico' ou 'assunto'), arquivo de origem (+ membro do .zip),
+posição e tamanho em bytes do texto da questão, hash do conteúdo e as imagens citadas.
+
+- update(fontes) é incremental: arquivos com mesmo tamanho/mtime (ou mesmo hash) são
+  pulados; os alterados são reindexados; os que sumiram de um diretório indexado saem.
+- select()/count() consultam os índices do SQLite; sample(n, seed) sorteia n questões
+  distintas entre as que passam nos filtros a partir de pontos aleatórios do 'rank'
+  (hash do conteúdo), lendo só ~n linhas do índice.
+- load(entradas, seed) lê só os bytes de cada questão (seek), confere o hash, normaliza
+  e resolve como o loader (mesmo resultado de load_quiz para essas questões).
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+import hashlib
+import io
+import json
+import logging
+import os
+import random
+import sqlite3
+import zipfile
+
+from . import cache as parse_cache
+from .loader import QuizLoadError, _finish_question, _iter_json_stream, _normalize_semicolon_keys_inplace
+from .models import Tipo, is_image_path
+from .seeds import derive_seed
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+_RANK_BITS = 62
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS questions (
+    rowid INTEGER PRIMARY KEY,
+    file TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    member TEXT,
+    seq INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    qid TEXT,
+    tipo INTEGER NOT NULL,
+    dificuldade TEXT,
+    topico TEXT,
+    hash TEXT NOT NULL,
+    rank INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS images (
+    question INTEGER NOT NULL REFERENCES questions(rowid) ON DELETE CASCADE,
+    path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS q_file ON questions(file, seq);
+CREATE INDEX IF NOT EXISTS q_filter ON questions(tipo, dificuldade, rank);
+CREATE INDEX IF NOT EXISTS q_topico ON questions(topico, rank);
+CREATE INDEX IF NOT EXISTS q_rank ON questions(rank);
+CREATE INDEX IF NOT EXISTS img_question ON images(question);
+"""
+
+
+class IndexEntry(NamedTuple):
+    rowid: int
+    file: str
+    member: Optional[str]
+    seq: int
+    offset: int
+    length: int
+    qid: Optional[str]
+    tipo: int
+    dificuldade: Optional[str]
+    topico: Optional[str]
+    hash: str
+
+
+class UpdateStats(NamedTuple):
+    indexed: int     # arquivos (re)indexados
+    unchanged: int   # arquivos pulados
+    removed: int     # arquivos retirados do índice
+    questions: int   # questões gravadas nesta atualização
+
+
+_ENTRY_COLS = "rowid, file, member, seq, offset, length, qid, tipo, dificuldade, topico, hash"
+
+
+def default_index_path() -> Path:
+    """Arquivo padrão do índice, dentro do diretório do cache (ver core.cache)."""
+    return parse_cache.get_subcache_dir("index") / "index.sqlite"
+
+
+def _file_hash(p: Path) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with p.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _question_images(q: Dict[str, Any]) -> List[str]:
+    imgs = q.get("imagens") or []
+    if isinstance(imgs, str):
+        imgs = [imgs]
+    values = list(imgs) if isinstance(imgs, list) else []
+    alts = q.get("alternativas")
+    if isinstance(alts, list):
+        values += [a for a in alts if is_image_path(a)]
+    if is_image_path(q.get("correta")):
+        values.append(q["correta"])
+    out = []
+    for v in values:
+        if isinstance(v, str) and v.strip():
+            path = v.split(";", 1)[0].strip()
+            if path not in out:
+                out.append(path)
+    return out
+
+
+class QuestionIndex:
+    """Índice persistente (SQLite) de um ou mais bancos de questões."""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path is not None else default_index_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.execute("PRAGMA journal_mode = WAL")
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, INDEX_VERSION):
+            # esquema antigo: recomeça (o índice é só um derivado dos JSON)
+            self.db.executescript("DROP TABLE IF EXISTS images; DROP TABLE IF EXISTS questions; DROP TABLE IF EXISTS files;")
+        self.db.executescript(_SCHEMA)
+        self.db.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self.db.commit()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> "QuestionIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -------- atualização --------
+
+    def update(self, sources: Union[str, Path, Iterable[Union[str, Path]]]) -> UpdateStats:
+        """Indexa .json/.zip (arquivos ou diretórios, como em load_quiz), só o que mudou."""
+        if isinstance(sources, (str, Path)):
+            sources = [sources]
+        indexed = unchanged = removed = nq = 0
+        for src in sources:
+            p = Path(src).resolve()
+            if p.is_dir():
+                files = sorted(p.glob("*.json"))
+                current = {str(f) for f in files}
+                prefix = str(p) + os.sep
+                for (old,) in self.db.execute("SELECT path FROM files WHERE path LIKE ? ESCAPE '\\'",
+                                              (_like_prefix(prefix),)).fetchall():
+                    if old not in current and os.sep not in old[len(prefix):]:
+                        self._forget(old)
+                        removed += 1
+            elif p.is_file():
+                files = [p]
+            else:
+                if self._forget(str(p)):
+                    removed += 1
+                continue
+            for f in files:
+                with self.db:  # um arquivo por transação: falha no meio → nada dele é gravado
+                    n = self._update_file(f)
+                if n is None:
+                    unchanged += 1
+                else:
+                    indexed += 1
+                    nq += n
+        self.db.commit()
+        return UpdateStats(indexed, unchanged, removed, nq)
+
+    def _forget(self, path: str) -> bool:
+        return self.db.execute("DELETE FROM files WHERE path = ?", (path,)).rowcount > 0
+
+    def _update_file(self, p: Path) -> Optional[int]:
+        st = p.stat()
+        key = str(p)
+        row = self.db.execute("SELECT size, mtime_ns, hash FROM files WHERE path = ?", (key,)).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return None
+        digest = _file_hash(p)
+        if row and row[2] == digest:
+            self.db.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?", (st.st_size, st.st_mtime_ns, key))
+            return None
+        self._forget(key)
+        # tamanho/mtime/hash só valem depois que todas as questões entraram
+        self.db.execute("INSERT INTO files(path, size, mtime_ns, hash) VALUES (?, -1, -1, '')", (key,))
+        n = 0
+        for member, seq, raw, start, end in _iter_spans(p):
+            self._insert_question(key, member, seq, raw, start, end)
+            n += 1
+        self.db.execute("UPDATE files SET size = ?, mtime_ns = ?, hash = ? WHERE path = ?",
+                        (st.st_size, st.st_mtime_ns, digest, key))
+        return n
+
+    def _insert_question(self, file: str, member: Optional[str], seq: int, raw_bytes: bytes, start: int, end: int) -> None:
+        q = json.loads(raw_bytes.decode("utf-8"))
+        _normalize_semicolon_keys_inplace(q)
+        digest = hashlib.blake2b(raw_bytes, digest_size=16).hexdigest()
+        topico = q.get("topico", q.get("assunto"))
+        qid = q.get("id")
+        cur = self.db.execute(
+            "INSERT INTO questions(file, member, seq, offset, length, qid, tipo, dificuldade, topico, hash, rank)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (file, member, seq, start, end - start, None if qid is None else str(qid), int(Tipo.infer(q)),
+             q.get("dificuldade"), None if topico is None else str(topico), digest,
+             int(digest[:16], 16) >> (64 - _RANK_BITS)),
+        )
+        imgs = _question_images(q)
+        if imgs:
+            self.db.executemany("INSERT INTO images(question, path) VALUES (?, ?)",
+                                [(cur.lastrowid, img) for img in imgs])
+
+    # -------- consultas --------
+
+    @staticmethod
+    def _where(tipo=None, dificuldade=None, topico=None, files=None) -> Tuple[str, List[Any]]:
+        conds: List[str] = []
+        args: List[Any] = []
+        for col, val in (("tipo", tipo), ("dificuldade", dificuldade), ("topico", topico), ("file", files)):
+            if val is None:
+                continue
+            if isinstance(val, (list, tuple, set, frozenset)):
+                vals = [str(Path(v).resolve()) if col == "file" else (int(v) if col == "tipo" else v) for v in val]
+                conds.append(f"{col} IN ({', '.join('?' * len(vals))})")
+                args += vals
+            else:
+                conds.append(f"{col} = ?")
+                args.append(str(Path(val).resolve()) if col == "file" else (int(val) if col == "tipo" else val))
+        return (" WHERE " + " AND ".join(conds)) if conds else "", args
+
+    def count(self, **filters: Any) -> int:
+        where, args = self._where(**filters)
+        return self.db.execute(f"SELECT COUNT(*) FROM questions{where}", args).fetchone()[0]
+
+    def select(self, limit: Optional[int] = None, **filters: Any) -> List[IndexEntry]:
+        """Questões que atendem aos filtros (tipo, dificuldade, topico, files), na ordem dos arquivos."""
+        where, args = self._where(**filters)
+        sql = f"SELECT {_ENTRY_COLS} FROM questions{where} ORDER BY file, member, seq"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+        return [IndexEntry(*row) for row in self.db.execute(sql, args)]
+
+    def sample(self, n: int, seed: int = 0, **filters: Any) -> List[IndexEntry]:
+        """
+        n questões distintas (todas, se houver menos), na ordem do sorteio. Cada sorteio é um
+        ponto aleatório no espaço do 'rank' (fixo por conteúdo); sai a primeira questão ainda
+        não sorteada a partir dele, dando a volta no fim. A busca usa os índices do rank, então
+        só ~n linhas são lidas. Reprodutível: mesma seed e mesmo banco → mesmas questões,
+        ainda que o índice seja refeito.
+        Se n passa da metade das candidatas, lê todas (em ordem de rank) e sorteia em memória.
+        """
+        where, args = self._where(**filters)
+        total = self.count(**filters)
+        n = min(max(0, int(n)), total)
+        rng = random.Random(derive_seed(seed, "", "indice"))
+        if 2 * n > total:
+            rows = list(self.db.execute(f"SELECT {_ENTRY_COLS} FROM questions{where} ORDER BY rank, hash, seq", args))
+            return [IndexEntry(*row) for row in rng.sample(rows, n)]
+
+        glue = " AND " if where else " WHERE "
+        after = f"SELECT {_ENTRY_COLS} FROM questions{where}{glue}rank >= ? ORDER BY rank, hash, seq"
+        before = f"SELECT {_ENTRY_COLS} FROM questions{where}{glue}rank < ? ORDER BY rank, hash, seq"
+        chosen: Dict[int, IndexEntry] = {}
+        while len(chosen) < n:
+            start = rng.getrandbits(_RANK_BITS)
+            for sql in (after, before):
+                row = next((r for r in self.db.execute(sql, args + [start]) if r[0] not in chosen), None)
+                if row is not None:
+                    chosen[row[0]] = IndexEntry(*row)
+                    break
+        return list(chosen.values())
+
+    def images(self, entry: IndexEntry) -> List[str]:
+        return [r[0] for r in self.db.execute("SELECT path FROM images WHERE question = ?", (entry.rowid,))]
+
+    # -------- carga --------
+
+    def fetch(self, entries: Sequence[IndexEntry]) -> List[Dict[str, Any]]:
+        """Questões brutas (como no JSON) das entradas, lendo só os bytes de cada uma."""
+        out: List[Dict[str, Any]] = []
+        for raw in _read_slices(entries):
+            out.append(json.loads(raw.decode("utf-8")))
+        return out
+
+    def load(
+        self,
+        entries: Sequence[IndexEntry],
+        seed: Optional[int] = None,
+        isMath: bool = True,
+        base_dir: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Normaliza e resolve só as questões das entradas (mesmo resultado que load_quiz daria
+        para elas). base_dir=True anota '_base_dir' (diretório do arquivo de origem).
+        """
+        out: List[Dict[str, Any]] = []
+        for e, q in zip(entries, self.fetch(entries)):
+            _normalize_semicolon_keys_inplace(q)
+            q = _finish_question(q, seed=seed, isMath=isMath)
+            if base_dir:
+                q.setdefault("_base_dir", str(Path(e.file).parent))
+            out.append(q)
+        return out
+
+
+def _like_prefix(prefix: str) -> str:
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _iter_spans(p: Path) -> Iterator[Tuple[Optional[str], int, bytes, int, int]]:
+    """(membro, seq, bytes da questão, início, fim) de cada questão de um .json ou .zip."""
+    try:
+        if p.suffix.lower() == ".zip":
+            with zipfile.ZipFile(p, "r") as z:
+                for name in z.namelist():
+                    if not name.lower().endswith(".json"):
+                        continue
+                    data = z.read(name)
+                    yield from _spans_of(io.BytesIO(data), data, name)
+        else:
+            with p.open("rb") as fb:
+                yield from _spans_of(fb, None, None)
+    except zipfile.BadZipFile as e:
+        raise QuizLoadError(f"ZIP inválido '{p}': {e}") from e
+    except QuizLoadError as e:
+        raise QuizLoadError(f"Falha ao indexar '{p}': {e}") from e
+
+
+def _spans_of(fb: Any, data: Optional[bytes], member: Optional[str]) -> Iterator[Tuple[Optional[str], int, bytes, int, int]]:
+    text = io.TextIOWrapper(fb, encoding="utf-8", newline="")
+    reader = None if data is not None else open(fb.name, "rb")
+    try:
+        for seq, (_, start, end) in enumerate(_iter_json_stream(text, with_offsets=True)):
+            if data is not None:
+                raw = data[start:end]
+            else:
+                reader.seek(start)
+                raw = reader.read(end - start)
+            yield member, seq, raw, start, end
+    finally:
+        text.detach()
+        if reader is not None:
+            reader.close()
+
+
+def _read_slices(entries: Sequence[IndexEntry]) -> Iterator[bytes]:
+    """Lê os bytes de cada entrada (um arquivo/membro aberto por vez) e confere o hash."""
+    handles: Dict[Tuple[str, Optional[str]], Any] = {}
+    try:
+        for e in entries:
+            key = (e.file, e.member)
+            src = handles.get(key)
+            if src is None:
+                if e.member is None:
+                    src = open(e.file, "rb")
+                else:
+                    with zipfile.ZipFile(e.file, "r") as z:
+                        src = io.BytesIO(z.read(e.member))
+                handles[key] = src
+            src.seek(e.offset)
+            raw = src.read(e.length)
+            if hashlib.blake2b(raw, digest_size=16).hexdigest() != e.hash:
+                raise QuizLoadError(f"Índice desatualizado para '{e.file}' (rode update()).")
+            yield raw
+    except FileNotFoundError as ex:
+        raise QuizLoadError(f"Arquivo indexado não encontrado: {ex.filename} (rode update()).") from ex
+    finally:
+        for h in handles.values():
+            h.close()
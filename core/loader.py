@@ -3,17 +3,25 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+import io
 import json
 import zipfile
 import logging
 import re
-import hashlib
-import random
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from .math import resolve_all  # cálculo de variáveis/resoluções + substituições
+from .seeds import question_key, rng_for
+from . import cache as parse_cache
 
 logger = logging.getLogger(__name__)
 
+# Versão da normalização; entra na chave do cache de parse (mude ao alterar o Passo 1)
+LOADER_VERSION = "1"
+
 # -----------------------------
 # API pública
 # -----------------------------
@@ -25,7 +33,9 @@ class QuizLoadError(Exception):
 def load_quiz(
     source: Union[str, Path, bytes, Dict[str, Any], List[Any]],
     seed: Optional[int] = None,
-    isMath: bool = True
+    isMath: bool = True,
+    cache: Optional[bool] = None,
+    workers: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     Lê e processa o questionário sem conhecer "tipos".
@@ -40,53 +50,215 @@ def load_quiz(
          - NÃO altera o campo 'correta' (mantém como veio).
 
     Retorna sempre: {"questions":[...], "meta": {...}} (mesmo se o JSON original for array raiz).
+
+    cache: usa o cache em disco das questões normalizadas (passos 1–2) para arquivos
+    .json/.zip; None = segue core.cache.configure() (desligado por padrão).
+    workers: processos para ler/normalizar os arquivos de um diretório (ou membros de um .zip)
+    e para resolver as questões em paralelo; None/1 = em série, 0 = um por CPU. A ordem, o
+    'meta' e as questões resolvidas são idênticos aos da execução em série (os sorteios de
+    cada questão vêm só da seed e da própria questão; ver core.seeds).
     """
-    raw = _read_any(source)
+    # Ler + canonicalizar + normalizar chaves (passos 1 e 2, possivelmente do cache)
+    questions, meta = _load_normalized(source, cache=cache, workers=workers)
 
-    # Canonicalizar: achar a lista de itens (questões) e o meta
-    questions, meta = _split_questions_and_meta(raw)
+    # Resolver <...> e preparar alternativas (questão a questão)
+    return {"questions": _finish_questions(questions, seed=seed, isMath=isMath, workers=workers), "meta": meta}
 
-    # 1) Normalizar chaves "NOME;VALOR" (e "A x B") em cada questão
-    for q in questions:
-        _normalize_semicolon_keys_inplace(q)
-    
-    # 2) Resolver variáveis/resoluções + substituir <...> (quando isMath=True)
-    def _maybe_resolve(q: Dict[str, Any]) -> Dict[str, Any]:
-        if not isMath:
-            return q
+
+def iter_quiz(
+    source: Union[str, Path, bytes, Dict[str, Any], List[Any]],
+    seed: Optional[int] = None,
+    isMath: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """
+    Versão "streaming" de load_quiz: gera as questões uma a uma, já normalizadas,
+    resolvidas e com alternativas embaralhadas (mesma saída de load_quiz()["questions"]).
+
+    Para arquivos .json (soltos, em diretório ou dentro de .zip) o array de questões
+    (raiz ou chave questions/questoes/itens/lista) é lido incrementalmente, em blocos,
+    de modo que a memória fica limitada ao tamanho de uma questão e não do arquivo.
+    Se o objeto raiz tiver mais de uma dessas chaves, vale a primeira que aparecer no arquivo.
+    O 'meta' não é retornado aqui (use load_quiz quando precisar dele).
+    """
+    for q in _iter_raw_questions(source):
+        yield _process_question(q, seed=seed, isMath=isMath)
+
+
+def load_quiz_variants(
+    source: Union[str, Path, bytes, Dict[str, Any], List[Any]],
+    seeds: Iterable[Optional[int]],
+    isMath: bool = True,
+    cache: Optional[bool] = None,
+    workers: Optional[int] = None,
+) -> Iterator[Tuple[Optional[int], Dict[str, Any]]]:
+    """
+    Várias versões (uma por seed) do mesmo questionário com **um único** parse/normalização.
+    Para cada seed roda apenas resolve_all() e o shuffle das alternativas, gerando
+    (seed, {"questions": [...], "meta": {...}}) na ordem de 'seeds' — cada dataset é
+    idêntico ao de load_quiz(source, seed=seed). As questões normalizadas não são alteradas
+    entre as versões.
+    """
+    questions, meta = _load_normalized(source, cache=cache, workers=workers)
+    for seed in seeds:
+        # cópia rasa: resolve_all já clona e o shuffle só troca a lista 'alternativas'
+        resolved = [_finish_question(dict(q), seed=seed, isMath=isMath) for q in questions]
+        yield seed, {"questions": resolved, "meta": dict(meta)}
+
+
+def _finish_questions(
+    questions: List[Dict[str, Any]], *, seed: Optional[int], isMath: bool, workers: Optional[int]
+) -> List[Dict[str, Any]]:
+    """_finish_question em todas as questões; com workers > 1, em blocos num pool de processos."""
+    n = _resolve_workers(workers, len(questions))
+    if n <= 1:
+        return [_finish_question(q, seed=seed, isMath=isMath) for q in questions]
+    size = -(-len(questions) // (n * 4))  # ~4 blocos por processo
+    tasks = [(questions[i:i + size], seed, isMath) for i in range(0, len(questions), size)]
+    return [q for chunk in _run_tasks(_finish_questions_task, tasks, n) for q in chunk]
+
+
+def _finish_questions_task(questions: List[Dict[str, Any]], seed: Optional[int], isMath: bool) -> List[Dict[str, Any]]:
+    return [_finish_question(q, seed=seed, isMath=isMath) for q in questions]
+
+
+def _process_question(q: Dict[str, Any], *, seed: Optional[int], isMath: bool) -> Dict[str, Any]:
+    """
+    Pipeline por questão (independente das demais):
+      1) normaliza "NOME;VALOR" (e "A x B");
+      2) resolve variáveis/resoluções + substitui <...> (quando isMath=True);
+      3) prepara alternativas (somente shuffle determinístico; 'correta' intocada).
+    """
+    _normalize_semicolon_keys_inplace(q)
+    return _finish_question(q, seed=seed, isMath=isMath)
+
+
+def _finish_question(q: Dict[str, Any], *, seed: Optional[int], isMath: bool) -> Dict[str, Any]:
+    """Passos 2 e 3 de _process_question, para questões já normalizadas."""
+    key = question_key(q)  # da questão ainda sem substituições: igual em qualquer ordem/processo
+    if isMath:
         try:
-            q_res, _ = resolve_all(q, seed=seed)
-            return q_res
+            q, _ = resolve_all(q, seed=seed)
         except Exception as e:
             # Se algo falhar, registra e segue com a questão original
             logger.exception("Falha em resolve_all para questão id=%s: %s", q.get("id"), e)
-            return q
 
-    resolved_questions: List[Dict[str, Any]] = [_maybe_resolve(q) for q in questions]
+    _prepare_alternativas_inplace(q, seed=seed, key=key)
+    return q
+
+
+# -----------------------------
+# I/O e canonicização
+# -----------------------------
+
+def _load_normalized(
+    source: Union[str, Path, bytes, Dict[str, Any], List[Any]],
+    *,
+    cache: Optional[bool] = None,
+    workers: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Lê a origem e devolve (questões com chaves já normalizadas, meta).
+    Arquivos .json/.zip (soltos ou em diretório) passam pelo cache de parse, arquivo a arquivo;
+    diretórios mesclam na ordem ordenada, com meta.update() como em _read_any.
+    Num diretório, os arquivos fora do cache são lidos/normalizados pelo pool de 'workers'.
+    """
+    use_cache = parse_cache.is_enabled() if cache is None else cache
+    if isinstance(source, (str, Path)):
+        p = Path(source)
+        if p.is_file():
+            return _load_normalized_file(p, use_cache=use_cache, workers=workers)
+        if p.is_dir():
+            files = sorted(p.glob("*.json"))
+            if not files:
+                raise QuizLoadError(f"Nenhum .json no diretório '{p}'.")
+            loaded: List[Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]]] = [
+                parse_cache.get(fp, LOADER_VERSION) if use_cache else None for fp in files
+            ]
+            missing = [i for i, hit in enumerate(loaded) if hit is None]
+            parsed = _run_tasks(_normalize_file_task, [(str(files[i]),) for i in missing], workers)
+            for i, res in zip(missing, parsed):
+                loaded[i] = res
+                if use_cache:
+                    parse_cache.put(files[i], LOADER_VERSION, *res)
+
+            qs_all: List[Dict[str, Any]] = []
+            meta_merged: Dict[str, Any] = {}
+            for qs, meta in loaded:
+                qs_all.extend(qs)
+                meta_merged.update(meta)
+            return qs_all, meta_merged
+
+    questions, meta = _split_questions_and_meta(_read_any(source))
+    for q in questions:
+        _normalize_semicolon_keys_inplace(q)
+    return questions, meta
+
+def _load_normalized_file(
+    p: Path, *, use_cache: bool, workers: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    if use_cache:
+        hit = parse_cache.get(p, LOADER_VERSION)
+        if hit is not None:
+            return hit
 
-    # 3) Preparar alternativas (somente shuffle determinístico; 'correta' intocada)
-    for q in resolved_questions:
-        _prepare_alternativas_inplace(q, seed=seed)
+    questions, meta = _split_questions_and_meta(_read_any(p, workers=workers))
+    for q in questions:
+        _normalize_semicolon_keys_inplace(q)
 
-    return {"questions": resolved_questions, "meta": meta}
+    if use_cache:
+        parse_cache.put(p, LOADER_VERSION, questions, meta)
+    return questions, meta
 
+def _normalize_file_task(path: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Tarefa de worker: lê um arquivo, canoniza e normaliza as chaves das questões."""
+    questions, meta = _split_questions_and_meta(_read_any(Path(path)))
+    for q in questions:
+        _normalize_semicolon_keys_inplace(q)
+    return questions, meta
 
 # -----------------------------
-# I/O e canonicização
+# Leitura paralela (pool de processos)
 # -----------------------------
 
+def _resolve_workers(workers: Optional[int], n_tasks: int) -> int:
+    """None/1 → 1 (série); 0 → número de CPUs; nunca mais processos que tarefas."""
+    if workers is None:
+        return 1
+    n = (os.cpu_count() or 1) if workers == 0 else int(workers)
+    return max(1, min(n, n_tasks))
+
+def _run_tasks(fn, tasks: List[Tuple[Any, ...]], workers: Optional[int]) -> List[Any]:
+    """
+    Executa fn(*args) para cada tupla em 'tasks' e devolve os resultados **na ordem das tarefas**.
+    Com mais de um worker usa ProcessPoolExecutor; se o pool não puder ser criado/usado
+    (ambiente sem fork/spawn, executável congelado etc.), cai para a execução em série.
+    Exceções de fn (ex.: QuizLoadError) são propagadas normalmente.
+    """
+    n = _resolve_workers(workers, len(tasks))
+    if n > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=n) as ex:
+                return list(ex.map(fn, *zip(*tasks)))
+        except (BrokenProcessPool, NotImplementedError, PermissionError, pickle.PicklingError) as e:
+            logger.warning("Pool de processos indisponível (%s); lendo em série.", e)
+    return [fn(*args) for args in tasks]
+
+# chaves aceitas para a lista de questões, em ordem de prioridade
+_LIST_KEYS = ("questions", "questoes", "itens", "lista")
+
 def _normalize_dataset(obj: Union[Dict[str, Any], List[Any]]) -> Dict[str, Any]:
     """
     Converte qualquer forma suportada (dict/list) para o padrão:
         {"questions": List[dict], "meta": Dict[str, Any]}
     Regras:
-    - dict com chave 'questions' (list) → respeita e preserva meta (ou {}).
-    - dict sem 'questions' → trata como **uma questão única**.
+    - dict com chave 'questions' (ou questoes/itens/lista) do tipo list → respeita e preserva meta (ou {}).
+    - dict sem nenhuma dessas chaves → trata como **uma questão única**.
     - list → trata como **lista de questões**.
     """
     if isinstance(obj, dict):
-        if "questions" in obj and isinstance(obj["questions"], list):
-            return {"questions": obj["questions"], "meta": (obj.get("meta") or {})}
+        for k in _LIST_KEYS:
+            if isinstance(obj.get(k), list):
+                return {"questions": obj[k], "meta": (obj.get("meta") or {})}
         # dict = questão única
         return {"questions": [obj], "meta": {}}
 
@@ -95,11 +267,16 @@ def _normalize_dataset(obj: Union[Dict[str, Any], List[Any]]) -> Dict[str, Any]:
 
     raise QuizLoadError(f"Objeto JSON não normalizável (tipo {type(obj).__name__}).")
 
-def _read_any(source: Union[str, Path, bytes, Dict[str, Any], List[Any]]) -> Dict[str, Any]:
+def _read_any(
+    source: Union[str, Path, bytes, Dict[str, Any], List[Any]],
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
     """
     Lê de múltiplas origens (path, zip, diretório, json string/bytes, dict ou list)
     e **sempre** retorna no formato normalizado:
         {"questions": [...], "meta": {...}}
+    Diretórios e .zip podem ser lidos em paralelo ('workers', ver _run_tasks); a mescla
+    segue sempre a ordem dos arquivos/membros.
     """
     # 1) Já é estrutura em memória
     if isinstance(source, (dict, list)):
@@ -112,7 +289,7 @@ def _read_any(source: Union[str, Path, bytes, Dict[str, Any], List[Any]]) -> Dic
             if p.is_file():
                 if p.suffix.lower() == ".zip":
                     # Lê todos datasets do zip e mescla
-                    datasets: List[Union[Dict[str, Any], List[Any]]] = _read_zip(p)
+                    datasets: List[Union[Dict[str, Any], List[Any]]] = _read_zip(p, workers=workers)
                     merged_qs: List[Dict[str, Any]] = []
                     merged_meta: Dict[str, Any] = {}
                     for ds in datasets:
@@ -128,10 +305,10 @@ def _read_any(source: Union[str, Path, bytes, Dict[str, Any], List[Any]]) -> Dic
                 files = sorted(p.glob("*.json"))
                 if not files:
                     raise QuizLoadError(f"Nenhum .json no diretório '{p}'.")
+                datasets = _run_tasks(_read_json_task, [(str(fp), None) for fp in files], workers)
                 qs_all: List[Dict[str, Any]] = []
                 meta_merged: Dict[str, Any] = {}
-                for fp in files:
-                    data = _read_json_file(fp)
+                for data in datasets:
                     norm = _normalize_dataset(data)
                     qs_all.extend(norm["questions"])
                     meta_merged.update(norm.get("meta") or {})
@@ -161,17 +338,26 @@ def _read_json_file(p: Path) -> Union[Dict[str, Any], List[Any]]:
     except Exception as e:
         raise QuizLoadError(f"Falha ao ler JSON '{p}': {e}") from e
 
-def _read_zip(p: Path) -> List[Union[Dict[str, Any], List[Any]]]:
+def _read_zip(p: Path, workers: Optional[int] = None) -> List[Union[Dict[str, Any], List[Any]]]:
     try:
-        out: List[Union[Dict[str, Any], List[Any]]] = []
         with zipfile.ZipFile(p, "r") as z:
-            for name in z.namelist():
-                if name.lower().endswith(".json"):
-                    out.append(json.loads(z.read(name).decode("utf-8")))
-        return out
+            names = [name for name in z.namelist() if name.lower().endswith(".json")]
+        return _run_tasks(_read_json_task, [(str(p), name) for name in names], workers)
     except zipfile.BadZipFile as e:
         raise QuizLoadError(f"ZIP inválido '{p}': {e}") from e
 
+def _read_json_task(path: str, member: Optional[str]) -> Union[Dict[str, Any], List[Any]]:
+    """Tarefa de worker: JSON de um arquivo ou, se 'member' for dado, de um membro do .zip."""
+    if member is None:
+        return _read_json_file(Path(path))
+    try:
+        with zipfile.ZipFile(path, "r") as z:
+            return json.loads(z.read(member).decode("utf-8"))
+    except zipfile.BadZipFile:
+        raise
+    except Exception as e:
+        raise QuizLoadError(f"Falha ao ler JSON '{path}:{member}': {e}") from e
+
 def _split_questions_and_meta(data: Union[Dict[str, Any], List[Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Não conhece 'tipos': só extrai a lista e o meta quando houver.
@@ -181,7 +367,7 @@ def _split_questions_and_meta(data: Union[Dict[str, Any], List[Any]]) -> Tuple[L
     if isinstance(data, list):
         return [x for x in data if isinstance(x, dict)], {}
     if isinstance(data, dict):
-        for k in ("questions", "questoes", "itens", "lista"):
+        for k in _LIST_KEYS:
             v = data.get(k)
             if isinstance(v, list):
                 meta = data.get("meta") if isinstance(data.get("meta"), dict) else {}
@@ -193,6 +379,199 @@ def _split_questions_and_meta(data: Union[Dict[str, Any], List[Any]]) -> Tuple[L
     return [], {}
 
 
+# -----------------------------
+# Leitura incremental (iter_quiz)
+# -----------------------------
+
+_STREAM_CHUNK = 1 << 16  # 64 KiB por leitura
+_JSON_DECODER = json.JSONDecoder()
+_WS = " \t\r\n"
+
+def _iter_raw_questions(source: Union[str, Path, bytes, Dict[str, Any], List[Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Gera as questões *brutas* (sem normalizar) de qualquer origem aceita por _read_any.
+    Arquivos .json (soltos, em diretório ou em .zip) são lidos incrementalmente;
+    estruturas em memória e JSON em string/bytes caem no caminho tradicional.
+    """
+    if isinstance(source, (str, Path)):
+        p = Path(source)
+        if p.exists():
+            if p.is_file() and p.suffix.lower() == ".zip":
+                yield from _iter_zip_questions(p)
+                return
+            if p.is_file():
+                yield from _iter_json_file_questions(p)
+                return
+            files = sorted(p.glob("*.json"))
+            if not files:
+                raise QuizLoadError(f"Nenhum .json no diretório '{p}'.")
+            for fp in files:
+                yield from _iter_json_file_questions(fp)
+            return
+
+    questions, _ = _split_questions_and_meta(_read_any(source))
+    yield from questions
+
+def _iter_json_file_questions(p: Path) -> Iterator[Dict[str, Any]]:
+    try:
+        with p.open("r", encoding="utf-8") as fh:
+            yield from _iter_json_stream(fh)
+    except QuizLoadError as e:
+        raise QuizLoadError(f"Falha ao ler JSON '{p}': {e}") from e
+    except (OSError, UnicodeDecodeError) as e:
+        raise QuizLoadError(f"Falha ao ler JSON '{p}': {e}") from e
+
+def _iter_zip_questions(p: Path) -> Iterator[Dict[str, Any]]:
+    try:
+        with zipfile.ZipFile(p, "r") as z:
+            for name in z.namelist():
+                if not name.lower().endswith(".json"):
+                    continue
+                try:
+                    with z.open(name, "r") as fb:
+                        yield from _iter_json_stream(io.TextIOWrapper(fb, encoding="utf-8"))
+                except QuizLoadError as e:
+                    raise QuizLoadError(f"Falha ao ler JSON '{p}:{name}': {e}") from e
+    except zipfile.BadZipFile as e:
+        raise QuizLoadError(f"ZIP inválido '{p}': {e}") from e
+
+def _iter_json_stream(
+    fh: TextIO, chunk_size: int = _STREAM_CHUNK, with_offsets: bool = False
+) -> Iterator[Any]:
+    """
+    Percorre um documento JSON lendo blocos de 'chunk_size' caracteres e gera as questões
+    (dicts) do array de questões sem carregar o documento inteiro:
+      - raiz lista → cada elemento dict;
+      - raiz dict com chave de _LIST_KEYS → cada elemento dict desse array;
+      - raiz dict sem essas chaves → o próprio dict (questão única), como em _normalize_dataset.
+    Só o buffer corrente (≈ um bloco + a questão em leitura) fica em memória.
+
+    with_offsets=True gera (questão, início, fim) com as posições em **bytes** UTF-8 do
+    texto da questão no documento (abra o arquivo com newline="" para não traduzir \r\n).
+    """
+    buf = ""
+    pos = 0
+    eof = False
+    counted = 0   # buf[:counted] já está somado em nbytes
+    nbytes = 0
+
+    def byte_at(i: int) -> int:
+        # offset em bytes de buf[i] (i só cresce entre chamadas, exceto após fill)
+        nonlocal counted, nbytes
+        if with_offsets and i > counted:
+            nbytes += len(buf[counted:i].encode("utf-8"))
+            counted = i
+        return nbytes
+
+    def fill(min_extra: int = 0) -> bool:
+        # descarta o que já foi consumido e lê mais um bloco (cresce geometricamente)
+        nonlocal buf, pos, eof, counted
+        if eof:
+            return False
+        chunk = fh.read(max(chunk_size, min_extra))
+        byte_at(pos)
+        counted -= pos
+        buf = buf[pos:] + chunk
+        pos = 0
+        if not chunk:
+            eof = True
+        return bool(chunk)
+
+    def peek() -> str:
+        # próximo caractere não branco (sem consumi-lo); "" no fim do documento
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WS:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return ""
+
+    def expect(ch: str) -> None:
+        nonlocal pos
+        got = peek()
+        if got != ch:
+            raise QuizLoadError(f"JSON inválido: esperado '{ch}', encontrado '{got or 'EOF'}'.")
+        pos += 1
+
+    def value() -> Any:
+        # decodifica um valor completo; se o buffer acabar no meio, lê mais e tenta de novo
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                obj, end = _JSON_DECODER.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                if fill(len(buf)):
+                    continue
+                raise QuizLoadError(f"JSON inválido: {e}") from e
+            # números no fim do buffer podem estar truncados: confirma com mais dados
+            if end >= len(buf) and fill(len(buf)):
+                continue
+            pos = end
+            return obj
+
+    def array_items() -> Iterator[Tuple[Any, int, int]]:
+        nonlocal pos
+        expect("[")
+        if peek() == "]":
+            pos += 1
+            return
+        while True:
+            peek()
+            start = byte_at(pos)
+            item = value()
+            yield item, start, byte_at(pos)
+            sep = peek()
+            if sep == ",":
+                pos += 1
+                continue
+            expect("]")
+            return
+
+    first = peek()
+    if first == "[":
+        for item, start, end in array_items():
+            if isinstance(item, dict):
+                yield (item, start, end) if with_offsets else item
+    elif first == "{":
+        doc_start = byte_at(pos)
+        pos += 1
+        single: Dict[str, Any] = {}
+        streamed = False
+        if peek() == "}":
+            pos += 1
+        else:
+            while True:
+                key = value()
+                if not isinstance(key, str):
+                    raise QuizLoadError("JSON inválido: chave de objeto deve ser string.")
+                expect(":")
+                if not streamed and key in _LIST_KEYS and peek() == "[":
+                    streamed = True
+                    for item, start, end in array_items():
+                        if isinstance(item, dict):
+                            yield (item, start, end) if with_offsets else item
+                elif streamed:
+                    value()  # meta e demais chaves: não interessam às questões
+                else:
+                    single[key] = value()
+                if peek() == ",":
+                    pos += 1
+                    continue
+                expect("}")
+                break
+        if not streamed:
+            yield (single, doc_start, byte_at(pos)) if with_offsets else single
+    else:
+        # escalar na raiz: reaproveita a mensagem de erro do caminho tradicional
+        _normalize_dataset(value())
+
+    if peek():
+        raise QuizLoadError("JSON inválido: conteúdo extra após o documento.")
+
+
 # -----------------------------
 # Passo 1: normalizar "NOME;VALOR" (e "A x B")
 # -----------------------------
@@ -274,16 +653,7 @@ def _coerce_scalar(s: str) -> Any:
 # Passo 3: preparar alternativas
 # -----------------------------
 
-def _rng_for_item(seed: int, item: Dict[str, Any]) -> random.Random:
-    """
-    RNG determinístico por item (questão) a partir da seed e conteúdo estável.
-    """
-    base = str(seed)
-    salt = f"{item.get('id','')}|{item.get('enunciado','')}|{len(item.get('alternativas',[]) or [])}"
-    h = hashlib.sha256((base + "|" + salt).encode("utf-8")).hexdigest()
-    return random.Random(int(h[:16], 16))  # 64 bits
-
-def _prepare_alternativas_inplace(q: Dict[str, Any], *, seed: Optional[int]) -> None:
+def _prepare_alternativas_inplace(q: Dict[str, Any], *, seed: Optional[int], key: Optional[str] = None) -> None:
     """
     Embaralha (deterministicamente) a lista de alternativas da questão.
     - NÃO mescla 'correta' nas alternativas.
@@ -301,9 +671,9 @@ def _prepare_alternativas_inplace(q: Dict[str, Any], *, seed: Optional[int]) ->
     # copia para não embaralhar a mesma lista referenciada (por segurança)
     alts_shuffled = list(alts)
 
-    # Embaralhamento determinístico por item (id + enunciado + tamanho), baseado em seed
+    # Embaralhamento determinístico por questão (core.seeds; key = chave da questão original)
     if seed is not None and len(alts_shuffled) > 1:
-        rng = _rng_for_item(seed, q)
+        rng = rng_for(seed, key if key is not None else question_key(q), "alternativas")
         rng.shuffle(alts_shuffled)
 
     q["alternativas"] = alts_shuffled
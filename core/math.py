@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
-from typing import Dict, Any, Tuple
-import ast, re, random
+from typing import Dict, Any, FrozenSet, List, NamedTuple, Optional, Tuple
+from decimal import Decimal
+from functools import lru_cache
+import ast, operator, re, random
+
+from .seeds import rng_for_question
 
 ANGLE_RE = re.compile(r"<([^<>]+)?>")
 
@@ -16,29 +20,58 @@ def _parse_range_spec(spec_str: str) -> tuple[float, float, float]:
     Aceita apenas 'min:step:max' (floats, com sinal opcional). Ex.: '1:0.5:3'
     Retorna (min_v, step, max_v) como floats, com validações.
     """
+    min_d, step_d, max_d = _parse_range_decimal(spec_str)
+    return float(min_d), float(step_d), float(max_d)
+
+def _parse_range_decimal(spec_str: str) -> tuple[Decimal, Decimal, Decimal]:
+    """Igual a _parse_range_spec, mas preserva os números exatamente como escritos (Decimal)."""
     m = _RANGE_RE.match(spec_str or "")
     if not m:
         raise ValueError("Variável deve estar no formato 'min:step:max' (ex.: '1:0.5:3').")
-    min_v = float(m.group(1))
-    step  = float(m.group(2))
-    max_v = float(m.group(3))
+    min_v = Decimal(m.group(1))
+    step  = Decimal(m.group(2))
+    max_v = Decimal(m.group(3))
 
     if step <= 0:
         raise ValueError("step deve ser > 0.")
     if max_v < min_v:
         raise ValueError("max deve ser >= min.")
 
-    # (opcional) checagem de múltiplos — tolerância p/ float
-    span = (max_v - min_v) / step
-    if abs(round(span) - span) > 1e-9:
-        # Não é múltiplo exato — pode causar discrepância de grade
-        # Mantemos permissivo ou levanta erro; se quiser estrito, descomente:
-        # raise ValueError("max - min deve ser múltiplo de step.")
-        pass
-
+    # Se max - min não for múltiplo de step, a grade para no último múltiplo <= max
+    # (permissivo; para ser estrito: raise ValueError("max - min deve ser múltiplo de step.")).
     return min_v, step, max_v
 
 
+class Grid(NamedTuple):
+    """
+    Grade fechada min, min+step, ..., <= max em inteiros escalados (sem materializar a lista):
+    ponto i = (start + i*step) / scale, calculado de forma exata e arredondado uma única vez
+    para float. Funciona para faixas enormes (ex.: '0:0.001:10000') em memória O(1).
+    """
+    start: int
+    step: int
+    scale: int
+    n: int  # último índice válido (a grade tem n + 1 pontos)
+
+    def value(self, i: int) -> float:
+        # int / int do Python é corretamente arredondado (sem deriva acumulada)
+        return (self.start + i * self.step) / self.scale
+
+def make_grid(min_v: Decimal, step: Decimal, max_v: Decimal) -> Grid:
+    places = max(0, -min(d.as_tuple().exponent for d in (min_v, step, max_v)))
+    scale = 10 ** places
+    start, step_i, stop = (int(d.scaleb(places)) for d in (min_v, step, max_v))
+    return Grid(start, step_i, scale, (stop - start) // step_i)
+
+def grid_from_spec(spec_str: str) -> Grid:
+    """Grade exata de uma string 'min:step:max'."""
+    return make_grid(*_parse_range_decimal(spec_str))
+
+def draw_from_grid(grid: Grid, rng: random.Random) -> float:
+    """Sorteia um ponto da grade em O(1) (um único randrange sobre os índices)."""
+    return grid.value(rng.randrange(0, grid.n + 1))
+
+
 def _is_int(x: float) -> bool:
     return abs(x - int(x)) < 1e-9
 
@@ -46,99 +79,487 @@ def _fmt(x: float) -> str:
     return str(int(x)) if _is_int(x) else f"{x:.2f}"
 
 def choose_value(min_v: float, max_v: float, step: float, rng: random.Random) -> float:
-    # intervalo fechado com múltiplos exatos de step
-    n = round((max_v - min_v) / step)
-    # protege de casos flutuantes
-    values = [min_v + i * step for i in range(n + 1)]
-    # normaliza arredondando ao grid do step
-    values = [round(v / step) * step for v in values]
-    return values[rng.randrange(0, len(values))]
+    # intervalo fechado com múltiplos exatos de step (floats lidos pela representação decimal curta)
+    grid = make_grid(Decimal(repr(float(min_v))), Decimal(repr(float(step))), Decimal(repr(float(max_v))))
+    return draw_from_grid(grid, rng)
 
 ALLOWED = {
-    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Num, ast.Load, ast.Name,
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Load, ast.Name,
     ast.Add, ast.Sub, ast.Mult, ast.Div, ast.USub, ast.UAdd,
-    ast.Constant,  # py3.8+
-    ast.Expr,
-    ast.Pow, ast.Mod  # aceitos, mesmo que pouco usados
+    ast.Constant,
+    ast.Pow, ast.Mod,  # aceitos, mesmo que pouco usados
+    # comparações/lógica (usadas em 'restricoes'; resultado 1.0/0.0)
+    ast.Compare, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq,
+    ast.BoolOp, ast.And, ast.Or, ast.Not,
 }
 
+# Limites do avaliador (expressões vêm de bancos de terceiros). Sem laços nem chamadas, o
+# custo de uma avaliação é proporcional ao nº de nós, então MAX_OPS limita o total de operações.
+MAX_EXPR_LEN = 2000      # caracteres
+MAX_OPS = 500            # nós da AST
+MAX_DEPTH = 64           # aninhamento
+MAX_EXPONENT = 1024      # |expoente| em '**'
+MAX_INT_BITS = 4096      # magnitude dos inteiros intermediários
+# (floats: '*' satura em inf, mas '**' lança OverflowError, como no Python — e o caminho
+#  em lote de core.variables marca o sorteio como inválido nesse caso)
+
 def _check_ast(node: ast.AST):
+    count = 0
     for n in ast.walk(node):
         if isinstance(n, ast.Call):
             raise ValueError("Funções não permitidas nas expressões.")
         if type(n) not in ALLOWED:
-            # Parênteses são apenas tokens, não nós. Outros nós não são permitidos.
-            pass
+            raise ValueError(f"Elemento não permitido nas expressões: {type(n).__name__}.")
+        if isinstance(n, ast.Constant) and type(n.value) not in (int, float, bool):
+            raise ValueError(f"Constante não permitida nas expressões: {n.value!r}.")
+        count += 1
+    if count > MAX_OPS:
+        raise ValueError(f"Expressão muito longa ({count} nós; máximo {MAX_OPS}).")
 
-def safe_eval(expr: str, env: Dict[str, float]) -> float:
-    node = ast.parse(expr, mode="eval")
+def _too_big() -> ValueError:
+    return ValueError(f"Valor intermediário acima do limite ({MAX_INT_BITS} bits).")
+
+def _pow(a, b):
+    if abs(b) > MAX_EXPONENT:
+        raise ValueError(f"Expoente fora do limite (|{b}| > {MAX_EXPONENT}).")
+    if type(a) is int and type(b) is int and b > 0 and (a.bit_length() - 1) * b > MAX_INT_BITS:
+        raise _too_big()
+    r = a ** b
+    if isinstance(r, complex):
+        raise ValueError("Potência com resultado complexo.")
+    return r
+
+_BINOPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+    ast.Pow: _pow,
+}
+_CMPOPS = {
+    ast.Lt: lambda a, b: a < b,
+    ast.LtE: lambda a, b: a <= b,
+    ast.Gt: lambda a, b: a > b,
+    ast.GtE: lambda a, b: a >= b,
+    ast.Eq: lambda a, b: a == b,
+    ast.NotEq: lambda a, b: a != b,
+}
+_NOT_CONST = object()
+
+def _folded(fn, children):
+    """Dobra em constante um nó cujos filhos são constantes (se a avaliação não falhar)."""
+    if all(c is not _NOT_CONST for _, c in children):
+        try:
+            v = fn({})
+        except Exception:
+            return fn, _NOT_CONST  # o erro fica para a avaliação, como antes
+        return (lambda env: v), v
+    return fn, _NOT_CONST
+
+def _build(node: ast.AST, depth: int = 0):
+    """Converte a AST (já validada) em closures; retorna (fn(env), constante ou _NOT_CONST)."""
+    if depth > MAX_DEPTH:
+        raise ValueError(f"Expressão aninhada demais (máximo {MAX_DEPTH} níveis).")
+    depth += 1
+    if isinstance(node, ast.Expression):
+        return _build(node.body, depth)
+    if isinstance(node, ast.Constant):
+        v = node.value
+        return (lambda env: v), v
+    if isinstance(node, ast.Name):
+        name = node.id
+
+        def fn(env):
+            try:
+                return env[name]
+            except KeyError:
+                raise NameError(f"name '{name}' is not defined") from None
+        return fn, _NOT_CONST
+    if isinstance(node, ast.UnaryOp):
+        child = _build(node.operand, depth)
+        f = child[0]
+        if isinstance(node.op, ast.USub):
+            fn = lambda env: -f(env)
+        elif isinstance(node.op, ast.UAdd):
+            fn = lambda env: +f(env)
+        else:
+            fn = lambda env: not f(env)
+        return _folded(fn, [child])
+    if isinstance(node, ast.BinOp):
+        left, right = _build(node.left, depth), _build(node.right, depth)
+        op, lf, rf = _BINOPS[type(node.op)], left[0], right[0]
+        ln = node.left.id if isinstance(node.left, ast.Name) else None
+        rn = node.right.id if isinstance(node.right, ast.Name) else None
+        lc, rc = left[1], right[1]
+        # folhas (variável/constante) lidas direto no nó: metade das chamadas no caso comum
+        if ln is not None and rn is not None:
+            def fn(env):
+                try:
+                    r = op(env[ln], env[rn])
+                except KeyError as e:
+                    raise NameError(f"name '{e.args[0]}' is not defined") from None
+                if type(r) is int and r.bit_length() > MAX_INT_BITS:
+                    raise _too_big()
+                return r
+        elif ln is not None and rc is not _NOT_CONST:
+            def fn(env):
+                try:
+                    a = env[ln]
+                except KeyError:
+                    raise NameError(f"name '{ln}' is not defined") from None
+                r = op(a, rc)
+                if type(r) is int and r.bit_length() > MAX_INT_BITS:
+                    raise _too_big()
+                return r
+        elif lc is not _NOT_CONST and rn is not None:
+            def fn(env):
+                try:
+                    b = env[rn]
+                except KeyError:
+                    raise NameError(f"name '{rn}' is not defined") from None
+                r = op(lc, b)
+                if type(r) is int and r.bit_length() > MAX_INT_BITS:
+                    raise _too_big()
+                return r
+        else:
+            def fn(env):
+                r = op(lf(env), rf(env))
+                if type(r) is int and r.bit_length() > MAX_INT_BITS:
+                    raise _too_big()
+                return r
+        return _folded(fn, [left, right])
+    if isinstance(node, ast.Compare):
+        first = _build(node.left, depth)
+        rest = [_build(c, depth) for c in node.comparators]
+        lf = first[0]
+        pairs = [(_CMPOPS[type(op)], c[0]) for op, c in zip(node.ops, rest)]
+
+        def fn(env):
+            left = lf(env)
+            for op, rf in pairs:
+                right = rf(env)
+                if not op(left, right):
+                    return False
+                left = right
+            return True
+        return _folded(fn, [first] + rest)
+    if isinstance(node, ast.BoolOp):
+        children = [_build(v, depth) for v in node.values]
+        fns = [c[0] for c in children]
+        is_and = isinstance(node.op, ast.And)
+
+        def fn(env):
+            # devolve um dos operandos (curto-circuito), como 'and'/'or' do Python
+            v = fns[0](env)
+            for f in fns[1:]:
+                if (not v) if is_and else v:
+                    return v
+                v = f(env)
+            return v
+        return _folded(fn, children)
+    raise ValueError(f"Elemento não permitido nas expressões: {type(node).__name__}.")
+
+# Cache LRU das expressões já validadas/compiladas (a mesma expressão se repete entre
+# questões e seeds). Só expressões válidas entram: erros são recalculados a cada chamada.
+EXPR_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=EXPR_CACHE_SIZE)
+def _compile_expr(expr: str):
+    """
+    Valida e compila a expressão num avaliador próprio (closures sobre a AST, sem eval),
+    com constantes pré-calculadas e os limites acima.
+    """
+    if len(expr) > MAX_EXPR_LEN:
+        raise ValueError(f"Expressão muito longa ({len(expr)} caracteres; máximo {MAX_EXPR_LEN}).")
+    try:
+        node = ast.parse(expr, mode="eval")
+    except (RecursionError, MemoryError):
+        raise ValueError("Expressão aninhada demais.") from None
     _check_ast(node)
-    code = compile(node, "<expr>", "eval")
-    return float(eval(code, {"__builtins__": {}}, dict(env)))
+    return _build(node)[0]
+
+def expr_cache_info():
+    """Contadores do cache de expressões (hits, misses, maxsize, currsize) para profiling."""
+    return _compile_expr.cache_info()
+
+def expr_cache_clear() -> None:
+    _compile_expr.cache_clear()
+
+def safe_eval(expr: str, env: Dict[str, float]) -> float:
+    code = _compile_expr(expr)
+    return _eval_code(code, env)
+
+def _eval_code(code, env: Dict[str, float]) -> float:
+    return float(code(env))
+
+class TextTemplate:
+    """
+    Texto com <...> compilado uma única vez: lista de trechos literais (str) intercalados
+    com "slots" (expressão, código compilado). render(env) só avalia os slots e junta as
+    partes, com o mesmo resultado de ANGLE_RE.sub + safe_eval (variável pura → valor do env;
+    senão a expressão; '<>' → ''). Expressões inválidas só falham no render, como antes.
+    """
+    __slots__ = ("text", "parts", "has_slots", "names")
+
+    def __init__(self, text: str):
+        self.text = text
+        parts = []
+        pos = 0
+        for m in ANGLE_RE.finditer(text):
+            if m.start() > pos:
+                parts.append(text[pos:m.start()])
+            inner = (m.group(1) or "").strip()
+            if inner:
+                try:
+                    code = _compile_expr(inner)
+                except Exception:
+                    code = None  # erro é relançado no render por safe_eval
+                parts.append((inner, code))
+            pos = m.end()
+        if pos < len(text):
+            parts.append(text[pos:])
+        self.parts = tuple(parts)
+        self.has_slots = any(not isinstance(part, str) for part in parts)
+        # nomes citados nos slots (variáveis/resoluções que o texto realmente usa)
+        self.names = frozenset().union(*(_ident_names(part[0]) for part in parts if not isinstance(part, str)))
+
+    def render(self, env: Dict[str, float]) -> str:
+        if not self.has_slots:
+            return "".join(self.parts)
+        out = []
+        for part in self.parts:
+            if isinstance(part, str):
+                out.append(part)
+                continue
+            inner, code = part
+            if inner in env:
+                out.append(_fmt(env[inner]))
+            elif code is None:
+                out.append(_fmt(safe_eval(inner, env)))
+            else:
+                out.append(_fmt(_eval_code(code, env)))
+        return "".join(out)
+
+TEMPLATE_CACHE_SIZE = 8192
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(text: str) -> TextTemplate:
+    """TextTemplate compartilhado por texto (mesmo campo em várias seeds/questões/alvos)."""
+    return TextTemplate(text)
 
 def replace_angles(template: str, env: Dict[str, float]) -> str:
-    def repl(m: re.Match) -> str:
-        inner = (m.group(1) or "").strip()
-        if not inner:
-            return ""
-        # variável pura
-        if inner in env:
-            val = env[inner]
-            return _fmt(val)
-        # expressão (pode ser VAR, ou operação usando VAR/RES)
-        val = safe_eval(inner, env)
-        return _fmt(val)
-    return ANGLE_RE.sub(repl, template)
-
-def resolve_all(question: Dict[str, Any], seed: int|None) -> Tuple[Dict[str, Any], Dict[str, float]]:
-    """Gera valores para variáveis (intervalo fechado, múltiplos de step), avalia resoluções na ordem
-    e substitui <...> em enunciado, alternativas, correta, obs e resoluções posteriores.
+    if "<" not in template:
+        return template
+    return compile_template(template).render(env)
+
+# -----------------------------
+# Plano de avaliação das resoluções (DAG)
+# -----------------------------
+
+# identificadores Unicode (área, ΔT...), como os do Python; usado quando a expressão
+# ainda tem <...> e não é Python válido
+_IDENT_RE = re.compile(r"(?<![\w.])[^\W\d]\w*")
+
+@lru_cache(maxsize=EXPR_CACHE_SIZE)
+def _ident_names(expr: str) -> FrozenSet[str]:
+    """Identificadores citados numa expressão (inclusive dentro de <...>); superconjunto seguro."""
+    try:
+        node = ast.parse(expr, mode="eval")
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return frozenset(_IDENT_RE.findall(expr))
+    return frozenset(n.id for n in ast.walk(node) if isinstance(n, ast.Name))
+
+def _text_names(x: Any) -> FrozenSet[str]:
+    if isinstance(x, str):
+        return compile_template(x).names if "<" in x else frozenset()
+    if isinstance(x, list):
+        return frozenset().union(*(_text_names(i) for i in x))
+    if isinstance(x, dict):
+        return frozenset().union(*(_text_names(v) for v in x.values()))
+    return frozenset()
+
+# campos em que resolve_all substitui <...> (os nomes usados neles definem o que avaliar)
+_TEXT_FIELDS = ("enunciado", "correta", "obs", "alternativas", "afirmacoes", "resolucoes")
+
+PLAN_CACHE_SIZE = 1024
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def resolution_plan(
+    res_items: Tuple[Tuple[str, str], ...],
+    var_names: FrozenSet[str],
+    used: Optional[FrozenSet[str]] = None,
+) -> Tuple[Tuple[str, str, Tuple[str, ...]], ...]:
+    """
+    Analisa as resoluções uma vez (cache por assinatura da questão) e devolve, em ordem
+    topológica, (chave, expressão, dependências) só das resoluções alcançáveis a partir
+    de 'used' (None = todas).
+
+    Uma referência a NOME dentro da resolução R aponta para a resolução NOME quando ela foi
+    declarada antes de R (como na avaliação sequencial) ou quando não existe variável NOME
+    (referência adiante, antes um erro); senão aponta para a variável. Ciclos → ValueError.
+    """
+    pos = {k: i for i, (k, _) in enumerate(res_items)}
+    deps: Dict[str, Tuple[str, ...]] = {}
+    for i, (key, expr) in enumerate(res_items):
+        deps[key] = tuple(sorted(
+            name for name in _ident_names(expr)
+            if name in pos and (pos[name] < i or name not in var_names)
+        ))
+
+    roots = [k for k, _ in res_items] if used is None else [k for k, _ in res_items if k in used]
+    order: List[str] = []
+    state: Dict[str, int] = {}  # 1 = visitando, 2 = pronto
+
+    def visit(key: str, path: List[str]) -> None:
+        st = state.get(key)
+        if st == 2:
+            return
+        if st == 1:
+            cycle = path[path.index(key):] + [key]
+            raise ValueError("Resoluções com dependência circular: " + " -> ".join(cycle))
+        state[key] = 1
+        for d in deps[key]:
+            visit(d, path + [key])
+        state[key] = 2
+        order.append(key)
+
+    for key in roots:
+        visit(key, [])
+    exprs = dict(res_items)
+    return tuple((k, exprs[k], deps[k]) for k in order)
+
+def _evaluate_plan(plan, env_vars: Dict[str, float]) -> Dict[str, float]:
+    """Avalia as resoluções do plano; cada uma vê as variáveis + as resoluções das quais depende."""
+    values: Dict[str, float] = {}
+    for key, expr, deps in plan:
+        local = env_vars
+        if deps:
+            local = dict(env_vars)
+            local.update((d, values[d]) for d in deps)
+        values[key] = safe_eval(replace_angles(expr, local), local)
+    return values
+
+# -----------------------------
+# Restrições ('restricoes')
+# -----------------------------
+
+class Restricoes(NamedTuple):
+    expressoes: Tuple[str, ...]      # cada uma deve dar != 0 (ex.: "TEMP > 0", "RM != R0")
+    alternativas_distintas: bool     # alternativas (já formatadas) distintas entre si
+    correta_distinta: bool           # correta (formatada) diferente de todas as alternativas
+
+def restricoes_spec(question: Dict[str, Any]) -> Optional[Restricoes]:
+    """
+    Lê o bloco opcional 'restricoes' da questão:
+      - lista de expressões: ["TEMP > 0", "R0 != RM"]
+      - ou dict: {"expressoes": [...], "alternativas_distintas": true, "correta_distinta": true}
+    Retorna None quando não houver restrições.
+    """
+    raw = question.get("restricoes")
+    if not raw:
+        return None
+    if isinstance(raw, str):
+        raw = [raw]
+    if isinstance(raw, list):
+        return Restricoes(tuple(str(e) for e in raw), False, False)
+    if isinstance(raw, dict):
+        exprs = raw.get("expressoes") or []
+        if isinstance(exprs, str):
+            exprs = [exprs]
+        return Restricoes(
+            tuple(str(e) for e in exprs),
+            bool(raw.get("alternativas_distintas")),
+            bool(raw.get("correta_distinta")),
+        )
+    raise ValueError("'restricoes' deve ser lista de expressões ou objeto {expressoes, alternativas_distintas, correta_distinta}.")
+
+def resolve_all(question: Dict[str, Any], seed: int|None, lazy: bool = True) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Gera valores para variáveis (intervalo fechado, múltiplos de step), avalia resoluções pelo
+    plano de dependências (resolution_plan) e substitui <...> em enunciado, alternativas, correta,
+    obs e resoluções. Com lazy=True só são avaliadas as resoluções usadas (direta ou indiretamente)
+    nos textos; lazy=False avalia todas.
+    Com 'restricoes', usa a primeira seed candidata (a própria seed primeiro) cujo sorteio
+    satisfaz as restrições (ver core.variables.first_valid_seed).
+    O RNG das variáveis é o da questão (core.seeds: seed + id/enunciado + "variaveis"), então
+    questões diferentes com a mesma seed têm sorteios independentes.
     Retorna (question_resolved, env_final)."""
-    rng = random.Random(seed)
-    q = json_clone(question)
+    if question.get("restricoes"):
+        from .variables import first_valid_seed  # import tardio: variables depende deste módulo
+        seed = first_valid_seed(question, seed)
+    rng = rng_for_question(seed, question, "variaveis")
 
     env: Dict[str, float] = {}
     # 1) variáveis
-    vars_def = (q.get("variaveis") or {})
+    vars_def = (question.get("variaveis") or {})
     for name, spec in vars_def.items():
         if not isinstance(spec, str):
             # Enforce estrito: apenas string "min:step:max"
             raise ValueError(f"Variável '{name}': use string no formato 'min:step:max'.")
-        min_v, step, max_v = _parse_range_spec(spec)
-        env[name] = choose_value(min_v, max_v, step, rng)
+        env[name] = draw_from_grid(grid_from_spec(spec), rng)
 
-    # 2) resoluções (na ordem declarada)
+    return resolve_with_env(question, env, lazy=lazy)
+
+def resolve_with_env(question: Dict[str, Any], env_vars: Dict[str, float], lazy: bool = True) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Passos 2 e 3 de resolve_all para valores de variáveis já escolhidos (ex.: enumeração da grade).
+    Copy-on-write: a questão resolvida é um dict novo, mas listas/dicts sem <...> (imagens,
+    variaveis, obs/afirmacoes fixas...) são os **mesmos objetos** do template — trate-os como
+    somente leitura (ou copie antes de alterar).
+    Retorna (question_resolved, env_final)."""
+    q = dict(question)
+    env: Dict[str, float] = dict(env_vars)
+
+    # 2) resoluções (ordem topológica; só as necessárias quando lazy)
     res_def = (q.get("resolucoes") or {})
-    for key, expr in res_def.items():
-        expr_r = replace_angles(str(expr), env)
-        env[key] = safe_eval(expr_r, env)
+    if res_def:
+        used = None
+        if lazy:
+            used = frozenset().union(*(_text_names(q[f]) for f in _TEXT_FIELDS if f in q))
+        plan = resolution_plan(
+            tuple((k, str(v)) for k, v in res_def.items()), frozenset(env), used
+        )
+        values = _evaluate_plan(plan, env)
+        # env final na ordem declarada (resolução com nome de variável a sobrescreve)
+        env.update((k, values[k]) for k in res_def if k in values)
 
     # 3) substituição em todos os campos de texto
     def sub(x):
-        if isinstance(x, str): return replace_angles(x, env)
-        if isinstance(x, list): return [sub(i) for i in x]
-        if isinstance(x, dict): return {k: sub(v) for k,v in x.items()}
-        return x
+        return _sub_shared(x, env)
 
     for field in ["enunciado","correta","obs"]:
         if field in q and isinstance(q[field], str):
             q[field] = sub(q[field])
     if "alternativas" in q and isinstance(q["alternativas"], list):
-        q["alternativas"] = [sub(a) for a in q["alternativas"]]
+        q["alternativas"] = sub(q["alternativas"])
     if "afirmacoes" in q and isinstance(q["afirmacoes"], dict):
-        q["afirmacoes"] = {k: sub(v) for k,v in q["afirmacoes"].items()}
+        q["afirmacoes"] = sub(q["afirmacoes"])
     if "resolucoes" in q and isinstance(q["resolucoes"], dict):
-        q["resolucoes"] = {k: sub(v) for k,v in q["resolucoes"].items()}
+        q["resolucoes"] = sub(q["resolucoes"])
 
     # Apply substitution to obs (list or string)
     if "obs" in q:
         if isinstance(q["obs"], list):
-            q["obs"] = [sub(o) if isinstance(o, str) else o for o in q["obs"]]
+            q["obs"] = _shared_list(q["obs"], [sub(o) if isinstance(o, str) else o for o in q["obs"]])
         elif isinstance(q["obs"], str):
             q["obs"] = sub(q["obs"]) 
 
     return q, env
 
+def _shared_list(old: list, new: list) -> list:
+    return old if all(a is b for a, b in zip(old, new)) else new
+
+def _sub_shared(x, env: Dict[str, float]):
+    """Substitui <...> recursivamente devolvendo o **mesmo** objeto quando nada muda
+    (strings sem '<' já voltam idênticas de replace_angles), para compartilhar subárvores."""
+    if isinstance(x, str):
+        return replace_angles(x, env)
+    if isinstance(x, list):
+        return _shared_list(x, [_sub_shared(i, env) for i in x])
+    if isinstance(x, dict):
+        new = {k: _sub_shared(v, env) for k, v in x.items()}
+        return x if all(new[k] is v for k, v in x.items()) else new
+    return x
+
 def json_clone(x):  # simples cópia profunda via JSON
     import json
     return json.loads(json.dumps(x))
\ No newline at end of file
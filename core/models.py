@@ -0,0 +1,257 @@
+# core/models.py
+# -*- coding: utf-8 -*-
+"""
+Modelos compactos do pipeline (dataclasses com __slots__) e conversores a partir dos
+dicts do loader.
+
+- Question guarda os campos que os geradores usam; chaves desconhecidas vão para 'extra'.
+  As chaves auxiliares dos dicts viram atributos: '_base_dir' → base_dir,
+  'alternativas_firstrow' ('alternativas;K') → colunas.
+- Com __slots__ cada objeto ocupa bem menos memória que o dict equivalente (sem tabela
+  de hash por instância), o que importa em bancos com 100k questões. Para isso a Question
+  guarda alternativas/obs como tuplas de str (tupla vazia é compartilhada), campos vazios
+  como None e 'dificuldade' internada; Alternative é criada sob demanda (alternatives()).
+- question_from_dict/questions_from_dicts são os conversores rápidos; Question.to_dict()
+  volta ao formato do loader para os geradores que ainda trabalham com dicts.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import re
+import sys
+
+# dataclass(slots=True) exige Python 3.10; antes disso as classes continuam funcionando, sem slots
+_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+IMG_EXTS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.svg', '.pdf')
+_SIZE_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)x(\d+(?:\.\d+)?)\s*$')
+
+
+class Tipo(IntEnum):
+    TEXTO = 1       # alternativas de texto
+    IMAGEM = 2      # alternativas com imagens
+    NUMERICA = 3    # paramétrica (variaveis/resolucoes)
+    AFIRMACOES = 4  # afirmativas I, II, III...
+
+    @classmethod
+    def infer(cls, q: Dict[str, Any]) -> "Tipo":
+        """'tipo' declarado (1–4) ou, na falta dele, deduzido do conteúdo da questão."""
+        t = q.get("tipo")
+        found = cls._value2member_map_.get(t)
+        if found is not None:
+            return found
+        try:
+            return cls(int(t))
+        except (TypeError, ValueError):
+            pass
+        afirm = q.get("afirmacoes")
+        if isinstance(afirm, dict) and afirm:
+            return cls.AFIRMACOES
+        alts = q.get("alternativas")
+        values = (list(alts) if isinstance(alts, list) else []) + [q.get("correta")]
+        if any(is_image_path(v) for v in values):
+            return cls.IMAGEM
+        if q.get("variaveis"):
+            return cls.NUMERICA
+        return cls.TEXTO
+
+
+def is_image_path(x: Any) -> bool:
+    """True para 'caminho.ext' ou 'caminho.ext;LxA' com extensão de imagem conhecida."""
+    if not isinstance(x, str):
+        return False
+    return x.split(';', 1)[0].strip().lower().endswith(IMG_EXTS)
+
+
+@dataclass(frozen=True, **_SLOTS)
+class ImageSpec:
+    """Imagem 'caminho;LxA' (mm); sem tamanho → width_mm/height_mm = None."""
+    path: str
+    width_mm: Optional[float] = None
+    height_mm: Optional[float] = None
+
+    @classmethod
+    def parse(cls, s: Any) -> "ImageSpec":
+        if isinstance(s, ImageSpec):
+            return s
+        s = "" if s is None else str(s)
+        if ';' in s:
+            path, size = s.split(';', 1)
+            m = _SIZE_RE.match(size.strip())
+            if m:
+                return cls(path.strip(), float(m.group(1)), float(m.group(2)))
+            return cls(path.strip())
+        return cls(s.strip())
+
+    def to_spec(self) -> str:
+        if self.width_mm and self.height_mm:
+            return f"{self.path};{self.width_mm:g}x{self.height_mm:g}"
+        return self.path
+
+    def resolve(self, base_dir: Optional[str] = None) -> Path:
+        return Path(base_dir, self.path) if base_dir else Path(self.path)
+
+
+@dataclass(**_SLOTS)
+class Alternative:
+    """Alternativa (texto ou imagem); 'correct' marca a correta depois de inserida na lista."""
+    text: str
+    image: Optional[ImageSpec] = None
+    correct: bool = False
+
+    @classmethod
+    def from_value(cls, v: Any, correct: bool = False) -> "Alternative":
+        text = "" if v is None else str(v)
+        return cls(text, ImageSpec.parse(text) if is_image_path(text) else None, correct)
+
+    @property
+    def is_image(self) -> bool:
+        return self.image is not None
+
+
+@dataclass(**_SLOTS)
+class Question:
+    id: Any
+    tipo: Tipo
+    enunciado: str = ""
+    alternativas: Tuple[str, ...] = ()   # sem a correta (como no loader)
+    correta: Optional[str] = None
+    imagens: Tuple[ImageSpec, ...] = ()
+    afirmacoes: Optional[Dict[str, str]] = None
+    subenunciado: str = ""
+    obs: Tuple[str, ...] = ()
+    dificuldade: Optional[str] = None
+    colunas: Optional[int] = None        # 'alternativas;K'
+    base_dir: Optional[str] = None       # diretório do JSON (caminhos de imagem)
+    variaveis: Optional[Dict[str, Any]] = None
+    resolucoes: Optional[Dict[str, Any]] = None
+    restricoes: Any = None
+    extra: Optional[Dict[str, Any]] = None
+
+    def alternatives(self) -> List[Alternative]:
+        """Alternativas como objetos (sem a correta)."""
+        return [Alternative.from_value(a) for a in self.alternativas]
+
+    def correct_alternative(self) -> Optional[Alternative]:
+        return None if self.correta is None else Alternative.from_value(self.correta, correct=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dict no formato do loader (chaves de 'extra' incluídas)."""
+        d: Dict[str, Any] = {"id": self.id, "tipo": int(self.tipo), "enunciado": self.enunciado}
+        d["alternativas"] = list(self.alternativas)
+        if self.correta is not None:
+            d["correta"] = self.correta
+        if self.imagens:
+            d["imagens"] = [img.to_spec() for img in self.imagens]
+        if self.afirmacoes:
+            d["afirmacoes"] = dict(self.afirmacoes)
+        if self.subenunciado:
+            d["subenunciado"] = self.subenunciado
+        if self.obs:
+            d["obs"] = list(self.obs)
+        if self.dificuldade is not None:
+            d["dificuldade"] = self.dificuldade
+        if self.colunas is not None:
+            d["alternativas_firstrow"] = self.colunas
+        if self.base_dir is not None:
+            d["_base_dir"] = self.base_dir
+        for k in ("variaveis", "resolucoes", "restricoes"):
+            v = getattr(self, k)
+            if v:
+                d[k] = v
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+
+_KNOWN_KEYS = frozenset({
+    "id", "tipo", "enunciado", "alternativas", "correta", "imagens", "afirmacoes",
+    "subenunciado", "obs", "dificuldade", "alternativas_firstrow", "_base_dir",
+    "variaveis", "resolucoes", "restricoes",
+})
+
+
+_EMPTY = (None, "", [], {})
+
+
+def _as_int(x: Any) -> Optional[int]:
+    try:
+        return int(x)
+    except (TypeError, ValueError):
+        return None
+
+
+def _str_tuple(x: Any) -> Tuple[str, ...]:
+    if isinstance(x, str):
+        return (x,) if x.strip() else ()
+    if isinstance(x, (list, tuple)) and x:
+        return tuple(v if isinstance(v, str) else ("" if v is None else str(v)) for v in x)
+    return ()
+
+
+def question_from_dict(q: Dict[str, Any], base_dir: Optional[str] = None) -> Question:
+    """Converte um dict do loader (normalizado, resolvido ou não) em Question."""
+    get = q.get
+    correta = get("correta")
+    imgs = get("imagens")
+    if isinstance(imgs, str):
+        imgs = [imgs]
+    afirm = get("afirmacoes")
+    dif = get("dificuldade")
+    # extras vazios (ex.: "imagem": "" dos modelos do editor) não são guardados
+    extra = {k: v for k, v in q.items() if k not in _KNOWN_KEYS and v not in _EMPTY}
+    return Question(
+        id=get("id"),
+        tipo=Tipo.infer(q),
+        enunciado=str(get("enunciado") or ""),
+        alternativas=_str_tuple(get("alternativas")) if isinstance(get("alternativas"), list) else (),
+        correta=None if correta is None or correta == "" else str(correta),
+        imagens=tuple(ImageSpec.parse(i) for i in imgs if i) if isinstance(imgs, list) and imgs else (),
+        afirmacoes={str(k): str(v) for k, v in afirm.items()} if isinstance(afirm, dict) and afirm else None,
+        subenunciado=str(get("subenunciado") or "").strip(),
+        obs=_str_tuple(get("obs")),
+        dificuldade=sys.intern(dif) if isinstance(dif, str) else dif,
+        colunas=_as_int(get("alternativas_firstrow")),
+        base_dir=get("_base_dir") or base_dir,
+        variaveis=get("variaveis") or None,
+        resolucoes=get("resolucoes") or None,
+        restricoes=get("restricoes") or None,
+        extra=extra or None,
+    )
+
+
+def questions_from_dicts(
+    questions: Iterable[Dict[str, Any]], base_dir: Optional[str] = None
+) -> List[Question]:
+    return [question_from_dict(q, base_dir) for q in questions if isinstance(q, dict)]
+
+
+@dataclass(**_SLOTS)
+class RenderOptions:
+    """Opções de core.pipeline.render_all."""
+    # "beamer" | "docx"/"testgen" | "preview"; vários alvos: "beamer,docx", tupla ou "all"
+    target: Any = "preview"
+    shuffle_questions: bool = False
+    shuffle_alternatives: bool = False
+    seed: Optional[int] = None
+    base_dir: Optional[str] = None       # padrão: diretório do JSON de origem
+
+
+@dataclass(**_SLOTS)
+class RenderedQuestion:
+    """
+    Questão resolvida e pronta para os geradores: 'alternativas' já inclui a correta, na
+    posição 'correta' (índice; -1 se a questão não tiver correta). Em 'extra' ficam os
+    dados auxiliares (afirmacoes_labeled, subenunciado, obs, colunas, base_dir...) e a
+    saída de cada alvo pedido, na chave do alvo.
+    """
+    id: Any
+    tipo: Tipo
+    enunciado: str
+    imagens: List[ImageSpec]
+    alternativas: List[Alternative]
+    correta: int
+    extra: Dict[str, Any]
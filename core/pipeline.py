@@ -0,0 +1,232 @@
+# core/pipeline.py
+# -*- coding: utf-8 -*-
+"""
+Motor único de renderização: cada questão é lida, resolvida e tem a correta posicionada
+**uma vez**, e o resultado é distribuído para um ou mais alvos na mesma passada.
+
+    render_all(raw, RenderOptions(target="preview", seed=42))
+    for r in iter_render("banco.json", RenderOptions(target="beamer,docx")): ...
+
+- Origem: qualquer coisa aceita pelo loader (lista/dict, .json, diretório, .zip).
+  Sem shuffle_questions a leitura é em streaming (iter_render gera questão a questão).
+- shuffle_questions: ordem embaralhada com random.Random(seed) (mesma regra do json2docx).
+- shuffle_alternatives: mesmo embaralhamento por questão do loader (só com seed).
+- A correta entra em posição determinística por questão (place_correta), a mesma usada
+  pelo beamer e pelo preview.
+- Alvos: "beamer" (frames LaTeX), "docx"/"testgen" (runs do DOCX), "preview" (texto);
+  a saída de cada alvo vai em RenderedQuestion.extra[alvo].
+- 'variaveis' no formato {"min", "max", "step"} são aceitas aqui e convertidas para
+  "min:step:max" antes da resolução.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import logging
+import random
+
+from .loader import _iter_raw_questions, _load_normalized, _normalize_semicolon_keys_inplace
+from .math import resolve_all
+from .models import Alternative, ImageSpec, RenderedQuestion, RenderOptions, Tipo
+from .seeds import question_key, rng_for, rng_for_question
+
+logger = logging.getLogger(__name__)
+
+_ABC = "abcdefghijklmnopqrstuvwxyz"
+_ROMAN = ("I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X")
+
+
+# -----------------------------
+# Peças compartilhadas pelos geradores
+# -----------------------------
+
+def alt_label(i: int) -> str:
+    """Rótulo da alternativa i: a), b), ... e depois 27), 28)..."""
+    return _ABC[i] + ")" if i < len(_ABC) else f"{i+1})"
+
+
+def insert_correta(alts: Sequence[Any], correta: Any, rng: random.Random) -> Tuple[List[Any], int]:
+    """
+    Insere 'correta' numa posição sorteada de uma cópia de 'alts'. Se ela já estiver na
+    lista (comparando como str), a primeira ocorrência é removida antes.
+    Retorna (alternativas, índice da correta).
+    """
+    out = list(alts)
+    pos = rng.randrange(0, len(out) + 1)
+    try:
+        existing = next(i for i, a in enumerate(out) if str(a) == str(correta))
+        out.pop(existing)
+        if existing < pos:
+            pos -= 1  # ajuste se removemos antes da posição escolhida
+    except StopIteration:
+        pass
+    out.insert(pos, correta)
+    return out, pos
+
+
+def place_correta(q: Dict[str, Any], seed: Optional[int]) -> Tuple[List[Any], int]:
+    """
+    Alternativas da questão com a correta em posição determinística por questão
+    (core.seeds, propósito "correta"; seed None vale 0). Sem correta → (cópia, -1).
+    """
+    alts = q.get("alternativas", []) or []
+    correta = q.get("correta", None)
+    if correta is None or correta == "":
+        return list(alts), -1
+    rng = rng_for_question(0 if seed is None else seed, q, "correta")
+    return insert_correta(alts, correta, rng)
+
+
+# -----------------------------
+# Alvos
+# -----------------------------
+
+def _beamer_target(q: Dict[str, Any], alts: List[Any], idx: int, base_dir: Optional[str], seq: int) -> str:
+    from beamer.generator import question_frames
+    return "\n".join(question_frames(q, alts, idx, base_dir))
+
+
+def _docx_target(q: Dict[str, Any], alts: List[Any], idx: int, base_dir: Optional[str], seq: int) -> List[Dict[str, Any]]:
+    from testgen.generator import _compose_docx_block
+    return _compose_docx_block(dict(q, alternativas=alts, _base_dir=base_dir or ""), seq)
+
+
+def _preview_target(q: Dict[str, Any], alts: List[Any], idx: int, base_dir: Optional[str], seq: int) -> str:
+    from editor.preview import question_lines
+    return "\n".join(question_lines(q, alts, idx, base_dir))
+
+
+TARGETS: Dict[str, Callable[..., Any]] = {
+    "beamer": _beamer_target,
+    "docx": _docx_target,
+    "testgen": _docx_target,
+    "preview": _preview_target,
+}
+
+
+def _targets(target: Any) -> Tuple[str, ...]:
+    if target is None:
+        return ()
+    if isinstance(target, str):
+        if target.strip().lower() == "all":
+            return ("beamer", "docx", "preview")
+        names = [t.strip().lower() for t in target.split(",") if t.strip()]
+    else:
+        names = [str(t).strip().lower() for t in target]
+    unknown = [t for t in names if t not in TARGETS]
+    if unknown:
+        raise ValueError(f"Alvo(s) desconhecido(s): {', '.join(unknown)} (use {', '.join(TARGETS)}).")
+    return tuple(dict.fromkeys(names))
+
+
+# -----------------------------
+# Motor
+# -----------------------------
+
+def _canonical_variaveis(q: Dict[str, Any]) -> Dict[str, Any]:
+    """Converte specs {"min","max","step"} para "min:step:max" (sem alterar a questão original)."""
+    vars_def = q.get("variaveis")
+    if not isinstance(vars_def, dict) or all(isinstance(v, str) for v in vars_def.values()):
+        return q
+    out = {}
+    for name, spec in vars_def.items():
+        if isinstance(spec, dict) and {"min", "max"} <= spec.keys():
+            spec = f"{spec['min']}:{spec.get('step', 1)}:{spec['max']}"
+        out[name] = spec
+    return dict(q, variaveis=out)
+
+
+def _source_base_dir(source: Any) -> Optional[str]:
+    if isinstance(source, (str, Path)):
+        p = Path(source)
+        if p.is_dir():
+            return str(p.resolve())
+        if p.is_file():
+            return str(p.parent.resolve())
+    return None
+
+
+def _render_one(q: Dict[str, Any], seq: int, opts: RenderOptions, targets: Tuple[str, ...], base_dir: Optional[str]) -> RenderedQuestion:
+    seed = opts.seed
+    key = question_key(q)  # da questão ainda sem substituições (como no loader)
+    try:
+        q_res, _ = resolve_all(_canonical_variaveis(q), seed=seed)
+    except Exception as e:
+        logger.exception("Falha em resolve_all para questão id=%s: %s", q.get("id"), e)
+        q_res = q
+
+    base_alts = q_res.get("alternativas")
+    base_alts = list(base_alts) if isinstance(base_alts, list) else []
+    if opts.shuffle_alternatives and seed is not None and len(base_alts) > 1:
+        rng_for(seed, key, "alternativas").shuffle(base_alts)
+    tipo = Tipo.infer(q_res)
+    q_view = dict(q_res, alternativas=base_alts, tipo=int(tipo))
+    alts, idx = place_correta(q_view, seed)
+
+    extra: Dict[str, Any] = {"base_dir": base_dir}
+    afirm = q_res.get("afirmacoes")
+    if isinstance(afirm, dict) and afirm:
+        extra["afirmacoes_labeled"] = [f"{k}. {afirm[k]}" for k in _ROMAN if k in afirm]
+        sub = (q_res.get("subenunciado") or "").strip()
+        if sub:
+            extra["subenunciado"] = sub
+    obs = q_res.get("obs")
+    if isinstance(obs, str):
+        obs = [obs]
+    if isinstance(obs, list):
+        obs_items = [str(o).strip() for o in obs if str(o).strip()]
+        if obs_items:
+            extra["obs"] = obs_items
+    if q_res.get("alternativas_firstrow") is not None:
+        extra["colunas"] = q_res["alternativas_firstrow"]
+    if q_res.get("dificuldade") is not None:
+        extra["dificuldade"] = q_res["dificuldade"]
+    for t in targets:
+        extra[t] = TARGETS[t](q_view, alts, idx, base_dir, seq)
+
+    imgs = q_res.get("imagens") or []
+    if isinstance(imgs, str):
+        imgs = [imgs]
+    return RenderedQuestion(
+        id=q_res.get("id"),
+        tipo=tipo,
+        enunciado=str(q_res.get("enunciado") or "").strip(),
+        imagens=[ImageSpec.parse(i) for i in imgs if i],
+        alternativas=[Alternative.from_value(a, correct=(i == idx)) for i, a in enumerate(alts)],
+        correta=idx,
+        extra=extra,
+    )
+
+
+def iter_render(source: Any, opts: Optional[RenderOptions] = None) -> Iterator[RenderedQuestion]:
+    """
+    Versão streaming de render_all: gera uma RenderedQuestion por vez. Sem
+    shuffle_questions, arquivos .json são lidos incrementalmente (memória ~ uma questão).
+    """
+    opts = opts or RenderOptions()
+    targets = _targets(opts.target)
+    base_dir = opts.base_dir or _source_base_dir(source)
+
+    if opts.shuffle_questions:
+        questions, _ = _load_normalized(source)
+        questions = list(questions)
+        if len(questions) > 1:
+            random.Random(opts.seed).shuffle(questions)
+    else:
+        def _normalized():
+            for q in _iter_raw_questions(source):
+                _normalize_semicolon_keys_inplace(q)
+                yield q
+        questions = _normalized()
+
+    seq = 0
+    for q in questions:
+        if not isinstance(q, dict):
+            continue
+        seq += 1
+        yield _render_one(q, seq, opts, targets, base_dir)
+
+
+def render_all(source: Any, opts: Optional[RenderOptions] = None) -> List[RenderedQuestion]:
+    """Renderiza todas as questões da origem para os alvos de 'opts' (ver iter_render)."""
+    return list(iter_render(source, opts))
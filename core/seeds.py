@@ -0,0 +1,52 @@
+# core/seeds.py
+# -*- coding: utf-8 -*-
+"""
+Derivação de seeds por questão (um único serviço para loader, beamer, preview e core.math).
+
+Cada tripla (seed global, chave da questão, propósito) gera sua própria seed de 64 bits,
+por hash — o fluxo de números aleatórios de uma questão não depende de quantas/quais
+questões foram processadas antes, nem da ordem, nem do processo. Por isso resolver em
+série ou em paralelo (ou só um subconjunto) dá exatamente o mesmo resultado.
+
+Propósitos usados no projeto:
+- "variaveis":    sorteio das variáveis em resolve_all;
+- "alternativas": embaralhamento das alternativas no loader;
+- "correta":      posição da correta inserida pelo beamer/preview;
+- "restricoes":   seeds candidatas quando o sorteio viola 'restricoes';
+- "amostragem":   sorteio das questões da prova (core.strategies);
+- "indice":       sorteio de QuestionIndex.sample (core.index).
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, Optional
+import hashlib
+import random
+
+SEED_CACHE_SIZE = 65536
+
+
+def question_key(q: Dict[str, Any]) -> str:
+    """Chave estável da questão: id + enunciado (como estiverem na questão recebida)."""
+    return f"{q.get('id', '')}|{q.get('enunciado', '')}"
+
+
+@lru_cache(maxsize=SEED_CACHE_SIZE)
+def derive_seed(seed: int, key: str, purpose: str) -> int:
+    """Seed de 64 bits da tripla (seed, chave, propósito); calculada uma vez e mantida em cache."""
+    h = hashlib.blake2b(f"{seed}|{purpose}|{key}".encode("utf-8"), digest_size=8, person=b"learnforge")
+    return int.from_bytes(h.digest(), "big")
+
+
+def rng_for(seed: Optional[int], key: str, purpose: str) -> random.Random:
+    """
+    RNG independente para (seed, chave, propósito). seed=None devolve um RNG não
+    determinístico (mesmo comportamento de random.Random(None)).
+    """
+    if seed is None:
+        return random.Random()
+    return random.Random(derive_seed(seed, key, purpose))
+
+
+def rng_for_question(seed: Optional[int], q: Dict[str, Any], purpose: str) -> random.Random:
+    return rng_for(seed, question_key(q), purpose)
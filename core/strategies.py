@@ -0,0 +1,379 @@
+# core/strategies.py
+# -*- coding: utf-8 -*-
+"""
+Estratégias de sorteio de questões para montar provas: cotas por dificuldade/tipo/arquivo,
+sorteio estratificado e ponderado, e várias versões sem repetir questões.
+
+Tudo trabalha sobre um AttributeIndex (posições das questões por valor de atributo),
+montado uma vez a partir das questões normalizadas ou das entradas do core.index:
+
+    idx = AttributeIndex.from_questions(questoes, files=arquivos)
+    escolha = sample_quotas(idx, [{"n": 3, "dificuldade": "facil"},
+                                  {"n": 2, "tipo": 3, "pesos": {"arquivo": {"cap2.json": 2}}}], seed=7)
+    versoes = sample_versions(idx, cotas, versions=10, seed=7)   # sem repetição entre versões
+
+Os sorteios devolvem posições (índices na lista usada para montar o índice). Cada um usa
+um RNG derivado da seed (core.seeds, propósito "amostragem"); seed None = não
+determinístico. O custo de um sorteio é O(candidatos) no pior caso e O(n) quando os
+candidatos livres são maioria, o que fica bem abaixo de 1 s com centenas de milhares de
+questões.
+
+Atributos: "dificuldade" (como no JSON), "tipo" (declarado ou inferido, ver
+core.models.Tipo) e "arquivo" (arquivo de origem; aceita o caminho como informado, o
+caminho absoluto ou só o nome do arquivo).
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+import itertools
+import random
+
+from .models import Tipo
+from .seeds import derive_seed
+
+ATTRIBUTES = ("dificuldade", "tipo", "arquivo")
+
+
+class Quota(NamedTuple):
+    n: int
+    where: Dict[str, Any]                                # filtros: {"dificuldade": "facil", "tipo": [1, 2]}
+    weights: Optional[Dict[str, Dict[Any, float]]] = None  # pesos por valor: {"arquivo": {"a.json": 2}}
+
+
+def parse_quotas(spec: Union[int, Dict[str, Any], Quota, Iterable[Any]]) -> List[Quota]:
+    """
+    Aceita um inteiro (n questões quaisquer), um dict/Quota ou uma lista deles. Nos dicts,
+    'n' é a quantidade, 'pesos'/'weights' os pesos e as demais chaves são filtros.
+    """
+    if isinstance(spec, int):
+        return [Quota(spec, {})]
+    if isinstance(spec, (dict, Quota)):
+        spec = [spec]
+    out: List[Quota] = []
+    for item in spec:
+        if isinstance(item, Quota):
+            out.append(item)
+            continue
+        if not isinstance(item, dict) or "n" not in item:
+            raise ValueError(f"Cota inválida: {item!r} (use {{'n': 3, 'dificuldade': 'facil', ...}}).")
+        where = {k: v for k, v in item.items() if k not in ("n", "pesos", "weights")}
+        unknown = [k for k in where if k not in ATTRIBUTES]
+        if unknown:
+            raise ValueError(f"Atributo(s) desconhecido(s) na cota: {', '.join(unknown)} (use {', '.join(ATTRIBUTES)}).")
+        out.append(Quota(int(item["n"]), where, item.get("pesos", item.get("weights"))))
+    return out
+
+
+class AttributeIndex:
+    """
+    Posições das questões por valor de cada atributo. Internamente cada atributo vira um
+    vetor de códigos (um int por questão) e uma lista de posições por código.
+    """
+
+    def __init__(self, rows: Sequence[Tuple[Any, Any, Any]]):
+        self.size = len(rows)
+        self._codes: Dict[str, List[int]] = {}
+        self._values: Dict[str, List[Any]] = {}
+        self._postings: Dict[str, List[List[int]]] = {}
+        for a, attr in enumerate(ATTRIBUTES):
+            code_of: Dict[Any, int] = {}
+            codes: List[int] = []
+            postings: List[List[int]] = []
+            for i, row in enumerate(rows):
+                v = row[a]
+                c = code_of.get(v)
+                if c is None:
+                    c = code_of[v] = len(postings)
+                    postings.append([])
+                codes.append(c)
+                postings[c].append(i)
+            self._codes[attr] = codes
+            self._values[attr] = list(code_of)
+            self._postings[attr] = postings
+        self._match_cache: Dict[Tuple[Any, ...], List[int]] = {}
+
+    @classmethod
+    def from_questions(cls, questions: Sequence[Dict[str, Any]], files: Optional[Sequence[Any]] = None) -> "AttributeIndex":
+        """Índice de questões (dicts do loader); 'files' traz o arquivo de origem de cada uma."""
+        if files is None:
+            files = [None] * len(questions)
+        return cls([
+            (q.get("dificuldade"), int(Tipo.infer(q)), None if f is None else str(f))
+            for q, f in zip(questions, files)
+        ])
+
+    @classmethod
+    def from_entries(cls, entries: Sequence[Any]) -> "AttributeIndex":
+        """Índice das entradas de core.index.QuestionIndex (select/sample)."""
+        return cls([(e.dificuldade, e.tipo, e.file) for e in entries])
+
+    def __len__(self) -> int:
+        return self.size
+
+    def values(self, attr: str) -> List[Any]:
+        return list(self._values[attr])
+
+    def counts(self, attr: str, where: Optional[Dict[str, Any]] = None) -> Dict[Any, int]:
+        """Quantas questões há por valor de 'attr' (entre as que atendem a 'where')."""
+        if not where:
+            return {v: len(p) for v, p in zip(self._values[attr], self._postings[attr])}
+        codes = self._codes[attr]
+        out: Dict[Any, int] = {}
+        for i in self.matching(where):
+            v = self._values[attr][codes[i]]
+            out[v] = out.get(v, 0) + 1
+        return out
+
+    def _value_codes(self, attr: str, wanted: Any) -> Set[int]:
+        if attr not in self._codes:
+            raise ValueError(f"Atributo desconhecido: {attr} (use {', '.join(ATTRIBUTES)}).")
+        if not isinstance(wanted, (list, tuple, set, frozenset)):
+            wanted = [wanted]
+        values = self._values[attr]
+        codes: Set[int] = set()
+        for w in wanted:
+            if attr == "tipo":
+                w = int(w)
+            if w in values:
+                codes.add(values.index(w))
+            elif attr == "arquivo" and w is not None:
+                # caminho absoluto ou só o nome do arquivo
+                full, name = str(Path(w).resolve()), Path(str(w)).name
+                codes.update(c for c, v in enumerate(values)
+                             if v is not None and (str(Path(v).resolve()) == full or Path(v).name == name))
+        return codes
+
+    def matching(self, where: Optional[Dict[str, Any]] = None) -> List[int]:
+        """Posições (em ordem crescente) das questões que atendem a todos os filtros."""
+        if not where:
+            return range(self.size)  # type: ignore[return-value]
+        key = tuple(sorted((k, repr(v)) for k, v in where.items()))
+        hit = self._match_cache.get(key)
+        if hit is not None:
+            return hit
+        conds = [(attr, self._value_codes(attr, v)) for attr, v in where.items()]
+        # parte da menor lista de posições e confere os demais atributos pelos códigos
+        sizes = [sum(len(self._postings[a][c]) for c in cs) for a, cs in conds]
+        first = sizes.index(min(sizes))
+        attr0, codes0 = conds[first]
+        pool = sorted(i for c in codes0 for i in self._postings[attr0][c])
+        for j, (attr, codes) in enumerate(conds):
+            if j != first:
+                col = self._codes[attr]
+                pool = [i for i in pool if col[i] in codes]
+        self._match_cache[key] = pool
+        return pool
+
+
+# -----------------------------
+# Sorteios
+# -----------------------------
+
+def _rng(seed: Optional[int], key: str = "") -> random.Random:
+    return random.Random() if seed is None else random.Random(derive_seed(seed, key, "amostragem"))
+
+
+def _not_enough(k: int, free: int, where: Optional[Dict[str, Any]]) -> ValueError:
+    filt = ", ".join(f"{a}={v!r}" for a, v in (where or {}).items()) or "sem filtro"
+    return ValueError(f"Questões insuficientes ({filt}): pedidas {k}, disponíveis {free}.")
+
+
+def _draw_uniform(rng: random.Random, pool: Sequence[int], k: int, taken: Set[int],
+                  where: Optional[Dict[str, Any]] = None) -> List[int]:
+    """k posições distintas de 'pool' fora de 'taken', uniformemente."""
+    if k <= 0:
+        return []
+    if len(taken) + 2 * k <= len(pool) // 2:
+        # maioria livre: rejeição, sem percorrer o pool (O(k) esperado)
+        chosen: List[int] = []
+        seen: Set[int] = set()
+        while len(chosen) < k:
+            i = pool[rng.randrange(len(pool))]
+            if i in taken or i in seen:
+                continue
+            seen.add(i)
+            chosen.append(i)
+        return chosen
+    free = [i for i in pool if i not in taken]
+    if len(free) < k:
+        raise _not_enough(k, len(free), where)
+    return rng.sample(free, k)
+
+
+def _draw_weighted(rng: random.Random, index: AttributeIndex, k: int, taken: Set[int],
+                   weights: Dict[str, Dict[Any, float]], where: Optional[Dict[str, Any]] = None) -> List[int]:
+    """
+    k posições sem reposição com probabilidade proporcional ao peso de cada questão
+    (produto dos pesos dos seus valores; valor sem peso = 1). Questões de mesmo peso
+    formam um grupo (combinação de valores dos atributos ponderados, com as posições
+    em cache no índice): sorteia-se o grupo (peso × livres) e depois uma questão nele.
+    """
+    base = dict(where or {})
+    axes = []
+    for a in weights:
+        allowed = index._value_codes(a, base[a]) if a in base else None
+        by_code: Dict[int, float] = {}
+        for v, w in weights[a].items():
+            for c in index._value_codes(a, v):
+                by_code[c] = float(w)
+        axes.append([(a, v, by_code.get(c, 1.0)) for c, v in enumerate(index._values[a])
+                     if allowed is None or c in allowed])
+    ordered = sorted(taken)
+    groups = []
+    for combo in itertools.product(*axes):
+        w = 1.0
+        for _, _, wv in combo:
+            w *= wv
+        if w <= 0:
+            continue
+        members = index.matching({**base, **{a: v for a, v, _ in combo}})
+        used = sum(1 for i in ordered[bisect_left(ordered, members[0]):bisect_right(ordered, members[-1])]
+                   if _contains(members, i)) if members and ordered else 0
+        if len(members) > used:
+            groups.append([w, members, len(members) - used])
+    free = sum(g[2] for g in groups)
+    if free < k:
+        raise _not_enough(k, free, where)
+    chosen: List[int] = []
+    excluded = set(taken)
+    for _ in range(k):
+        r = rng.random() * sum(w * n for w, _, n in groups)
+        for g in groups:
+            r -= g[0] * g[2]
+            if r < 0:
+                break
+        i = _draw_uniform(rng, g[1], 1, excluded, where)[0]
+        excluded.add(i)
+        chosen.append(i)
+        g[2] -= 1
+        if not g[2]:
+            groups.remove(g)
+    return chosen
+
+
+def _contains(sorted_list: Sequence[int], i: int) -> bool:
+    j = bisect_left(sorted_list, i)
+    return j < len(sorted_list) and sorted_list[j] == i
+
+
+def sample(
+    index: AttributeIndex,
+    n: int,
+    *,
+    seed: Optional[int] = None,
+    where: Optional[Dict[str, Any]] = None,
+    weights: Optional[Dict[str, Dict[Any, float]]] = None,
+    exclude: Iterable[int] = (),
+    rng: Optional[random.Random] = None,
+) -> List[int]:
+    """n posições distintas entre as que atendem a 'where', fora de 'exclude' (ponderado se houver 'weights')."""
+    rng = rng or _rng(seed)
+    taken = exclude if isinstance(exclude, set) else set(exclude)
+    if weights:
+        return _draw_weighted(rng, index, n, taken, weights, where)
+    return _draw_uniform(rng, index.matching(where), n, taken, where)
+
+
+def _allocate(n: int, shares: Dict[Any, float], avail: Dict[Any, int]) -> Dict[Any, int]:
+    """Reparte n entre os estratos pelo maior resto, sem passar do disponível em cada um."""
+    alloc = {s: 0 for s in shares}
+    left = n
+    active = {s: w for s, w in shares.items() if w > 0 and avail.get(s, 0) > 0}
+    while left > 0 and active:
+        total = sum(active.values())
+        quotas = {s: left * w / total for s, w in active.items()}
+        step = {s: min(int(q), avail[s] - alloc[s]) for s, q in quotas.items()}
+        given = sum(step.values())
+        if given == 0:
+            # sobra menor que um por estrato: maiores restos primeiro
+            for s in sorted(active, key=lambda s: (-(quotas[s] - int(quotas[s])), str(s))):
+                if left == 0:
+                    break
+                alloc[s] += 1
+                left -= 1
+        else:
+            for s, k in step.items():
+                alloc[s] += k
+            left -= given
+        active = {s: w for s, w in active.items() if alloc[s] < avail[s]}
+    return alloc
+
+
+def stratified(
+    index: AttributeIndex,
+    n: int,
+    by: str,
+    *,
+    seed: Optional[int] = None,
+    proportions: Optional[Dict[Any, float]] = None,
+    where: Optional[Dict[str, Any]] = None,
+    exclude: Iterable[int] = (),
+    rng: Optional[random.Random] = None,
+) -> List[int]:
+    """
+    n posições estratificadas por 'by': cada estrato recebe a parte dada em 'proportions'
+    (padrão: proporcional ao tamanho do estrato), limitada ao que ele tem; o que faltar
+    vai para os demais. O resultado vem embaralhado (estratos misturados).
+    """
+    rng = rng or _rng(seed)
+    taken = exclude if isinstance(exclude, set) else set(exclude)
+    base = dict(where or {})
+    avail = index.counts(by, where)
+    if taken:
+        for v in avail:
+            avail[v] -= sum(1 for i in index.matching({**base, by: v}) if i in taken)
+    shares = {v: float(proportions.get(v, 0.0)) for v in avail} if proportions else {v: float(c) for v, c in avail.items()}
+    alloc = _allocate(n, shares, avail)
+    got = sum(alloc.values())
+    if got < n:
+        raise _not_enough(n, got, where)
+    chosen: List[int] = []
+    for v in sorted(alloc, key=str):
+        if alloc[v]:
+            cond = {**base, by: v}
+            chosen += _draw_uniform(rng, index.matching(cond), alloc[v], taken | set(chosen), cond)
+    rng.shuffle(chosen)
+    return chosen
+
+
+def sample_quotas(
+    index: AttributeIndex,
+    quotas: Any,
+    *,
+    seed: Optional[int] = None,
+    exclude: Iterable[int] = (),
+    rng: Optional[random.Random] = None,
+) -> List[int]:
+    """Uma prova: as cotas na ordem dada (sorteio aleatório dentro de cada uma), sem repetir questões."""
+    rng = rng or _rng(seed)
+    taken = set(exclude)
+    chosen: List[int] = []
+    for q in parse_quotas(quotas):
+        picked = sample(index, q.n, where=q.where, weights=q.weights, exclude=taken, rng=rng)
+        taken.update(picked)
+        chosen += picked
+    return chosen
+
+
+def sample_versions(
+    index: AttributeIndex,
+    quotas: Any,
+    versions: int,
+    *,
+    seed: Optional[int] = None,
+    repeat: bool = False,
+) -> List[List[int]]:
+    """
+    'versions' provas com as mesmas cotas. Sem 'repeat', nenhuma questão aparece em mais
+    de uma versão (ValueError se o banco não comportar). Cada versão tem seu próprio RNG
+    derivado da seed, então a versão k não muda se 'versions' aumentar.
+    """
+    taken: Set[int] = set()
+    out: List[List[int]] = []
+    for v in range(versions):
+        picked = sample_quotas(index, quotas, exclude=() if repeat else taken, rng=_rng(seed, f"versao:{v}"))
+        taken.update(picked)
+        out.append(picked)
+    return out
@@ -0,0 +1,487 @@
+# core/variables.py
+# -*- coding: utf-8 -*-
+"""
+Resolução em lote (muitos sorteios) de 'variaveis' e 'resolucoes' de uma questão paramétrica.
+
+- O sorteio k usa o RNG de core.seeds para (seeds[k], questão, "variaveis") exatamente como
+  resolve_all(q, seed=seeds[k]), então cada coluna bate valor a valor com o caminho escalar.
+- Com NumPy (em requirements.txt; sem ele tudo funciona, só mais devagar) as grades 'min:step:max' viram arrays e as resoluções são avaliadas
+  sobre a AST permitida (+, -, *, /, %, **, unários) de uma só vez; sem NumPy, ou para
+  resoluções que usam <...> no texto, cai para a avaliação escalar por sorteio.
+- Sorteios em que o caminho escalar lançaria erro (divisão por zero, potência complexa,
+  overflow, nome inexistente...) ficam marcados como inválidos na máscara 'valid'.
+- sample_variants/first_valid_seed: amostragem com rejeição por 'restricoes', em lotes
+  crescentes de seeds candidatas, com orçamento máximo de sorteios.
+- enumerate_variants/count_distinct_variants/bank_summary: percorrem (preguiçosamente, em
+  lotes) o produto cartesiano das grades para medir o espaço de variantes de cada questão.
+"""
+from __future__ import annotations
+
+from itertools import islice, product
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import ast
+import hashlib
+import json
+import math
+
+from .math import (
+    MAX_EXPONENT, Grid, Restricoes, _compile_expr, grid_from_spec, replace_angles, resolution_plan, resolve_with_env,
+    restricoes_spec, safe_eval,
+)
+from .seeds import question_key, rng_for
+
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except Exception:
+    np = None
+    _HAS_NUMPY = False
+
+
+# acima disso a conversão int64 → float64 deixa de ser exata e o NumPy divergiria do escalar
+_EXACT_INT = 2 ** 53
+
+
+def _grid_specs(question: Dict[str, Any]) -> List[Tuple[str, Grid]]:
+    """(nome, grade) por variável, na ordem declarada (mesmas regras de resolve_all)."""
+    specs = []
+    for name, spec in (question.get("variaveis") or {}).items():
+        if not isinstance(spec, str):
+            raise ValueError(f"Variável '{name}': use string no formato 'min:step:max'.")
+        specs.append((name, grid_from_spec(spec)))
+    return specs
+
+
+def _draw_indices(specs: List[Tuple[str, Grid]], seeds: Sequence[Optional[int]], key: str) -> List[List[int]]:
+    """Índices na grade: idx[v][k] = sorteio da variável v com a seed k (mesma sequência do escalar)."""
+    idx: List[List[int]] = [[] for _ in specs]
+    for seed in seeds:
+        rng = rng_for(seed, key, "variaveis")
+        for v, (_, grid) in enumerate(specs):
+            idx[v].append(rng.randrange(0, grid.n + 1))
+    return idx
+
+
+def _fits_float64(grid: Grid) -> bool:
+    last = grid.start + grid.n * grid.step
+    return max(abs(grid.start), abs(last), grid.scale) < _EXACT_INT
+
+
+def sample_variables(question: Dict[str, Any], seeds: Sequence[Optional[int]]) -> Dict[str, Any]:
+    """
+    Colunas {variável: valores sorteados}, um valor por seed.
+    Arrays float64 com NumPy; listas de float sem NumPy.
+    """
+    specs = _grid_specs(question)
+    return _columns_from_indices(specs, _draw_indices(specs, seeds, question_key(question)))
+
+
+def _columns_from_indices(specs: List[Tuple[str, Grid]], idx: List[Sequence[int]]) -> Dict[str, Any]:
+    """Valores das variáveis a partir dos índices na grade (idx[v][k])."""
+    cols: Dict[str, Any] = {}
+    for (name, grid), ii in zip(specs, idx):
+        if _HAS_NUMPY and _fits_float64(grid):
+            # numerador inteiro exato em float64 → mesma divisão corretamente arredondada do escalar
+            num = grid.start + np.asarray(ii, dtype=np.int64) * grid.step
+            cols[name] = num.astype(np.float64) / float(grid.scale)
+        else:
+            values = [grid.value(i) for i in ii]
+            cols[name] = np.asarray(values, dtype=np.float64) if _HAS_NUMPY else values
+    return cols
+
+
+def resolve_batch(
+    question: Dict[str, Any],
+    seeds: Sequence[Optional[int]],
+) -> Tuple[Dict[str, Any], Any]:
+    """
+    Sorteia as variáveis e avalia todas as resoluções (pelo mesmo plano de dependências de
+    resolve_all) para todas as seeds.
+    Retorna (colunas, valid): colunas = {nome: valores} com variáveis e resoluções;
+    valid[k] = False quando o sorteio k falharia em resolve_all(lazy=False) (valores nele são NaN).
+    """
+    seeds = list(seeds)
+    return _resolve_columns(question, sample_variables(question, seeds), len(seeds))
+
+
+def _resolve_columns(question: Dict[str, Any], var_cols: Dict[str, Any], n: int) -> Tuple[Dict[str, Any], Any]:
+    """Avalia as resoluções sobre colunas de variáveis já escolhidas (n sorteios)."""
+    valid = np.ones(n, dtype=bool) if _HAS_NUMPY else [True] * n
+
+    res_def = question.get("resolucoes") or {}
+    plan = resolution_plan(tuple((k, str(v)) for k, v in res_def.items()), frozenset(var_cols), None)
+    res_cols: Dict[str, Any] = {}
+    for key, expr, deps in plan:
+        local = dict(var_cols)
+        local.update((d, res_cols[d]) for d in deps)
+        node = None
+        if _HAS_NUMPY and "<" not in expr:
+            try:
+                _compile_expr(expr)  # mesmas regras/limites do caminho escalar
+                node = ast.parse(expr, mode="eval")
+            except (SyntaxError, ValueError):
+                node = None
+        if node is not None:
+            try:
+                values, err = _eval_array(node.body, local, n)
+            except _Unsupported:
+                values = None
+            if values is not None:
+                valid &= ~err
+                res_cols[key] = values
+                continue
+        res_cols[key] = _eval_scalar_column(expr, local, valid, n)
+
+    cols = dict(var_cols)
+    for key in res_def:
+        if key in res_cols:
+            # NaN nos sorteios inválidos (inclusive os invalidados por resoluções posteriores)
+            cols[key] = np.where(valid, res_cols[key], np.nan) if _HAS_NUMPY else [
+                v if ok else math.nan for v, ok in zip(res_cols[key], valid)
+            ]
+    return cols, valid
+
+
+def iter_envs(cols: Dict[str, Any], valid: Any = None) -> Iterator[Dict[str, float]]:
+    """Ambientes por sorteio ({nome: float}), pulando os inválidos quando 'valid' for dado."""
+    names = list(cols)
+    n = len(cols[names[0]]) if names else 0
+    for k in range(n):
+        if valid is not None and not valid[k]:
+            continue
+        yield {name: float(cols[name][k]) for name in names}
+
+
+# -----------------------------
+# Restrições e amostragem com rejeição
+# -----------------------------
+
+# orçamento padrão: sorteios por variante pedida (com um mínimo) antes de desistir
+BUDGET_PER_VARIANT = 100
+MIN_BUDGET = 1000
+DEFAULT_BATCH = 256
+
+
+def _candidate_seeds(seed: Optional[int], key: str) -> Iterator[int]:
+    """Seeds candidatas: a própria seed primeiro (variante de hoje, se já for válida), depois derivadas."""
+    if seed is not None:
+        yield seed
+    rng = rng_for(seed, key, "restricoes")
+    while True:
+        yield rng.getrandbits(64)
+
+
+def _render(x: Any, env: Dict[str, float]) -> Any:
+    if isinstance(x, str):
+        return replace_angles(x, env)
+    if isinstance(x, list):
+        return [_render(i, env) for i in x]
+    if isinstance(x, dict):
+        return {k: _render(v, env) for k, v in x.items()}
+    return x
+
+
+def check_restricoes(
+    question: Dict[str, Any],
+    cols: Dict[str, Any],
+    valid: Any,
+    spec: Optional[Restricoes] = None,
+) -> List[bool]:
+    """
+    Máscara (lista de bool) dos sorteios de resolve_batch que satisfazem as restrições.
+    Expressões são avaliadas em lote (NumPy) ou sorteio a sorteio; as restrições de
+    formatação comparam os textos já renderizados (mesma formatação do resolve_all).
+    """
+    spec = spec if spec is not None else restricoes_spec(question)
+    n = len(valid)
+    ok = np.array(valid, dtype=bool) if _HAS_NUMPY else [bool(v) for v in valid]
+    if spec is None:
+        return list(map(bool, ok))
+
+    for expr in spec.expressoes:
+        values = None
+        if _HAS_NUMPY and "<" not in expr:
+            try:
+                _compile_expr(expr)
+                values, err = _eval_array(ast.parse(expr, mode="eval").body, cols, n)
+            except (SyntaxError, ValueError, _Unsupported):
+                values = None
+        if values is not None:
+            ok &= ~err & (values != 0)
+            continue
+        for k in range(n):
+            if ok[k]:
+                env = {name: float(col[k]) for name, col in cols.items()}
+                try:
+                    ok[k] = safe_eval(replace_angles(expr, env), env) != 0
+                except Exception:
+                    ok[k] = False
+
+    ok = list(map(bool, ok))
+    if spec.alternativas_distintas or spec.correta_distinta:
+        alts = question.get("alternativas") if isinstance(question.get("alternativas"), list) else []
+        correta = question.get("correta")
+        for k in range(n):
+            if not ok[k]:
+                continue
+            env = {name: float(col[k]) for name, col in cols.items()}
+            try:
+                rendered = [str(a) for a in _render(alts, env)]
+                if spec.alternativas_distintas and len(set(rendered)) != len(rendered):
+                    ok[k] = False
+                elif spec.correta_distinta and correta not in (None, "") and str(_render(correta, env)) in rendered:
+                    ok[k] = False
+            except Exception:
+                ok[k] = False
+    return ok
+
+
+def sample_variants(
+    question: Dict[str, Any],
+    n: int,
+    seed: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH,
+    max_draws: Optional[int] = None,
+) -> List[Tuple[int, Dict[str, float]]]:
+    """
+    Sorteia 'n' variantes válidas (sem erro e satisfazendo 'restricoes'), em lotes de seeds
+    candidatas (1, 4, 16, ... até batch_size). Retorna [(seed, env)], onde
+    resolve_all(question, seed=seed) reproduz exatamente a variante.
+    Lança ValueError se o orçamento (max_draws sorteios) acabar antes.
+    """
+    spec = restricoes_spec(question)
+    budget = max_draws if max_draws is not None else max(MIN_BUDGET, BUDGET_PER_VARIANT * n)
+    stream = _candidate_seeds(seed, question_key(question))
+    out: List[Tuple[int, Dict[str, float]]] = []
+    drawn = 0
+    size = 1 if n == 1 else min(batch_size, n)
+    while len(out) < n:
+        if drawn >= budget:
+            raise ValueError(
+                f"Questão id={question.get('id', '?')}: só {len(out)} de {n} variante(s) satisfizeram "
+                f"'restricoes' em {drawn} sorteios; revise as restrições ou as faixas das variáveis."
+            )
+        seeds = list(islice(stream, min(size, budget - drawn)))
+        drawn += len(seeds)
+        cols, valid = resolve_batch(question, seeds)
+        ok = check_restricoes(question, cols, valid, spec)
+        for k, s in enumerate(seeds):
+            if ok[k]:
+                out.append((s, {name: float(col[k]) for name, col in cols.items()}))
+                if len(out) == n:
+                    break
+        size = min(size * 4, batch_size)
+    return out
+
+
+def first_valid_seed(question: Dict[str, Any], seed: Optional[int], max_draws: Optional[int] = None) -> int:
+    """Primeira seed candidata (a partir de 'seed') cujo sorteio satisfaz as restrições."""
+    return sample_variants(question, 1, seed=seed, max_draws=max_draws)[0][0]
+
+
+# -----------------------------
+# Enumeração do espaço de variantes
+# -----------------------------
+
+class VariantCount(NamedTuple):
+    espaco: int        # pontos do produto cartesiano das grades
+    percorridas: int   # pontos efetivamente enumerados (<= limite)
+    validas: int       # sem erro e satisfazendo 'restricoes'
+    distintas: int     # resultados renderizados distintos entre as válidas
+    completo: bool     # True se o espaço inteiro foi percorrido
+
+
+def variant_space_size(question: Dict[str, Any]) -> int:
+    """Tamanho do produto cartesiano das grades de 'variaveis' (1 se não houver variáveis)."""
+    return math.prod(grid.n + 1 for _, grid in _grid_specs(question))
+
+
+def enumerate_variants(
+    question: Dict[str, Any],
+    limit: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH,
+) -> Iterator[Tuple[Dict[str, float], Dict[str, Any]]]:
+    """
+    Percorre o produto cartesiano das grades (ordem lexicográfica dos índices, no máximo
+    'limit' pontos) em lotes, sem materializá-lo, e gera (variáveis, questão resolvida) para
+    cada ponto válido que satisfaz 'restricoes'.
+    """
+    specs = _grid_specs(question)
+    spec = restricoes_spec(question)
+    points: Iterable[Tuple[int, ...]] = product(*(range(grid.n + 1) for _, grid in specs))
+    if limit is not None:
+        points = islice(points, limit)
+    while True:
+        chunk = list(islice(points, batch_size))
+        if not chunk:
+            return
+        var_cols = _columns_from_indices(specs, list(zip(*chunk)) if specs else [])
+        cols, valid = _resolve_columns(question, var_cols, len(chunk))
+        ok = check_restricoes(question, cols, valid, spec)
+        for k in range(len(chunk)):
+            if not ok[k]:
+                continue
+            env_vars = {name: float(col[k]) for name, col in var_cols.items()}
+            try:
+                q_res, _ = resolve_with_env(question, env_vars)
+            except Exception:
+                continue
+            yield env_vars, q_res
+
+
+_RENDERED_FIELDS = ("enunciado", "correta", "alternativas", "afirmacoes", "obs", "imagens")
+
+
+def _outcome_digest(q_res: Dict[str, Any]) -> bytes:
+    shown = {f: q_res.get(f) for f in _RENDERED_FIELDS if f in q_res}
+    data = json.dumps(shown, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).digest()
+
+
+def count_distinct_variants(question: Dict[str, Any], limit: Optional[int] = None) -> VariantCount:
+    """
+    Conta as variantes distintas **como o aluno as vê** (campos renderizados), guardando só um
+    hash de 16 bytes por resultado distinto. Com 'limit', percorre no máximo esse número de
+    pontos e 'completo' indica se o espaço inteiro foi coberto.
+    """
+    space = variant_space_size(question)
+    walked = space if limit is None else min(space, limit)
+    seen = set()
+    n_valid = 0
+    for _, q_res in enumerate_variants(question, limit=walked):
+        n_valid += 1
+        seen.add(_outcome_digest(q_res))
+    return VariantCount(space, walked, n_valid, len(seen), walked == space)
+
+
+def bank_summary(
+    questions: Iterable[Dict[str, Any]],
+    count_distinct: bool = False,
+    limit: Optional[int] = 100_000,
+) -> List[Dict[str, Any]]:
+    """
+    Resumo por questão (normalizada): id, tipo, dificuldade e o tamanho do espaço de
+    variantes ('variantes'); com count_distinct=True também 'distintas' (até 'limit' pontos
+    por questão) e 'completo'. Questões com variáveis inválidas trazem 'erro'.
+    """
+    out: List[Dict[str, Any]] = []
+    for q in questions:
+        row: Dict[str, Any] = {
+            "id": q.get("id"),
+            "tipo": q.get("tipo"),
+            "dificuldade": q.get("dificuldade"),
+        }
+        try:
+            row["variantes"] = variant_space_size(q)
+            if count_distinct:
+                cnt = count_distinct_variants(q, limit=limit)
+                row["distintas"] = cnt.distintas
+                row["completo"] = cnt.completo
+        except Exception as e:
+            row["erro"] = str(e)
+        out.append(row)
+    return out
+
+
+# -----------------------------
+# Avaliação
+# -----------------------------
+
+class _Unsupported(Exception):
+    """Nó fora do subconjunto vetorizável: a expressão vai para o caminho escalar."""
+
+
+_CMP = {
+    ast.Lt: lambda a, b: a < b,
+    ast.LtE: lambda a, b: a <= b,
+    ast.Gt: lambda a, b: a > b,
+    ast.GtE: lambda a, b: a >= b,
+    ast.Eq: lambda a, b: a == b,
+    ast.NotEq: lambda a, b: a != b,
+}
+
+
+def _eval_scalar_column(expr: str, cols: Dict[str, Any], valid: Any, n: int) -> Any:
+    """Caminho escalar (idêntico ao resolve_all) por sorteio; atualiza 'valid' in-place."""
+    out = [math.nan] * n
+    for k in range(n):
+        if not valid[k]:
+            continue
+        env = {name: float(col[k]) for name, col in cols.items()}
+        try:
+            out[k] = safe_eval(replace_angles(expr, env), env)
+        except Exception:
+            valid[k] = False
+    return np.asarray(out, dtype=np.float64) if _HAS_NUMPY else out
+
+
+def _py_pow(a: float, b: float) -> Tuple[float, bool]:
+    if abs(b) > MAX_EXPONENT:
+        return math.nan, True
+    try:
+        r = a ** b
+        if isinstance(r, complex):
+            return math.nan, True
+        return float(r), False
+    except (OverflowError, ZeroDivisionError):
+        return math.nan, True
+
+
+def _eval_array(node: ast.AST, cols: Dict[str, Any], n: int):
+    """
+    Avalia a AST permitida sobre arrays; retorna (valores, erro) onde erro marca os sorteios
+    em que a aritmética escalar do Python lançaria exceção.
+    """
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return np.full(n, float(node.value)), np.zeros(n, dtype=bool)
+    if isinstance(node, ast.Name):
+        if node.id not in cols:
+            return np.full(n, np.nan), np.ones(n, dtype=bool)
+        return np.asarray(cols[node.id], dtype=np.float64), np.zeros(n, dtype=bool)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        v, err = _eval_array(node.operand, cols, n)
+        return (-v if isinstance(node.op, ast.USub) else +v), err
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        v, err = _eval_array(node.operand, cols, n)
+        return (v == 0).astype(np.float64), err
+    if isinstance(node, ast.Compare) and all(type(op) in _CMP for op in node.ops):
+        left, err = _eval_array(node.left, cols, n)
+        result = np.ones(n, dtype=bool)
+        for op, comp in zip(node.ops, node.comparators):
+            right, er = _eval_array(comp, cols, n)
+            # comparação encadeada: o Python só avalia o próximo termo se o anterior for verdadeiro
+            err = err | (er & result)
+            result = result & _CMP[type(op)](left, right)
+            left = right
+        return result.astype(np.float64), err
+    if isinstance(node, ast.BoolOp) and isinstance(node.op, (ast.And, ast.Or)):
+        acc, err = _eval_array(node.values[0], cols, n)
+        for operand in node.values[1:]:
+            v, ev = _eval_array(operand, cols, n)
+            # 'and'/'or' devolvem um dos operandos (curto-circuito), como no Python
+            take = (acc != 0) if isinstance(node.op, ast.And) else (acc == 0)
+            err = err | (ev & take)
+            acc = np.where(take, v, acc)
+        return acc, err
+    if isinstance(node, ast.BinOp):
+        a, ea = _eval_array(node.left, cols, n)
+        b, eb = _eval_array(node.right, cols, n)
+        err = ea | eb
+        with np.errstate(all="ignore"):
+            if isinstance(node.op, ast.Add):
+                return a + b, err
+            if isinstance(node.op, ast.Sub):
+                return a - b, err
+            if isinstance(node.op, ast.Mult):
+                return a * b, err
+            if isinstance(node.op, ast.Div):
+                return a / b, err | (b == 0)
+            if isinstance(node.op, ast.Mod):
+                return np.remainder(a, b), err | (b == 0)
+            if isinstance(node.op, ast.Pow):
+                # pow elemento a elemento com o float do Python (mesmo arredondamento e erros)
+                pairs = [_py_pow(x, y) for x, y in zip(a.tolist(), b.tolist())]
+                vals = np.fromiter((p[0] for p in pairs), dtype=np.float64, count=n)
+                perr = np.fromiter((p[1] for p in pairs), dtype=bool, count=n)
+                return vals, err | perr
+    raise _Unsupported(type(node).__name__)
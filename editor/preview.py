@@ -2,19 +2,11 @@
 from __future__ import annotations
 import re
 from typing import List, Dict, Any, Tuple, Optional
-# --- ADICIONE ISTO PERTO DO TOPO ---
-import hashlib
-import random
-import hashlib, random
 
-_IMG_EXTS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".svg", ".pdf")
+from core.images import image_exists
+from core.pipeline import alt_label, place_correta
 
-def _rng_for_q(seed, q: Dict[str, Any]) -> random.Random:
-    """RNG determinístico por questão para posicionar a correta de forma reprodutível."""
-    base = str(0 if seed is None else seed)
-    salt = f"{q.get('id','')}|{q.get('enunciado','')}|{len(q.get('alternativas') or [])}"
-    h = hashlib.sha256((base + "|" + salt).encode("utf-8")).hexdigest()
-    return random.Random(int(h[:16], 16))  # 64 bits
+_IMG_EXTS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".svg", ".pdf")
 
 def _to_int(x) -> Optional[int]:
     """Converte para int de forma segura; retorna None se não der."""
@@ -101,6 +93,67 @@ def _flatten_to_questions(items: Any) -> List[Dict[str, Any]]:
     _extend_from(items)
     return qs
 
+def _missing(path: str, base_dir: Optional[str]) -> str:
+    return " (não encontrada)" if base_dir and not image_exists(path, base_dir) else ""
+
+def question_lines(q: Dict[str, Any], alts: List[Any], correta_index: int, base_dir: Optional[str] = None) -> List[str]:
+    """
+    Linhas do preview de uma questão; 'alts' já com a correta em 'correta_index'.
+    Com base_dir (diretório do JSON), imagens inexistentes são marcadas "(não encontrada)".
+    """
+    lines: List[str] = []
+    # Cabeçalho da questão
+    enun = (q.get("enunciado") or "").strip()
+    try:
+        qid = int(q.get("id")) if q.get("id") is not None else "?"
+    except Exception:
+        qid = "?"
+    lines.append(f"{qid}) {enun}")
+
+    # Imagens do enunciado (marcadores)
+    imgs = q.get("imagens") or []
+    if isinstance(imgs, (list, tuple)) and imgs:
+        lines.append("")
+        for img in imgs:
+            p, w, h = _safe_img_spec(img)
+            if _is_img_path(p):
+                size = f" {w}x{h}mm" if (w and h) else ""
+                lines.append(f"   [imagem: {p}{size}]{_missing(p, base_dir)}")
+            elif p:
+                lines.append(f"   [imagem: {p}]")
+            else:
+                lines.append("   [imagem inválida]")
+
+    # Afirmacoes + subenunciado
+    afirm = q.get("afirmacoes") or {}
+    if isinstance(afirm, dict) and afirm:
+        lines.append("")
+        order = ["I","II","III","IV","V","VI","VII","VIII","IX","X"]
+        for k in order:
+            if k in afirm:
+                lines.append(f"   {k}. {str(afirm[k]).strip()}")
+        sub = (q.get("subenunciado") or "").strip()
+        if sub:
+            lines.append("")
+            lines.append(f"   {sub}")
+
+    # Render das alternativas — correta com prefixo [correta]
+    for i, alt in enumerate(alts):
+        label = alt_label(i)
+        p, w, h = _safe_img_spec(alt)
+        if _is_img_path(p):
+            size = f" {w}x{h}mm" if (w and h) else ""
+            s_view = f"[imagem: {p}{size}]{_missing(p, base_dir)}"
+        else:
+            s_view = p if isinstance(alt, (dict, list, tuple)) else (str(alt) if alt is not None else "")
+        if i == correta_index and s_view:
+            s_view = f"[correta] {s_view}"
+        lines.append(f"   {label} {s_view}")
+
+    lines.append("")
+
+    return lines
+
 def preview_text(questions: List[Dict[str, Any]], title: str | None = None, **kwargs) -> str:
     """
     Preview:
@@ -108,8 +161,8 @@ def preview_text(questions: List[Dict[str, Any]], title: str | None = None, **kw
     - Ordena por id.
     - Faz MERGE da 'correta' com as 'alternativas' em posição pseudo-aleatória determinística.
     - Prefixa a alternativa correta com a macro textual: "[correta] ".
+    - base_dir (opcional): diretório do JSON, para marcar imagens inexistentes.
     """
-    alph = "abcdefghijklmnopqrstuvwxyz"
     lines: List[str] = []
 
     seed = kwargs.get("seed", kwargs.get("shuffle_seed", None))
@@ -124,75 +177,9 @@ def preview_text(questions: List[Dict[str, Any]], title: str | None = None, **kw
         lines.append("")
 
     for q in qs:
-        # Cabeçalho da questão
-        enun = (q.get("enunciado") or "").strip()
-        try:
-            qid = int(q.get("id")) if q.get("id") is not None else "?"
-        except Exception:
-            qid = "?"
-        lines.append(f"{qid}) {enun}")
-
-        # Imagens do enunciado (marcadores)
-        imgs = q.get("imagens") or []
-        if isinstance(imgs, (list, tuple)) and imgs:
-            lines.append("")
-            for img in imgs:
-                p, w, h = _safe_img_spec(img)
-                if _is_img_path(p):
-                    size = f" {w}x{h}mm" if (w and h) else ""
-                    lines.append(f"   [imagem: {p}{size}]")
-                elif p:
-                    lines.append(f"   [imagem: {p}]")
-                else:
-                    lines.append("   [imagem inválida]")
-
-        # Afirmacoes + subenunciado
-        afirm = q.get("afirmacoes") or {}
-        if isinstance(afirm, dict) and afirm:
-            lines.append("")
-            order = ["I","II","III","IV","V","VI","VII","VIII","IX","X"]
-            for k in order:
-                if k in afirm:
-                    lines.append(f"   {k}. {str(afirm[k]).strip()}")
-            sub = (q.get("subenunciado") or "").strip()
-            if sub:
-                lines.append("")
-                lines.append(f"   {sub}")
-
         # Alternativas + MERGE da correta em posição determinística
-        base_alts = q.get("alternativas") or []
-        correta_val = q.get("correta", None)
-
-        alts = list(base_alts)  # cópia
-        correta_index = -1
-        if correta_val is not None and correta_val != "":
-            rng = _rng_for_q(seed, q)
-            pos = rng.randrange(0, len(alts) + 1)
-            # Se já existe, remove a 1ª ocorrência para não duplicar
-            try:
-                existing = next(i for i, a in enumerate(alts) if str(a) == str(correta_val))
-                alts.pop(existing)
-                if existing < pos:
-                    pos -= 1
-            except StopIteration:
-                pass
-            alts.insert(pos, correta_val)
-            correta_index = pos
-
-        # Render das alternativas — correta com prefixo [correta]
-        for i, alt in enumerate(alts):
-            label = alph[i] + ")" if i < len(alph) else f"{i+1})"
-            p, w, h = _safe_img_spec(alt)
-            if _is_img_path(p):
-                size = f" {w}x{h}mm" if (w and h) else ""
-                s_view = f"[imagem: {p}{size}]"
-            else:
-                s_view = p if isinstance(alt, (dict, list, tuple)) else (str(alt) if alt is not None else "")
-            if i == correta_index and s_view:
-                s_view = f"[correta] {s_view}"
-            lines.append(f"   {label} {s_view}")
-
-        lines.append("")
+        alts, correta_index = place_correta(q, seed)
+        lines.extend(question_lines(q, alts, correta_index, kwargs.get("base_dir")))
 
     if lines:
         return "\n".join(lines)
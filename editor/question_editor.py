@@ -699,7 +699,8 @@ class QuestionEditor(tk.Toplevel):
 
         # Mostra somente a questão corrente no preview
         try:
-            text_core = preview_text([deepcopy(q)], title="Pré-visualização")
+            text_core = preview_text([q], title="Pré-visualização",
+                                     base_dir=str(self.json_path.parent))  # preview_text não altera q
             self._set_preview(text_core.strip() or "(sem conteúdo)")
         except Exception as e:
             self._set_preview(f"[preview via core falhou]: {e}")
@@ -9,6 +9,7 @@ Janela principal com abas (Beamer / Test).
 """
 import io
 import json
+import logging
 import shutil
 from pathlib import Path
 from datetime import datetime
@@ -33,6 +34,9 @@ from gui.scrollable_frame import ScrollableFrame
 
 TREE_HEIGHT_ROWS = 3
 
+logger = logging.getLogger(__name__)
+
+
 class App(ttk.Frame):
     def __init__(self, master):
         super().__init__(master, padding=(10,10,10,6))
@@ -349,11 +353,42 @@ class App(ttk.Frame):
         for p in paths:
             if p not in existing:
                 self.tbl.insert("", "end", values=(p,))
+                self._log_bank_summary(p)
         self.update_output_path()
         self._update_buttons_state()
         self._update_scrollbar_visibility()
         self.update_output_docx_path()
 
+    def _log_bank_summary(self, path):
+        """
+        Registra no log quantas variantes cada questão do arquivo pode gerar. A leitura e a
+        contagem rodam numa thread (bancos grandes travariam a janela); o resultado volta
+        para a thread do Tk com after().
+        """
+        def _job():
+            line = self._bank_summary_line(path)
+            if line:
+                self.after(0, self.log, line)
+        threading.Thread(target=_job, daemon=True).start()
+
+    @staticmethod
+    def _bank_summary_line(path):
+        """Linha do log com as variantes por questão do arquivo (None se não der para ler)."""
+        try:
+            from core.loader import load_quiz
+            from core.variables import bank_summary
+            rows = bank_summary(load_quiz(path, isMath=False)["questions"])
+        except Exception:
+            logger.exception("Resumo de variantes indisponível para %s", path)
+            return None
+        parts = []
+        for r in rows:
+            if "erro" in r:
+                parts.append(f"id={r['id']}: erro")
+            else:
+                parts.append(f"id={r['id']}: {r['variantes']}")
+        return f"{Path(path).name}: {len(rows)} questão(ões); variantes por questão -> " + ", ".join(parts)
+
     def browse_jsons(self):
         sel = filedialog.askopenfilenames(
             title="Escolher JSON de questões (múltiplos)",
@@ -541,7 +576,8 @@ class App(ttk.Frame):
                 title=title,
                 fsq=fsq,
                 fsa=fsa,
-                alert_color=alert
+                alert_color=alert,
+                cache=True
             )
         except Exception as e:
             sys.stdout = old_stdout
@@ -605,7 +641,8 @@ class App(ttk.Frame):
                 title=title,
                 fsq=fsq,
                 fsa=fsa,
-                alert_color=alert
+                alert_color=alert,
+                cache=True
             )
         except Exception as e:
             sys.stdout = old_stdout
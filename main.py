@@ -4,11 +4,15 @@
 Ponto de entrada da aplicação.
 Responsabilidade: criar Tk() e instanciar a janela principal.
 """
+import multiprocessing
 import tkinter as tk
 import tkinter.font as tkfont
 from gui.app_window import App
+from core import cache as parse_cache
 
 def main():
+    # Cache em disco das questões normalizadas (evita reparse a cada "Gerar")
+    parse_cache.configure(enabled=True)
     root = tk.Tk()
     # Ajuste de fontes padrão (Windows)
     for name in ("TkDefaultFont", "TkTextFont", "TkMenuFont", "TkHeadingFont", "TkTooltipFont"):
@@ -23,4 +27,5 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # pool de leitura do core no executável (PyInstaller)
     main()
@@ -1,11 +1,22 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 from pathlib import Path
+import logging
+import random
+import time
 from docx import Document
 from docx.shared import Inches
 
-from core import load_quiz
+from core.assets import prepare_assets, rewrite_images
+from core.images import image_exists, resolve_image
+from core.index import QuestionIndex
+from core.loader import _finish_question, _load_normalized, _run_tasks
+from core.models import ImageSpec, is_image_path
+from core.pipeline import alt_label, place_correta
+from core.strategies import AttributeIndex, sample_quotas
+
+logger = logging.getLogger(__name__)
 
 # -------------------------------
 # Util
@@ -22,20 +33,10 @@ def _parse_img_spec(s: str) -> Tuple[str, Optional[float], Optional[float]]:
     """
     if not isinstance(s, str):
         return s, None, None
-    if ';' in s:
-        path, size = s.split(';', 1)
-        import re
-        m = re.match(r'^\s*(\d+(?:\.\d+)?)x(\d+(?:\.\d+)?)\s*$', size.strip())
-        if m:
-            return path.strip(), float(m.group(1)), float(m.group(2))
-        return path.strip(), None, None
-    return s.strip(), None, None
-
-def _is_image_path(s: str) -> bool:
-    if not isinstance(s, str):
-        return False
-    p = s.split(';', 1)[0].strip()
-    return any(p.lower().endswith(ext) for ext in IMG_EXTS)
+    spec = ImageSpec.parse(s)
+    return spec.path, spec.width_mm, spec.height_mm
+
+_is_image_path = is_image_path
 
 def _get_correta_tuple(q: Dict[str, Any]) -> Tuple[Optional[int], Any]:
     """
@@ -55,24 +56,91 @@ def _get_correta_tuple(q: Dict[str, Any]) -> Tuple[Optional[int], Any]:
 # Carregamento (via core)
 # -------------------------------
 
-def _load_questions(json_paths: List[str], *, seed: Optional[int]) -> List[Dict[str, Any]]:
+def _load_raw_questions(json_paths: List[str]) -> List[Tuple[Dict[str, Any], str, str]]:
     """
-    Lê cada JSON com o core (que normaliza, resolve e prepara alternativas) e
-    anota o diretório base em '_base_dir' para resolver caminhos de imagem.
+    Lê e normaliza (sem resolver) as questões de cada JSON: [(questão, base_dir, arquivo), ...],
+    na mesma ordem e quantidade que load_quiz devolveria.
     """
-    out: List[Dict[str, Any]] = []
+    out: List[Tuple[Dict[str, Any], str, str]] = []
     for p in json_paths:
-        ds = load_quiz(p, seed=seed)
+        questions, _ = _load_normalized(p)
         base_dir = str(Path(p).parent.resolve())
-        for q in ds.get("questions", []):
-            if isinstance(q, dict):
-                # não troca referência nem estrutura; só anota o base_dir para render
-                if "_base_dir" not in q:
-                    q["_base_dir"] = base_dir
-                out.append(q)
+        out.extend((q, base_dir, str(p)) for q in questions if isinstance(q, dict))
     return out
 
 
+def _select_questions(items: List[Any], *, seed: Optional[int], num: Optional[int], shuffle: bool) -> List[Any]:
+    """
+    Ordem/seleção das questões: random.Random(seed).shuffle na lista toda e depois as
+    'num' primeiras. A permutação só depende da seed e do tamanho da lista, então é a
+    mesma com questões brutas ou resolvidas.
+    """
+    items = list(items)
+    if shuffle and len(items) > 1:
+        random.Random(seed).shuffle(items)
+    if isinstance(num, int) and num > 0:
+        items = items[:num]
+    return items
+
+
+def _select_by_quotas(items: List[Tuple[Dict[str, Any], str, str]], quotas: Any, *, seed: Optional[int]) -> List[Any]:
+    """Seleção por cotas (dificuldade/tipo/arquivo, com pesos); ver core.strategies."""
+    index = AttributeIndex.from_questions([q for q, _, _ in items], files=[src for _, _, src in items])
+    return [items[i] for i in sample_quotas(index, quotas, seed=seed)]
+
+
+def _resolve_selected(items: List[Tuple[Dict[str, Any], str, str]], *, seed: Optional[int]) -> List[Dict[str, Any]]:
+    """
+    Resolve só as questões escolhidas (resolve_all + shuffle das alternativas). Os
+    sorteios de cada questão dependem só da seed e da própria questão (core.seeds),
+    então o resultado é igual ao de resolver o banco inteiro.
+    """
+    out: List[Dict[str, Any]] = []
+    for q, base_dir, _ in items:
+        q = _finish_question(dict(q), seed=seed, isMath=True)
+        # não troca referência nem estrutura; só anota o base_dir para render
+        if "_base_dir" not in q:
+            q["_base_dir"] = base_dir
+        out.append(q)
+    return out
+
+
+def _index_files(json_paths: List[str]) -> List[str]:
+    """Arquivos que o índice guarda para as fontes (diretório → seus *.json, como em update())."""
+    out: List[str] = []
+    for p in json_paths:
+        p = Path(p)
+        out += [str(f) for f in sorted(p.glob("*.json"))] if p.is_dir() else [str(p)]
+    return out
+
+
+def _load_from_index(
+    index: Any, json_paths: List[str], *, seed: Optional[int], num: Optional[int], shuffle: bool, quotas: Any,
+) -> List[Dict[str, Any]]:
+    """
+    Seleção pelo índice SQLite (core.index): atualiza o índice (só o que mudou), escolhe
+    pelos metadados (cotas, sample(num) ou shuffle das entradas) e lê/resolve só as
+    escolhidas (QuestionIndex.load). 'index': QuestionIndex, caminho do .sqlite ou True
+    (índice padrão, no diretório do cache).
+    """
+    own = not isinstance(index, QuestionIndex)
+    idx = QuestionIndex(None if index is True else index) if own else index
+    try:
+        idx.update(json_paths)
+        files = _index_files(json_paths)
+        if quotas:
+            entries = idx.select(files=files)
+            chosen = [entries[i] for i in sample_quotas(AttributeIndex.from_entries(entries), quotas, seed=seed)]
+        elif shuffle and seed is not None and isinstance(num, int) and num > 0:
+            chosen = idx.sample(num, seed=seed, files=files)
+        else:
+            chosen = _select_questions(idx.select(files=files), seed=seed, num=num, shuffle=shuffle)
+        return idx.load(chosen, seed=seed, isMath=True, base_dir=True)
+    finally:
+        if own:
+            idx.close()
+
+
 # -------------------------------
 # Renderização para DOCX
 # -------------------------------
@@ -86,7 +154,6 @@ def _compose_docx_block(q: Dict[str, Any], seq: int) -> List[Dict[str, Any]]:
     - Não faz resolve/shuffle local: tudo vem pronto do core.
     """
     runs: List[Dict[str, Any]] = []
-    alph = "abcdefghijklmnopqrstuvwxyz"
     base_dir = q.get("_base_dir") or ""
     # Se quiser um placeholder padrão, defina aqui; por ora só um marcador textual quando não achar a imagem.
 
@@ -99,9 +166,9 @@ def _compose_docx_block(q: Dict[str, Any], seq: int) -> List[Dict[str, Any]]:
     if isinstance(imgs, list):
         for img in imgs:
             spec_p, wmm, hmm = _parse_img_spec(img)
-            p = Path(base_dir, spec_p) if base_dir else Path(spec_p)
+            p = resolve_image(spec_p, base_dir)
             runs.append({"type": "text", "text": ""})  # garante quebra/ancoragem
-            if p.exists():
+            if image_exists(p):
                 runs.append({"type": "image", "path": str(p), "width_mm": wmm, "height_mm": hmm})
             else:
                 runs.append({"type": "text", "text": "[imagem]\n"})
@@ -123,13 +190,13 @@ def _compose_docx_block(q: Dict[str, Any], seq: int) -> List[Dict[str, Any]]:
     # 4) Alternativas (já preparadas pelo core: mescladas/deduplicadas/embaralhadas)
     alts = q.get("alternativas") or []
     for i, alt in enumerate(alts):
-        label = alph[i] + ")" if i < len(alph) else f"{i+1})"
+        label = alt_label(i)
         s = str(alt or "")
         if _is_image_path(s):
             spec_p, wmm, hmm = _parse_img_spec(s)
-            p = Path(base_dir, spec_p) if base_dir else Path(spec_p)
+            p = resolve_image(spec_p, base_dir)
             runs.append({"type": "text", "text": f"  {label} "})
-            if p.exists():
+            if image_exists(p):
                 runs.append({"type": "image", "path": str(p), "width_mm": wmm, "height_mm": hmm})
             else:
                 runs.append({"type": "text", "text": "[imagem]\n"})
@@ -140,8 +207,8 @@ def _compose_docx_block(q: Dict[str, Any], seq: int) -> List[Dict[str, Any]]:
     runs.append({"type": "text", "text": "\n"})
     return runs
 
-def _render_blocks_for_docx(resolved: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
-    return [_compose_docx_block(q, i + 1) for i, q in enumerate(resolved)]
+def _render_blocks_for_docx(resolved: List[Dict[str, Any]], image_map=None) -> List[List[Dict[str, Any]]]:
+    return [_compose_docx_block(rewrite_images(q, image_map, q.get("_base_dir")), i + 1) for i, q in enumerate(resolved)]
 
 
 # -------------------------------
@@ -157,86 +224,215 @@ def json2docx(
     num: Optional[int] = None,
     seed: Optional[int] = None,
     shuffle: bool = True,
+    quotas: Any = None,
+    optimize_images: bool = False,
+    index: Any = None,
 ) -> int:
     """
     Gera DOCX a partir de 1+ JSONs:
     - O core resolve variáveis (<VAR>, <VAR OP NUM>), normaliza chaves 'nome;valor' e
       prepara alternativas (merge correta, dedup, shuffle determinístico por questão).
     - Aqui embaralhamos **apenas** a ordem das questões (se 'shuffle=True').
-    - Seleciona 'num' primeiras após o shuffle (se informado).
+    - Seleciona 'num' primeiras após o shuffle (se informado); a escolha é feita sobre as
+      questões normalizadas e só as escolhidas são resolvidas (mesmo resultado, mesma ordem).
+    - quotas: em vez de "embaralha e pega N", sorteia por cotas de dificuldade/tipo/arquivo,
+      ex.: [{"n": 3, "dificuldade": "facil"}, {"n": 2, "tipo": 3}] (ver core.strategies);
+      'num' e 'shuffle' são ignorados.
     - Insere figuras declaradas na questão (caminhos relativos ao JSON).
+    - optimize_images: insere cópias reduzidas/convertidas das figuras (core.assets).
+    - index: escolhe pelo índice SQLite (QuestionIndex, caminho do .sqlite ou True = índice
+      padrão) e lê só as questões escolhidas, sem carregar o banco. Com 'num' e seed o
+      sorteio é o de QuestionIndex.sample (outras questões que sem índice, mesma seed →
+      mesma prova); as questões em si saem iguais às do load_quiz.
     """
 
-    # 1) Carregar tudo via core (sem tratar "tipo")
-    resolved: List[Dict[str, Any]] = _load_questions(json_paths, seed=seed)
+    if index is not None:
+        resolved: List[Dict[str, Any]] = _load_from_index(
+            index, json_paths, seed=seed, num=num, shuffle=shuffle, quotas=quotas)
+    else:
+        # 1) Ler/normalizar tudo via core, sem resolver (sem tratar "tipo")
+        raw = _load_raw_questions(json_paths)
 
-    # 2) Embaralhar ordem das questões (opcional)
-    if shuffle and len(resolved) > 1:
-        import random
-        rng = random.Random(seed)
-        rng.shuffle(resolved)
+        # 2) Embaralhar ordem das questões (opcional) e 3) selecionar N primeiras (se num>0),
+        #    ou sortear pelas cotas
+        if quotas:
+            selected = _select_by_quotas(raw, quotas, seed=seed)
+        else:
+            selected = _select_questions(raw, seed=seed, num=num, shuffle=shuffle)
 
-    # 3) Selecionar N primeiras (se num>0)
-    if isinstance(num, int) and num > 0:
-        resolved = resolved[:num]
+        # Só as escolhidas são resolvidas (variáveis, alternativas) e renderizadas
+        resolved = _resolve_selected(selected, seed=seed)
 
     # 4) Renderizar no DOCX (substituindo placeholder ou anexando ao fim)
+    image_map = prepare_assets((q, q.get("_base_dir")) for q in resolved) if optimize_images else None
+    _write_docx(template, out_docx, placeholder, _render_blocks_for_docx(resolved, image_map))
+    return 0
+
+
+def _add_block(document: Document, block: List[Dict[str, Any]]) -> None:
+    pr = document.add_paragraph()
+    for run in block:
+        if run["type"] == "text":
+            pr.add_run(run["text"])
+        elif run["type"] == "image":
+            try:
+                wmm = run.get("width_mm"); hmm = run.get("height_mm")
+                if wmm and hmm:
+                    pr.add_run().add_picture(
+                        run["path"],
+                        width=Inches(mm_to_inches(wmm)),
+                        height=Inches(mm_to_inches(hmm)),
+                    )
+                else:
+                    pr.add_run().add_picture(run["path"], width=Inches(5.5))
+            except Exception:
+                pr.add_run("[imagem]")
+
+
+def _write_docx(template: str, out_docx: str, placeholder: str, blocks: List[List[Dict[str, Any]]]) -> None:
+    """Abre o template, troca o parágrafo do placeholder pelos blocos (ou anexa ao fim) e salva."""
     doc = Document(template)
+    for para in doc.paragraphs:
+        if placeholder in para.text:
+            p = para._p
+            p.getparent().remove(p)
+            break
+    # os blocos vão para o fim do corpo (com ou sem placeholder)
+    for block in blocks:
+        _add_block(doc, block)
+
+    Path(out_docx).parent.mkdir(parents=True, exist_ok=True)
+    doc.save(out_docx)
+
+
+# -------------------------------
+# Várias versões da mesma prova
+# -------------------------------
+
+class VersionReport(NamedTuple):
+    versao: str                 # "A", "B", ..., "Z", "AA", ...
+    seed: Optional[int]
+    arquivo: str
+    questoes: int
+    gabarito: List[str]         # letra da correta de cada questão ("-" se não houver)
+    segundos: float             # tempo do worker: resolver + montar + salvar o .docx
+
+
+def _version_name(k: int) -> str:
+    """0 → A, 25 → Z, 26 → AA, ... (como colunas de planilha)."""
+    name = ""
+    k += 1
+    while k:
+        k, r = divmod(k - 1, 26)
+        name = chr(ord("A") + r) + name
+    return name
+
+
+def _render_version_task(
+    items: List[Tuple[Dict[str, Any], str, str]], seed: Optional[int], template: str, placeholder: str, out_docx: str,
+    image_map=None,
+) -> Tuple[List[str], float]:
+    """
+    Tarefa de worker: resolve as questões da versão, insere a correta (core.pipeline.place_correta,
+    a mesma posição do beamer/preview), salva o .docx e devolve (gabarito, segundos).
+    """
+    t0 = time.perf_counter()
+    blocks: List[List[Dict[str, Any]]] = []
+    answers: List[str] = []
+    for i, q in enumerate(_resolve_selected(items, seed=seed)):
+        alts, idx = place_correta(q, seed)
+        q = rewrite_images(dict(q, alternativas=alts), image_map, q.get("_base_dir"))
+        blocks.append(_compose_docx_block(q, i + 1))
+        answers.append(alt_label(idx)[:-1] if idx >= 0 else "-")
+    _write_docx(template, out_docx, placeholder, blocks)
+    return answers, time.perf_counter() - t0
 
-    def replace_placeholder(document: Document, placeholder_text: str, blocks: List[List[Dict[str, Any]]]) -> bool:
-        for para in document.paragraphs:
-            if placeholder_text in para.text:
-                p = para._p
-                parent = p.getparent()
-                idx = parent.index(p)
-                parent.remove(p)
-                # Inserir logo após o parágrafo removido
-                for block in blocks:
-                    pr = document.add_paragraph()
-                    for run in block:
-                        if run["type"] == "text":
-                            pr.add_run(run["text"])
-                        elif run["type"] == "image":
-                            try:
-                                wmm = run.get("width_mm"); hmm = run.get("height_mm")
-                                if wmm and hmm:
-                                    pr.add_run().add_picture(
-                                        run["path"],
-                                        width=Inches(mm_to_inches(wmm)),
-                                        height=Inches(mm_to_inches(hmm)),
-                                    )
-                                else:
-                                    pr.add_run().add_picture(run["path"], width=Inches(5.5))
-                            except Exception:
-                                pr.add_run("[imagem]")
-                return True
-        return False
-
-    blocks = _render_blocks_for_docx(resolved)
-    if not replace_placeholder(doc, placeholder, blocks):
-        # Se placeholder não encontrado, adiciona ao final do documento
-        for block in blocks:
-            pr = doc.add_paragraph()
-            for run in block:
-                if run["type"] == "text":
-                    pr.add_run(run["text"])
-                elif run["type"] == "image":
-                    try:
-                        wmm = run.get("width_mm"); hmm = run.get("height_mm")
-                        if wmm and hmm:
-                            pr.add_run().add_picture(
-                                run["path"],
-                                width=Inches(mm_to_inches(wmm)),
-                                height=Inches(mm_to_inches(hmm)),
-                            )
-                        else:
-                            pr.add_run().add_picture(run["path"], width=Inches(5.5))
-                    except Exception:
-                        pr.add_run("[imagem]")
 
+def _write_answer_key(out_docx: str, title: str, reports: List[VersionReport]) -> None:
+    """Gabarito consolidado: uma linha por questão, uma coluna por versão."""
+    doc = Document()
+    doc.add_heading(f"{title} — Gabarito", level=1)
+    rows = max((len(r.gabarito) for r in reports), default=0)
+    table = doc.add_table(rows=rows + 1, cols=len(reports) + 1)
+    table.style = "Table Grid"
+    # linha a linha (table.cell(i, j) recalcula a grade inteira a cada chamada)
+    for i, row in enumerate(table.rows):
+        cells = row.cells
+        cells[0].text = "Questão" if i == 0 else str(i)
+        for j, r in enumerate(reports, start=1):
+            if i == 0:
+                cells[j].text = r.versao
+            elif i <= len(r.gabarito):
+                cells[j].text = r.gabarito[i - 1]
     Path(out_docx).parent.mkdir(parents=True, exist_ok=True)
     doc.save(out_docx)
-    return 0
+
+
+def json2docx_versions(
+    json_paths: List[str],
+    template: str,
+    versions: Optional[int] = None,
+    seeds: Optional[List[Optional[int]]] = None,
+    out_dir: str = ".",
+    placeholder: str = "{{QUESTOES}}",
+    title: str = "Prova",
+    num: Optional[int] = None,
+    shuffle: bool = True,
+    quotas: Any = None,
+    workers: Optional[int] = 0,
+    answer_key: Optional[str] = "gabarito.docx",
+    optimize_images: bool = False,
+) -> List[VersionReport]:
+    """
+    Gera várias versões da prova (prova_A.docx, prova_B.docx, ...) e um gabarito consolidado:
+    - O banco é lido/normalizado **uma vez**; cada versão escolhe suas questões com a sua
+      seed (shuffle + 'num', como json2docx, ou 'quotas' sem repetir questões entre versões).
+    - Cada versão é resolvida e salva num worker (pool de processos; 0 = um por CPU,
+      None/1 = em série); o resultado não depende do número de workers.
+    - Diferente de json2docx, a correta é inserida entre as alternativas (posição
+      determinística por questão e seed) para que o gabarito tenha a letra.
+    - seeds: uma por versão (padrão 1..versions). Retorna um VersionReport por versão,
+      com o gabarito e o tempo gasto.
+    - optimize_images: as figuras de todas as versões são otimizadas uma vez (core.assets).
+    """
+    if seeds is None:
+        if not versions or versions < 1:
+            raise ValueError("Informe versions (>= 1) ou a lista de seeds.")
+        seeds = list(range(1, versions + 1))
+    elif versions is not None and versions != len(seeds):
+        raise ValueError(f"versions={versions} mas {len(seeds)} seeds informadas.")
+
+    t0 = time.perf_counter()
+    raw = _load_raw_questions(json_paths)
+    if quotas:
+        index = AttributeIndex.from_questions([q for q, _, _ in raw], files=[src for _, _, src in raw])
+        taken: set = set()
+        picks = []
+        for s in seeds:
+            chosen = sample_quotas(index, quotas, seed=s, exclude=taken)
+            taken.update(chosen)
+            picks.append([raw[i] for i in chosen])
+    else:
+        picks = [_select_questions(raw, seed=s, num=num, shuffle=shuffle) for s in seeds]
+    logger.info("Banco lido e versões sorteadas em %.2fs (%d questões).", time.perf_counter() - t0, len(raw))
+
+    names = [_version_name(k) for k in range(len(seeds))]
+    paths = [str(Path(out_dir, f"prova_{name}.docx")) for name in names]
+    image_map = None
+    if optimize_images:
+        image_map = prepare_assets(((q, base_dir) for items in picks for q, base_dir, _ in items), workers=workers)
+    tasks = [(items, s, template, placeholder, out, image_map) for items, s, out in zip(picks, seeds, paths)]
+    results = _run_tasks(_render_version_task, tasks, workers)
+
+    reports = [
+        VersionReport(name, s, out, len(items), answers, secs)
+        for name, s, out, items, (answers, secs) in zip(names, seeds, paths, picks, results)
+    ]
+    for r in reports:
+        logger.info("Versão %s (seed=%s): %d questões em %.2fs → %s", r.versao, r.seed, r.questoes, r.segundos, r.arquivo)
+    if answer_key:
+        _write_answer_key(str(Path(out_dir, answer_key)), title, reports)
+    return reports
 
 
 # Backward compat para o seu GUI
@@ -248,7 +444,10 @@ def jsons_to_docx(
     title='Prova',
     num=None,
     seed=None,
-    shuffle=True
+    shuffle=True,
+    quotas=None,
+    optimize_images=False,
+    index=None
 ):
     return json2docx(
         json_paths,
@@ -258,5 +457,8 @@ def jsons_to_docx(
         title=title,
         num=num,
         seed=seed,
-        shuffle=shuffle
+        shuffle=shuffle,
+        quotas=quotas,
+        optimize_images=optimize_images,
+        index=index
     )
\ No newline at end of file
@@ -0,0 +1,103 @@
+import pytest
+
+from beamer.generator import write_tex_stream
+
+
+def test_write_tex_stream_is_atomic(tmp_path):
+    out = tmp_path / "slides.tex"
+    write_tex_stream(out, iter(["a", "b\n", "c"]), buffer_size=2)
+    assert out.read_text(encoding="utf-8") == "\n".join(["a", "b\n", "c"])
+
+    def failing():
+        yield "parcial"
+        raise RuntimeError("falhou no meio")
+
+    with pytest.raises(RuntimeError):
+        write_tex_stream(out, failing())
+    assert out.read_text(encoding="utf-8") == "a\nb\n\nc"
+    assert [p.name for p in tmp_path.iterdir()] == ["slides.tex"]
+
+
+def test_parallel_frames_match_serial(tmp_path):
+    import json
+
+    from beamer.generator import json2beamer
+
+    bank = [{"id": i, "enunciado": f"Quanto vale <X>*{i}?", "variaveis": {"X": "1:1:30"},
+             "alternativas": ["<X*2>", "<X*3>", "<X*4>"], "correta": "<X*%d>" % i, "obs": "ok"}
+            for i in range(80, 0, -1)]
+    fp = tmp_path / "banco.json"
+    fp.write_text(json.dumps(bank), encoding="utf-8")
+    json2beamer(str(fp), str(tmp_path / "serie.tex"), shuffle_seed=4)
+    json2beamer(str(fp), str(tmp_path / "paralelo.tex"), shuffle_seed=4, workers=2)
+    assert (tmp_path / "serie.tex").read_bytes() == (tmp_path / "paralelo.tex").read_bytes()
+
+
+def test_frame_cache_and_fragments(tmp_path, monkeypatch):
+    import json
+
+    import beamer.generator as gen
+    from core import cache as parse_cache
+
+    monkeypatch.setattr(parse_cache, "_CACHE_DIR", tmp_path / "cache" / "parse")
+    bank = [{"id": i, "enunciado": f"Quanto vale <X>+{i}?", "variaveis": {"X": "1:1:9"},
+             "alternativas": ["<X+1>", "<X+2>"], "correta": "<X>"} for i in range(1, 11)]
+    fp = tmp_path / "banco.json"
+    fp.write_text(json.dumps(bank), encoding="utf-8")
+
+    rendered = []
+    real = gen.question_frames
+    monkeypatch.setattr(gen, "question_frames", lambda q, *a: rendered.append(q["id"]) or real(q, *a))
+
+    gen.json2beamer(str(fp), str(tmp_path / "sem_cache.tex"), shuffle_seed=3)
+    gen.json2beamer(str(fp), str(tmp_path / "com_cache.tex"), shuffle_seed=3, cache=True)
+    assert (tmp_path / "sem_cache.tex").read_bytes() == (tmp_path / "com_cache.tex").read_bytes()
+    # o banco de frames fica dentro do diretório configurado do cache
+    assert (tmp_path / "cache" / "parse" / "frames" / "frames.sqlite").is_file()
+
+    bank[4]["enunciado"] = "Quanto vale <X>+50?"
+    fp.write_text(json.dumps(bank), encoding="utf-8")
+    rendered.clear()
+    gen.json2beamer(str(fp), str(tmp_path / "com_cache.tex"), shuffle_seed=3, cache=True)
+    assert rendered == [5]
+
+    gen.json2beamer(str(fp), str(tmp_path / "slides.tex"), shuffle_seed=3, cache=True, fragments=True)
+    main = (tmp_path / "slides.tex").read_text(encoding="utf-8")
+    assert "\\input{slides_frames/q5}" in main
+    assert "50" in (tmp_path / "slides_frames" / "q5.tex").read_text(encoding="utf-8")
+    assert len(list((tmp_path / "slides_frames").glob("q*.tex"))) == 10
+
+
+def test_frame_cache_evict_shrinks_file(tmp_path, monkeypatch):
+    from beamer import frame_cache
+    from core import cache as parse_cache
+
+    monkeypatch.setattr(parse_cache, "_CACHE_DIR", tmp_path / "parse")
+    frame_cache.put_many({f"k{i:04d}": "x" * 2000 for i in range(1000)})
+    frame_cache.put("recente", "y" * 2000)
+    db_file = frame_cache.get_frames_dir() / "frames.sqlite"
+    disk = lambda: sum(p.stat().st_size for p in db_file.parent.glob("frames.sqlite*"))
+    assert disk() > 2_000_000
+
+    frame_cache.evict(max_bytes=500_000)
+    assert disk() <= 600_000
+    assert frame_cache.get("recente") == "y" * 2000  # o mais recente fica
+    assert frame_cache.get("k0000") is None           # os mais antigos saem
+
+
+def test_ids_in_order_are_streamed(tmp_path):
+    import json
+
+    from beamer.generator import _sorted_questions, json2beamer
+
+    bank = [{"id": i, "enunciado": f"Quanto vale <X>+{i}?", "variaveis": {"X": "1:1:9"},
+             "alternativas": ["<X+1>", "<X+2>"], "correta": "<X+%d>" % i} for i in range(1, 21)]
+    ordered, shuffled = tmp_path / "ordem.json", tmp_path / "fora.json"
+    ordered.write_text(json.dumps(bank), encoding="utf-8")
+    shuffled.write_text(json.dumps(bank[::-1]), encoding="utf-8")
+
+    assert not isinstance(_sorted_questions(str(ordered))[1], list)
+    assert isinstance(_sorted_questions(str(shuffled))[1], list)
+    json2beamer(str(ordered), str(tmp_path / "a.tex"), shuffle_seed=7)
+    json2beamer(str(shuffled), str(tmp_path / "b.tex"), shuffle_seed=7)
+    assert (tmp_path / "a.tex").read_bytes() == (tmp_path / "b.tex").read_bytes()
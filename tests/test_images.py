@@ -0,0 +1,113 @@
+import os
+import re
+from pathlib import Path
+
+from core import images
+
+
+def test_image_info_cache_and_revalidation(tmp_path, monkeypatch):
+    from collections import OrderedDict
+
+    from PIL import Image
+
+    from beamer.frame_cache import image_fingerprint
+
+    monkeypatch.setattr(images, "_CACHE", OrderedDict())
+    monkeypatch.setattr(images, "STAT_TTL", 60.0)
+    monkeypatch.setattr(images, "MAX_ENTRIES", images.MAX_ENTRIES)
+    Image.new("RGB", (40, 20)).save(tmp_path / "fig.png")
+    info = images.image_info("fig.png", str(tmp_path), dimensions=True)
+    assert info.exists and (info.width, info.height) == (40, 20)
+
+    # dentro do prazo: a remoção ainda não é vista pelo cache, mas a chave de frames sim
+    os.remove(tmp_path / "fig.png")
+    assert images.image_exists("fig.png", str(tmp_path))
+    assert image_fingerprint("fig.png", str(tmp_path)).endswith("|-")
+
+    images.configure(ttl=0)
+    assert not images.image_exists("fig.png", str(tmp_path))
+
+    Image.new("RGB", (8, 6)).save(tmp_path / "fig.png")
+    info = images.image_info(tmp_path / "fig.png", dimensions=True)
+    assert (info.width, info.height) == (8, 6)
+
+    # limite de entradas (LRU)
+    images.configure(max_entries=3)
+    for i in range(10):
+        images.image_info(f"x{i}.png", str(tmp_path))
+    assert len(images._CACHE) == 3
+
+
+def test_preview_marks_missing_images(tmp_path):
+    from editor.preview import preview_text
+
+    q = {"id": 1, "enunciado": "Veja", "imagens": ["falta.png"], "alternativas": ["a"], "correta": "b"}
+    assert "(não encontrada)" in preview_text([q], base_dir=str(tmp_path))
+    assert "(não encontrada)" not in preview_text([q])
+
+
+def test_assets_downscale_convert_and_reuse(tmp_path, monkeypatch):
+    import json
+
+    from PIL import Image
+
+    from beamer.generator import json2beamer
+    from core import assets, cache
+
+    Image.new("RGB", (3000, 1500), "red").save(tmp_path / "foto.png")
+    Image.new("RGB", (100, 50), "blue").save(tmp_path / "fig.bmp")
+    q = {"id": 1, "tipo": 2, "enunciado": "Veja", "imagens": ["foto.png;40x20"],
+         "alternativas": ["fig.bmp", "foto.png;20x10"], "correta": "foto.png"}
+    (tmp_path / "banco.json").write_text(json.dumps([q]), encoding="utf-8")
+
+    monkeypatch.setattr(cache, "_CACHE_DIR", tmp_path / "cache" / "parse")
+    monkeypatch.setattr(cache, "_MAX_BYTES", cache.DEFAULT_MAX_BYTES)
+    image_map = assets.prepare_assets([(q, str(tmp_path))], dpi=254, workers=None)
+    foto = image_map[(str(tmp_path), "foto.png;40x20")]
+    assert foto.endswith(".png;40x20")
+    with Image.open(foto.split(";")[0]) as im:
+        assert im.size == (400, 200)
+    # caixa com outra proporção: cabe nela sem distorcer
+    square = assets.prepare_assets([({"imagens": ["foto.png;40x40"]}, str(tmp_path))], dpi=254, workers=None)
+    with Image.open(square[(str(tmp_path), "foto.png;40x40")].split(";")[0]) as im:
+        assert im.size == (400, 200)
+    bmp = image_map[(str(tmp_path), "fig.bmp")]
+    assert bmp.endswith(".png") and Path(bmp).parent == tmp_path / "cache" / "parse" / "assets"
+    # mesmo conteúdo → mesmo arquivo (nada é convertido de novo)
+    assert assets.prepare_assets([(q, str(tmp_path))], dpi=254, workers=None) == image_map
+
+    plain, optimized = tmp_path / "a.tex", tmp_path / "b.tex"
+    json2beamer(str(tmp_path / "banco.json"), str(plain), shuffle_seed=3)
+    json2beamer(str(tmp_path / "banco.json"), str(optimized), shuffle_seed=3, optimize_images=True)
+    text = optimized.read_text(encoding="utf-8")
+    assert assets.get_assets_dir().as_posix() in text and "foto.png" not in text
+    # só os caminhos mudam: a posição da correta é a mesma
+    strip = lambda t: re.sub(r"\{[^{}]*\.(png|bmp)\}", "{}", t)
+    assert strip(text) == strip(plain.read_text(encoding="utf-8"))
+
+    # cache acima do limite: as imagens do mapa devolvido continuam no disco
+    cache.configure(max_bytes=1)
+    image_map = assets.prepare_assets([(q, str(tmp_path))], dpi=100, workers=None)
+    assert image_map and all(Path(v.split(";")[0]).is_file() for v in image_map.values())
+
+
+def test_assets_apply_exif_orientation(tmp_path, monkeypatch):
+    from PIL import Image
+
+    from core import assets, cache
+
+    monkeypatch.setattr(cache, "_CACHE_DIR", tmp_path / "cache" / "parse")
+    # gravada deitada (esquerda vermelha, direita azul); EXIF 6 = exibir girada 90° horária
+    im = Image.new("RGB", (300, 200), "blue")
+    im.paste("red", (0, 0, 150, 200))
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    im.save(tmp_path / "celular.jpg", exif=exif.tobytes())
+
+    for spec in ("celular.jpg", "celular.jpg;20x30"):
+        image_map = assets.prepare_assets([({"imagens": [spec]}, str(tmp_path))], dpi=254, workers=None)
+        with Image.open(image_map[(str(tmp_path), spec)].split(";")[0]) as out:
+            assert out.size == (200, 300)
+            assert out.getexif().get(0x0112, 1) == 1
+            top, bottom = out.getpixel((100, 20)), out.getpixel((100, 280))
+            assert top[0] > 200 > top[2] and bottom[2] > 200 > bottom[0]
@@ -0,0 +1,110 @@
+import json
+import os
+
+import pytest
+
+from core.index import QuestionIndex
+from core.loader import QuizLoadError, load_quiz
+
+
+def _bank(prefix, n, dificuldade):
+    return [
+        {"id": f"{prefix}{i}", "enunciado": f"Quanto vale <X>+{i}?", "variaveis": {"X": "1:1:9"},
+         "alternativas": ["<X+1>", "<X+2>", "<X+3>"], "correta": "<X+%d>" % i,
+         "dificuldade": dificuldade, "imagens": ["fig.png;30x20"] if i == 1 else []}
+        for i in range(1, n + 1)
+    ]
+
+
+def test_index_select_load_and_incremental_update(tmp_path):
+    (tmp_path / "a.json").write_text(json.dumps(_bank("a", 6, "facil")), encoding="utf-8")
+    (tmp_path / "b.json").write_text(json.dumps({"questoes": _bank("b", 4, "dificil")}, indent=2), encoding="utf-8")
+
+    with QuestionIndex(tmp_path / "idx.sqlite") as idx:
+        st = idx.update(tmp_path)
+        assert (st.indexed, st.questions) == (2, 10)
+        assert idx.count(dificuldade="dificil") == 4
+        entries = idx.select(dificuldade="dificil")
+        assert [e.qid for e in entries] == ["b1", "b2", "b3", "b4"]
+        assert idx.images(entries[0]) == ["fig.png"]
+
+        expected = load_quiz(tmp_path / "b.json", seed=5)["questions"]
+        assert idx.load(entries, seed=5) == expected
+
+        picked = idx.sample(3, seed=9)
+        assert len(picked) == 3 and picked == idx.sample(3, seed=9)
+
+        assert idx.update(tmp_path).unchanged == 2
+        (tmp_path / "a.json").write_text(json.dumps(_bank("a", 2, "facil")), encoding="utf-8")
+        os.remove(tmp_path / "b.json")
+        st = idx.update(tmp_path)
+        assert (st.indexed, st.removed, st.questions) == (1, 1, 2)
+        assert idx.count() == 2
+
+
+def test_index_update_is_atomic_per_file_and_sample_is_spread(tmp_path):
+    fp = tmp_path / "a.json"
+    fp.write_text(json.dumps(_bank("a", 40, "facil")), encoding="utf-8")
+    with QuestionIndex(tmp_path / "idx.sqlite") as idx:
+        idx.update(fp)
+        # 2ª questão corrompida: a leitura falha no meio do arquivo
+        text = json.dumps(_bank("a", 3, "facil"))
+        fp.write_text(text.replace('"id": "a2"', '"id": a2'), encoding="utf-8")
+        with pytest.raises(QuizLoadError):
+            idx.update(fp)
+        assert idx.count() == 40  # nada do arquivo novo foi gravado
+        fp.write_text(text, encoding="utf-8")
+        assert idx.update(fp).questions == 3
+
+        fp.write_text(json.dumps(_bank("a", 200, "facil")), encoding="utf-8")
+        idx.update(fp)
+        runs = set()
+        for seed in range(20):
+            seqs = sorted(e.seq for e in idx.sample(10, seed=seed))
+            assert len(set(seqs)) == 10
+            runs.add(all(b - a == 1 for a, b in zip(seqs, seqs[1:])))
+        assert runs == {False}
+
+
+class _CountingDB:
+    """Conexão que conta as linhas lidas dos cursores."""
+
+    def __init__(self, db):
+        self.db, self.rows = db, 0
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+    def execute(self, *args):
+        cur = self.db.execute(*args)
+        owner = self
+
+        class Rows:
+            def __iter__(self):
+                return self
+
+            def __next__(self):
+                row = next(cur)
+                owner.rows += 1
+                return row
+
+            def fetchone(self):
+                return next(self, None)
+
+        return Rows()
+
+
+def test_index_sample_reads_only_a_few_rows(tmp_path):
+    fp = tmp_path / "a.json"
+    fp.write_text(json.dumps(_bank("a", 300, "facil") + _bank("b", 300, "dificil")), encoding="utf-8")
+    with QuestionIndex(tmp_path / "idx.sqlite") as idx:
+        idx.update(fp)
+        expected = idx.sample(12, seed=4, dificuldade="dificil")
+        idx.db = counting = _CountingDB(idx.db)
+        picked = idx.sample(12, seed=4, dificuldade="dificil")
+        assert picked == expected
+        assert len({e.rowid for e in picked}) == 12 and {e.dificuldade for e in picked} == {"dificil"}
+        assert counting.rows < 60  # count + ~1 linha por sorteio, não as 300 candidatas
+
+        everything = idx.sample(1000, seed=4, dificuldade="facil")
+        assert sorted(e.qid for e in everything) == sorted(f"a{i}" for i in range(1, 301))
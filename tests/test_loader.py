@@ -0,0 +1,102 @@
+import json
+import zipfile
+
+from core.loader import load_quiz, iter_quiz
+
+
+def _bank(n):
+    return [
+        {"id": i, "enunciado": f"Quanto vale <X>+{i}?", "variaveis": {"X": "1:1:9"},
+         "alternativas;2": ["<X+1>", "<X+2>", "<X+3>"], "correta": "<X+%d>" % i}
+        for i in range(1, n + 1)
+    ]
+
+
+def test_iter_quiz_matches_load_quiz(tmp_path):
+    fp = tmp_path / "banco.json"
+    fp.write_text(json.dumps({"meta": {"curso": "x"}, "questoes": _bank(30)}), encoding="utf-8")
+    expected = load_quiz(fp, seed=7)["questions"]
+    assert len(expected) == 30
+    assert list(iter_quiz(fp, seed=7)) == expected
+
+
+def test_iter_quiz_directory_and_zip(tmp_path):
+    bank = _bank(12)
+    (tmp_path / "a.json").write_text(json.dumps(bank[:5]), encoding="utf-8")
+    (tmp_path / "b.json").write_text(json.dumps({"questions": bank[5:]}), encoding="utf-8")
+    assert list(iter_quiz(tmp_path, seed=1)) == load_quiz(tmp_path, seed=1)["questions"]
+
+    zp = tmp_path / "banco.zip"
+    with zipfile.ZipFile(zp, "w") as z:
+        z.write(tmp_path / "a.json", "a.json")
+        z.write(tmp_path / "b.json", "b.json")
+    assert list(iter_quiz(zp, seed=1)) == load_quiz(zp, seed=1)["questions"]
+
+
+def test_parse_cache_roundtrip(tmp_path, monkeypatch):
+    from core import cache as parse_cache
+
+    fp = tmp_path / "banco.json"
+    fp.write_text(json.dumps(_bank(5)), encoding="utf-8")
+    # monkeypatch restaura o diretório/limite originais para os testes seguintes
+    monkeypatch.setattr(parse_cache, "_CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(parse_cache, "_MAX_BYTES", parse_cache.DEFAULT_MAX_BYTES)
+
+    cold = load_quiz(fp, seed=3, cache=True)
+    assert len(list((tmp_path / "cache").glob("*.pkl"))) == 1
+    warm = load_quiz(fp, seed=3, cache=True)
+    assert warm == cold
+    assert "alternativas_firstrow" in warm["questions"][0]
+
+    # conteúdo novo -> nova chave
+    fp.write_text(json.dumps(_bank(6)), encoding="utf-8")
+    assert len(load_quiz(fp, seed=3, cache=True)["questions"]) == 6
+
+    # limite de tamanho: sobra apenas a entrada mais recente (LRU)
+    parse_cache.configure(max_bytes=1)
+    fp.write_text(json.dumps(_bank(7)), encoding="utf-8")
+    load_quiz(fp, seed=3, cache=True)
+    assert len(list((tmp_path / "cache").glob("*.pkl"))) == 1
+
+
+def test_parallel_directory_and_zip_keep_order(tmp_path):
+    bank = _bank(40)
+    for k in range(8):
+        (tmp_path / f"t{k:02d}.json").write_text(
+            json.dumps({"meta": {"ultimo": k}, "questions": bank[k * 5:(k + 1) * 5]}), encoding="utf-8"
+        )
+    serial = load_quiz(tmp_path, seed=5)
+    assert load_quiz(tmp_path, seed=5, workers=4) == serial
+    assert serial["meta"] == {"ultimo": 7}
+
+    zp = tmp_path.parent / "banco.zip"
+    with zipfile.ZipFile(zp, "w") as z:
+        for fp in sorted(tmp_path.glob("*.json")):
+            z.write(fp, fp.name)
+    assert load_quiz(zp, seed=5, workers=3) == serial
+
+
+def test_load_quiz_variants_match_per_seed_loads(tmp_path):
+    from core.loader import load_quiz_variants
+
+    fp = tmp_path / "banco.json"
+    fp.write_text(json.dumps(_bank(10)), encoding="utf-8")
+    seeds = [1, 2, 30, 2]
+    variants = list(load_quiz_variants(fp, seeds=seeds))
+    assert [s for s, _ in variants] == seeds
+    for seed, ds in variants:
+        assert ds == load_quiz(fp, seed=seed)
+
+
+def test_parallel_resolution_matches_serial_in_any_order(tmp_path):
+    bank = _bank(24)
+    fp = tmp_path / "banco.json"
+    fp.write_text(json.dumps(bank), encoding="utf-8")
+    serial = load_quiz(fp, seed=11)["questions"]
+    parallel = load_quiz(fp, seed=11, workers=2)["questions"]
+    assert json.dumps(parallel, ensure_ascii=False) == json.dumps(serial, ensure_ascii=False)
+
+    reversed_qs = load_quiz(bank[::-1], seed=11)["questions"]
+    assert reversed_qs[::-1] == serial
+    # mesma seed, questões diferentes: sorteios independentes
+    assert len({q["enunciado"].split("+")[0] for q in serial}) > 1
@@ -0,0 +1,118 @@
+import pytest
+
+from core.math import safe_eval, expr_cache_info, expr_cache_clear
+
+
+def test_safe_eval_reuses_compiled_expressions():
+    expr_cache_clear()
+    assert safe_eval("(A + B) * 2", {"A": 1, "B": 2}) == 6.0
+    assert safe_eval("(A + B) * 2", {"A": 3, "B": 4}) == 14.0
+    info = expr_cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_safe_eval_still_rejects_calls():
+    expr_cache_clear()
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            safe_eval("__import__('os')", {})
+    assert expr_cache_info().currsize == 0
+
+
+def test_safe_eval_rejects_unknown_nodes_and_bounds_cost():
+    for expr in ["A.real", "A[0]", "(lambda: 1)", "'abc'", "[A]", "A if B else 1", "A // B"]:
+        with pytest.raises(ValueError):
+            safe_eval(expr, {"A": 1.0, "B": 2.0})
+    for expr in ["9**9**9", "2**4000", "A ** 10**6", "+".join(["A"] * 1000)]:
+        with pytest.raises(ValueError):
+            safe_eval(expr, {"A": 1.0})
+    with pytest.raises(ValueError):
+        safe_eval("(-8) ** (1/3)", {})
+    assert safe_eval("2**10 + A * (3 - 1)", {"A": 0.5}) == 1025.0
+    assert safe_eval("A > 0 and B or 7", {"A": 0.0, "B": 2.0}) == 7.0
+
+    # overflow de float: '*' satura em inf, '**' lança OverflowError (e o lote marca inválido)
+    assert safe_eval("A * A", {"A": 1e300}) == float("inf")
+    with pytest.raises(OverflowError):
+        safe_eval("A ** 2", {"A": 1e300})
+    from core.variables import resolve_batch
+    _, valid = resolve_batch({"variaveis": {"X": "1:1:2"}, "resolucoes": {"Y": "(X * 1e300) ** 2"}}, [1, 2])
+    assert not any(valid)
+
+
+def test_compiled_template_matches_replace_angles_semantics():
+    from core.math import compile_template
+
+    tpl = compile_template("R = <X> Ω, <X * 2 + Y> e <> fim")
+    assert tpl is compile_template("R = <X> Ω, <X * 2 + Y> e <> fim")
+    assert tpl.render({"X": 2, "Y": 0.5}) == "R = 2 Ω, 4.50 e  fim"
+    assert tpl.render({"X": 3, "Y": 1}) == "R = 3 Ω, 7 e  fim"
+    with pytest.raises(NameError):
+        compile_template("<Z>").render({})
+
+
+def test_grid_is_exact_and_not_materialized():
+    import random
+    from core.math import grid_from_spec, draw_from_grid, choose_value
+
+    g = grid_from_spec("0:0.001:10000")
+    assert g.n == 10_000_000
+    assert g.value(g.n) == 10000.0 and g.value(300) == 0.3
+    assert grid_from_spec("0:0.6:1").n == 1  # não passa de max
+    big = grid_from_spec("0:1:1000000000000000000000")
+    assert 0 <= draw_from_grid(big, random.Random(1)) <= 1e21
+    assert choose_value(0.0037, 0.0041, 0.0001, random.Random(2)) in {0.0037, 0.0038, 0.0039, 0.004, 0.0041}
+
+
+def test_resolucoes_follow_dependencies_and_skip_unused():
+    from core.math import resolve_all
+
+    q = {
+        "variaveis": {"X": "2:1:2"},
+        "resolucoes": {"B": "A * 10", "A": "X + 1", "ERRO": "1 / 0"},
+        "enunciado": "B = <B>",
+    }
+    q_res, env = resolve_all(q, seed=1)
+    assert q_res["enunciado"] == "B = 30"
+    assert "ERRO" not in env
+    with pytest.raises(ZeroDivisionError):
+        resolve_all(q, seed=1, lazy=False)
+
+
+def test_resolucoes_accept_unicode_names():
+    from core.math import resolve_all
+
+    q = {
+        "variaveis": {"L": "3:1:3"},
+        "resolucoes": {"área": "L * L", "B": "área + 1", "ΔT": "<B> - área"},
+        "enunciado": "A = <área>, B = <B>, <ΔT>",
+    }
+    q_res, _ = resolve_all(q, seed=1)
+    assert q_res["enunciado"] == "A = 9, B = 10, 1"
+
+
+def test_resolucoes_cycle_is_reported():
+    from core.math import resolve_all
+
+    q = {"resolucoes": {"A": "B + 1", "B": "A * 2"}, "enunciado": "<A>"}
+    with pytest.raises(ValueError, match="circular"):
+        resolve_all(q, seed=1)
+
+
+def test_resolve_all_shares_unchanged_subtrees():
+    from core.math import resolve_all
+
+    q = {
+        "variaveis": {"X": "1:1:9"},
+        "enunciado": "X = <X>",
+        "imagens": ["fig.png;30x20"],
+        "obs": ["sem placeholders"],
+        "afirmacoes": {"I": "fixa", "II": "X vale <X>"},
+        "alternativas": ["<X+1>", "outra"],
+    }
+    q_res, env = resolve_all(q, seed=3)
+    assert q_res is not q and q_res["enunciado"] == f"X = {int(env['X'])}"
+    assert q_res["imagens"] is q["imagens"] and q_res["obs"] is q["obs"]
+    assert q_res["variaveis"] is q["variaveis"]
+    assert q_res["afirmacoes"] is not q["afirmacoes"] and q["afirmacoes"]["II"] == "X vale <X>"
+    assert q["alternativas"] == ["<X+1>", "outra"]
@@ -0,0 +1,33 @@
+from core.models import ImageSpec, Tipo, question_from_dict, questions_from_dicts
+
+
+def test_question_from_loader_dict():
+    d = {
+        "id": 7, "enunciado": "Escolha", "alternativas": ["a.png;30x20", "b.png", "Nenhuma"],
+        "alternativas_firstrow": 2, "correta": "c.png", "imagens": ["fig.jpg;40x30"],
+        "obs": "dica", "_base_dir": "/banco", "imagem": "", "fonte": "lista 1",
+    }
+    q = question_from_dict(d)
+    assert q.tipo is Tipo.IMAGEM and int(q.tipo) == 2
+    assert q.alternativas == ("a.png;30x20", "b.png", "Nenhuma") and q.colunas == 2
+    assert q.imagens == (ImageSpec("fig.jpg", 40.0, 30.0),)
+    assert q.obs == ("dica",) and q.base_dir == "/banco"
+    assert q.extra == {"fonte": "lista 1"}
+    alts = q.alternatives()
+    assert alts[0].image == ImageSpec("a.png", 30.0, 20.0) and not alts[2].is_image
+    assert q.correct_alternative().correct
+    assert not hasattr(q, "__dict__")
+
+    back = q.to_dict()
+    assert back["alternativas"] == d["alternativas"] and back["imagens"] == d["imagens"]
+    assert back["_base_dir"] == "/banco" and back["fonte"] == "lista 1"
+
+
+def test_tipo_inference():
+    qs = questions_from_dicts([
+        {"id": 1, "alternativas": ["x", "y"], "correta": "z"},
+        {"id": 2, "afirmacoes": {"I": "a"}, "alternativas": ["x"]},
+        {"id": 3, "variaveis": {"A": "1:1:2"}, "alternativas": ["<A>"]},
+        {"id": 4, "tipo": "2", "alternativas": ["x"]},
+    ])
+    assert [q.tipo for q in qs] == [Tipo.TEXTO, Tipo.AFIRMACOES, Tipo.NUMERICA, Tipo.IMAGEM]
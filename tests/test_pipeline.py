@@ -0,0 +1,42 @@
+import json
+
+from core.models import RenderOptions, Tipo
+from core.pipeline import iter_render, render_all
+
+
+def _bank():
+    return [
+        {"id": 1, "enunciado": "Soma <A>+<B>", "variaveis": {"A": "1:1:9", "B": "1:1:9"},
+         "resolucoes": {"S": "A+B"}, "alternativas;2": ["<S+1>", "<S+2>", "<S-1>"], "correta": "<S>"},
+        {"id": 2, "tipo": 2, "enunciado": "Figura", "alternativas": ["a.png;20x10", "b.png"], "correta": "c.png"},
+        {"id": 3, "enunciado": "Analise", "afirmacoes": {"II": "dois", "I": "um"},
+         "alternativas": ["Só I", "Só II"], "correta": "I e II"},
+    ]
+
+
+def test_render_all_fans_out_to_every_target(tmp_path):
+    from beamer.generator import json2beamer
+
+    fp = tmp_path / "banco.json"
+    fp.write_text(json.dumps(_bank()), encoding="utf-8")
+    opts = RenderOptions(target="beamer,docx,preview", shuffle_alternatives=True, seed=9)
+    out = render_all(fp, opts)
+
+    assert [r.tipo for r in out] == [Tipo.NUMERICA, Tipo.IMAGEM, Tipo.AFIRMACOES]
+    for r in out:
+        assert r.alternativas[r.correta].correct
+        assert {"beamer", "docx", "preview"} <= r.extra.keys()
+    assert out[0].extra["colunas"] == 2
+    assert out[2].extra["afirmacoes_labeled"] == ["I. um", "II. dois"]
+    sizes = {a.image.path: a.image.width_mm for a in out[1].alternativas}
+    assert sizes == {"a.png": 20.0, "b.png": None, "c.png": None}
+
+    json2beamer(str(fp), str(tmp_path / "s.tex"), shuffle_seed=9)
+    tex = (tmp_path / "s.tex").read_text(encoding="utf-8")
+    assert "\n".join(r.extra["beamer"] for r in out) in tex
+
+    streamed = iter_render(fp, opts)
+    assert next(streamed).enunciado == out[0].enunciado
+
+    shuffled = render_all(fp, RenderOptions(target="preview", shuffle_questions=True, seed=9))
+    assert sorted(r.id for r in shuffled) == [1, 2, 3]
@@ -0,0 +1,41 @@
+from collections import Counter
+
+import pytest
+
+from core.strategies import AttributeIndex, sample, sample_quotas, sample_versions, stratified
+
+
+def _index():
+    qs, files = [], []
+    for i in range(600):
+        qs.append({"enunciado": f"Q{i}", "dificuldade": ("facil", "media", "dificil")[i % 3], "tipo": 1 + i % 4})
+        files.append(f"/banco/cap{i % 5}.json")
+    return qs, files, AttributeIndex.from_questions(qs, files)
+
+
+def test_quotas_and_versions_without_repeats():
+    qs, files, idx = _index()
+    quotas = [{"n": 3, "dificuldade": "facil"},
+              {"n": 2, "dificuldade": "dificil", "tipo": [3, 4]},
+              {"n": 4, "arquivo": "cap1.json", "pesos": {"tipo": {2: 0}}}]
+    versions = sample_versions(idx, quotas, versions=12, seed=7)
+    assert versions == sample_versions(idx, quotas, versions=12, seed=7)
+    assert versions[:5] == sample_versions(idx, quotas, versions=5, seed=7)
+    picked = [i for v in versions for i in v]
+    assert len(picked) == len(set(picked)) == 12 * 9
+    for v in versions:
+        assert all(qs[i]["dificuldade"] == "facil" for i in v[:3])
+        assert all(qs[i]["dificuldade"] == "dificil" and qs[i]["tipo"] in (3, 4) for i in v[3:5])
+        assert all(files[i].endswith("cap1.json") and qs[i]["tipo"] != 2 for i in v[5:])
+
+    with pytest.raises(ValueError):
+        sample_quotas(idx, [{"n": 300, "dificuldade": "facil"}], seed=1)
+
+
+def test_stratified_and_weighted():
+    qs, files, idx = _index()
+    got = stratified(idx, 40, "dificuldade", seed=3, proportions={"facil": 1, "media": 2, "dificil": 1})
+    assert Counter(qs[i]["dificuldade"] for i in got) == {"facil": 10, "media": 20, "dificil": 10}
+
+    got = sample(idx, 100, seed=3, weights={"arquivo": {"cap0.json": 0}})
+    assert len(set(got)) == 100 and not any(files[i].endswith("cap0.json") for i in got)
@@ -0,0 +1,83 @@
+import json
+import random
+
+from core.loader import load_quiz
+from testgen.generator import _load_raw_questions, _resolve_selected, _select_questions
+
+
+def test_select_then_resolve_matches_resolve_all_then_select(tmp_path):
+    paths = []
+    for name, n in (("a", 7), ("b", 5)):
+        bank = [
+            {"id": f"{name}{i}", "enunciado": f"Quanto vale <X>*{i}?", "variaveis": {"X": "1:1:20"},
+             "alternativas": ["<X*2>", "<X*3>", "<X*4>"], "correta": "<X*%d>" % i}
+            for i in range(1, n + 1)
+        ]
+        fp = tmp_path / f"{name}.json"
+        fp.write_text(json.dumps(bank), encoding="utf-8")
+        paths.append(str(fp))
+
+    # fluxo antigo: resolve tudo, embaralha, pega as primeiras
+    expected = []
+    for p in paths:
+        for q in load_quiz(p, seed=3)["questions"]:
+            q["_base_dir"] = str(tmp_path.resolve())
+            expected.append(q)
+    random.Random(3).shuffle(expected)
+
+    selected = _select_questions(_load_raw_questions(paths), seed=3, num=4, shuffle=True)
+    assert _resolve_selected(selected, seed=3) == expected[:4]
+
+
+def test_json2docx_versions_answer_key(tmp_path):
+    from docx import Document
+    from testgen.generator import json2docx_versions
+
+    bank = [{"id": i, "enunciado": f"Q{i}", "alternativas": ["x", "y", "z"], "correta": f"certa{i}",
+             "dificuldade": ("facil", "dificil")[i % 2]} for i in range(20)]
+    fp = tmp_path / "banco.json"
+    fp.write_text(json.dumps(bank), encoding="utf-8")
+    template = tmp_path / "modelo.docx"
+    Document().save(template)
+
+    reports = json2docx_versions([str(fp)], str(template), versions=3, out_dir=str(tmp_path / "out"),
+                                 quotas=[{"n": 2, "dificuldade": "facil"}, {"n": 1, "dificuldade": "dificil"}],
+                                 workers=1)
+    assert [r.versao for r in reports] == ["A", "B", "C"]
+    seen = []
+    for r in reports:
+        blocks = [p.text for p in Document(r.arquivo).paragraphs if p.text.strip()]
+        for block, letter in zip(blocks, r.gabarito):
+            line = next(l for l in block.splitlines() if l.strip().startswith(f"{letter})"))
+            seen.append(line.split("certa")[1])
+    assert len(seen) == len(set(seen)) == 9  # corretas encontradas, sem repetir questões entre versões
+    key = Document(tmp_path / "out" / "gabarito.docx").tables[0]
+    assert [c.text for c in key.rows[1].cells] == ["1"] + [r.gabarito[0] for r in reports]
+
+
+def test_json2docx_with_index(tmp_path):
+    from docx import Document
+    from core.index import QuestionIndex
+    from testgen.generator import json2docx
+
+    bank = [{"id": i, "enunciado": f"Questão {i}: quanto vale <X>+{i}?", "variaveis": {"X": "1:1:9"},
+             "alternativas": ["<X+1>", "<X+2>"], "correta": "<X+%d>" % i,
+             "dificuldade": ("facil", "dificil")[i % 2]} for i in range(40)]
+    fp = tmp_path / "banco.json"
+    fp.write_text(json.dumps(bank), encoding="utf-8")
+    template = tmp_path / "modelo.docx"
+    Document().save(template)
+
+    def text(name):
+        return [p.text for p in Document(tmp_path / name).paragraphs if p.text.strip()]
+
+    quotas = [{"n": 3, "dificuldade": "facil"}, {"n": 2, "dificuldade": "dificil"}]
+    json2docx([str(fp)], str(template), str(tmp_path / "sem.docx"), seed=6, quotas=quotas)
+    json2docx([str(fp)], str(template), str(tmp_path / "com.docx"), seed=6, quotas=quotas,
+              index=tmp_path / "idx.sqlite")
+    assert text("com.docx") == text("sem.docx")
+
+    json2docx([str(fp)], str(template), str(tmp_path / "n.docx"), seed=6, num=4, index=tmp_path / "idx.sqlite")
+    with QuestionIndex(tmp_path / "idx.sqlite") as idx:
+        wanted = [f"Questão {e.qid}:" for e in idx.sample(4, seed=6, files=[str(fp)])]
+    assert [b.split(" quanto")[0].split(") ", 1)[-1] for b in text("n.docx")] == wanted
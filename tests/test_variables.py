@@ -0,0 +1,100 @@
+import pytest
+
+from core.math import resolve_all
+from core.variables import resolve_batch, iter_envs
+
+Q = {
+    "variaveis": {"R0": "90:1:110", "ALPHA": "0.0037:0.0001:0.0041", "RM": "0:1:200"},
+    "resolucoes": {"TEMP": "(RM - R0) / (R0 * ALPHA)", "INV": "1 / (RM - 100)", "TXT": "<TEMP> * 2"},
+}
+
+
+def test_resolve_batch_agrees_with_scalar_path():
+    seeds = list(range(400))
+    cols, valid = resolve_batch(Q, seeds)
+    for k, seed in enumerate(seeds):
+        try:
+            _, env = resolve_all(Q, seed=seed, lazy=False)
+        except ZeroDivisionError:
+            assert not valid[k]
+            continue
+        assert valid[k]
+        assert {name: float(col[k]) for name, col in cols.items()} == env
+
+
+def test_iter_envs_skips_invalid_draws():
+    cols, valid = resolve_batch(Q, range(400))
+    envs = list(iter_envs(cols, valid))
+    assert len(envs) == sum(bool(v) for v in valid)
+    assert all(env["RM"] != 100 for env in envs)
+
+
+def test_sample_variants_respects_restricoes():
+    import pytest
+    from core.variables import sample_variants
+
+    q = {
+        "variaveis": {"A": "-5:1:5", "B": "-5:1:5"},
+        "resolucoes": {"S": "A + B"},
+        "alternativas": ["<S + 1>", "<A * B>"],
+        "correta": "<S>",
+        "restricoes": {"expressoes": ["S > 0"], "alternativas_distintas": True, "correta_distinta": True},
+    }
+    variants = sample_variants(q, 50, seed=3)
+    assert len({s for s, _ in variants}) == 50
+    for seed, env in variants:
+        q_res, env_res = resolve_all(q, seed=seed)
+        assert env_res["S"] == env["S"] > 0
+        assert len(set(q_res["alternativas"])) == 2
+        assert q_res["correta"] not in q_res["alternativas"]
+
+    with pytest.raises(ValueError, match="restricoes"):
+        resolve_all(dict(q, restricoes=["S > 100"]), seed=1)
+
+
+def test_count_distinct_variants_enumerates_product():
+    from core.variables import count_distinct_variants, variant_space_size
+
+    q = {
+        "variaveis": {"A": "1:1:5", "B": "1:1:4"},
+        "resolucoes": {"S": "A + B"},
+        "enunciado": "Quanto vale <A>+<B>?",
+        "correta": "<S>",
+        "restricoes": ["S > 5"],
+    }
+    assert variant_space_size(q) == 20
+    cnt = count_distinct_variants(q)
+    assert (cnt.espaco, cnt.validas, cnt.distintas, cnt.completo) == (20, 10, 10, True)
+    partial = count_distinct_variants(q, limit=4)
+    assert partial.percorridas == 4 and not partial.completo
+
+
+def test_gui_logs_bank_summary(tmp_path):
+    import json
+    from types import SimpleNamespace
+
+    pytest.importorskip("tkinter")
+    from gui.app_window import App
+
+    fp = tmp_path / "banco.json"
+    fp.write_text(json.dumps({"questions": [
+        {"id": 1, "enunciado": "<X>", "variaveis": {"X": "1:1:4"}, "correta": "<X>"},
+        {"id": 2, "enunciado": "sem variáveis", "correta": "a"},
+    ]}), encoding="utf-8")
+    expected = "banco.json: 2 questão(ões); variantes por questão -> id=1: 4, id=2: 1"
+    assert App._bank_summary_line(str(fp)) == expected
+
+    # a contagem roda fora da thread chamadora e volta pelo after()
+    import threading
+
+    done = threading.Event()
+    posted = []
+    fake = SimpleNamespace(
+        _bank_summary_line=App._bank_summary_line,
+        after=lambda ms, fn, *args: posted.append((threading.current_thread(), fn, args)) or done.set(),
+        log=lambda line: None,
+    )
+    App._log_bank_summary(fake, str(fp))
+    assert done.wait(10)
+    thread, fn, args = posted[0]
+    assert thread is not threading.main_thread() and fn is fake.log and args == (expected,)